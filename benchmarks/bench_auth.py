@@ -0,0 +1,79 @@
+"""
+Benchmarks credential lookups and password verification.
+
+Lookup: for directories of increasing size, compares loading the whole file
+into a dict, as the original login did, with a binary search of the sorted,
+memory-mapped file in a fresh Credentials object.
+
+Verification: times check_password at several PBKDF2 work factors, which is
+the latency a user sees when logging in.
+
+Run from the repository root:
+    python -m benchmarks.bench_auth --users 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from task_auth import Credentials, check_password, hash_password
+
+
+def write_users(path, users):
+    """Writes a hashed, sorted credential file with `users` accounts."""
+    secret = hash_password("password", iterations=1, salt=b"benchmark-salt!!")
+    credentials = Credentials(path)
+    names = sorted(f"user{n:08d}" for n in range(users))
+    credentials._write((name, secret) for name in names)
+
+
+def time_dict_load(path, username):
+    started = time.perf_counter()
+    passwords = {}
+    with open(path, "r", encoding="utf-8") as user_file:
+        user_file.readline()
+        for line in user_file:
+            name, _, secret = line.rstrip("\n").partition(", ")
+            passwords[name] = secret
+    passwords.get(username)
+    return time.perf_counter() - started
+
+
+def time_binary_search(path, username):
+    started = time.perf_counter()
+    credentials = Credentials(path)
+    username in credentials
+    elapsed = time.perf_counter() - started
+    credentials.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument(
+        "--iterations", type=int, nargs="+", default=[100_000, 300_000, 600_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'dict load (ms)':>15} {'binary search (ms)':>19}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "user.txt")
+        for users in args.users:
+            write_users(path, users)
+            username = f"user{random.randrange(users):08d}"
+            loaded = time_dict_load(path, username)
+            searched = time_binary_search(path, username)
+            print(f"{users:>10} {loaded * 1000:>15.2f} {searched * 1000:>19.3f}")
+
+    print(f"\n{'iterations':>10} {'verify (ms)':>12}")
+    for iterations in args.iterations:
+        stored = hash_password("correct horse", iterations)
+        started = time.perf_counter()
+        check_password("correct horse", stored)
+        print(f"{iterations:>10} {(time.perf_counter() - started) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compares the task log and SQLite storage backends.
+
+Both backends are filled with the same synthetic tasks in a temporary
+directory and then timed on the operations the task manager performs: bulk
+loading, single adds and updates, lookups by ID, a user's task list, the
+due-date range behind 'vd' and the report counters behind 'gr' and 'ds'.
+Each query is repeated and the mean time is reported.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends --tasks 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+from benchmarks.bench_reports import synthetic_tasks
+from task_index import DueIndex, UserIndex
+from task_reports import ReportCounters
+from task_sqlite import SqliteTaskStore
+from task_store import Task, TaskStore
+
+
+def open_log_store():
+    store = TaskStore(legacy_path=None)
+    return store, UserIndex(store), DueIndex(store)
+
+
+def open_sqlite_store():
+    store = SqliteTaskStore()
+    return store, store, store
+
+
+def timed(operation, repeats=1):
+    """Returns the mean time of `repeats` calls to operation."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        operation()
+    return (time.perf_counter() - started) / repeats
+
+
+def run(name, opener, args):
+    store, by_user, by_due = opener()
+    today = date(2025, 1, 1)
+    day = today.toordinal()
+    results = {}
+    results["bulk load (s)"] = timed(
+        lambda: store.add_many(synthetic_tasks(args.tasks, args.users))
+    )
+    ids = [random.randint(1, args.tasks) for _ in range(args.repeats)]
+    results["add (ms)"] = 1000 * timed(
+        lambda: store.add(Task("user1", "New", "Task", day, day, False)), args.repeats
+    )
+    results["update (ms)"] = 1000 * timed(
+        lambda: store.update(ids[0], Task("user2", "Edited", "Task", day, day, True)),
+        args.repeats,
+    )
+    results["get (ms)"] = 1000 * timed(
+        lambda: [store.get(task_id) for task_id in ids]
+    ) / len(ids)
+    results["user tasks (ms)"] = 1000 * timed(
+        lambda: by_user.tasks_for(f"user{random.randrange(args.users)}"),
+        args.repeats,
+    )
+    results["due range (ms)"] = 1000 * timed(
+        lambda: by_due.due_between(today, date(2025, 1, 31)), args.repeats
+    )
+
+    def report():
+        if name == "sqlite":
+            return store.snapshot(today)
+        return ReportCounters(today).add_all(task for _, task in store.items())
+
+    results["report (s)"] = timed(report)
+    store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=100)
+    args = parser.parse_args()
+
+    original = os.getcwd()
+    rows = {}
+    for name, opener in (("log", open_log_store), ("sqlite", open_sqlite_store)):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                rows[name] = run(name, opener, args)
+            finally:
+                os.chdir(original)
+
+    print(f"{args.tasks} tasks, {args.users} users")
+    print(f"{'operation':>16} {'log':>10} {'sqlite':>10}")
+    for operation in rows["log"]:
+        print(
+            f"{operation:>16} {rows['log'][operation]:>10.3f} "
+            f"{rows['sqlite'][operation]:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
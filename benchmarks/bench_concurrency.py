@@ -0,0 +1,134 @@
+"""
+Stress-tests concurrent writers sharing one task store.
+
+For each writer count, that many processes share a fresh store in a
+temporary directory. Each process adds its own tasks and then completes them.
+It also appends a marker to the description of one shared task with a
+read-modify-write under the store lock, which is the pattern that loses
+updates without locking. Afterwards the benchmark checks the following:
+  - every added task exists and is completed;
+  - the shared task carries every writer's markers;
+  - the statistics maintained by the writers match a full recount.
+It reports throughput for each writer count, measured from the moment every
+writer has opened the store until the last one finishes.
+
+Run from the repository root:
+    python -m benchmarks.bench_concurrency --writers 1 2 4 8 --ops 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+from multiprocessing import Barrier, Process, Queue
+
+from task_reports import ReportCounters
+from task_service import TaskService
+from task_store import Task
+
+TODAY = date.today().toordinal()
+
+
+def open_service(backend):
+    # Writers only use the store, so no user file is needed.
+    return TaskService(backend=backend)
+
+
+def writer(directory, backend, number, ops, ready, times):
+    """One writer process: adds, completes and shares-updates `ops` tasks."""
+    os.chdir(directory)
+    service = open_service(backend)
+    store = service.store
+    ready.wait()
+    started = time.monotonic()
+    for n in range(ops):
+        task_id = store.add(
+            Task(f"user{number}", f"w{number}-{n}", "", TODAY, TODAY, False)
+        )
+        service.complete_task(task_id)
+        with store.locked():
+            shared = store.get(1).copy()
+            shared.description += f" {number}:{n}"
+            store.update(1, shared)
+    times.put((started, time.monotonic()))
+    service.close()
+
+
+def check(backend, writers, ops):
+    """Returns a list of problems found in the store after a run."""
+    service = open_service(backend)
+    problems = []
+    titles = {}
+    for task_id, task in service.all_tasks():
+        titles[task.title] = task
+    for number in range(writers):
+        for n in range(ops):
+            task = titles.get(f"w{number}-{n}")
+            if task is None:
+                problems.append(f"task w{number}-{n} was lost")
+            elif not task.completed:
+                problems.append(f"completion of w{number}-{n} was lost")
+    markers = set(service.get_task(1).description.split())
+    missing = writers * ops - len(markers)
+    if missing:
+        problems.append(f"{missing} shared-task update(s) were lost")
+
+    today = date.today()
+    counted = ReportCounters(today).add_all(task for _, task in service.all_tasks())
+    kept = service.statistics(today)
+    if (kept.total, kept.completed, kept.users) != (
+        counted.total, counted.completed, counted.users
+    ):
+        problems.append("statistics disagree with a full recount")
+    service.close()
+    return problems
+
+
+def run(backend, writers, ops):
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            service = open_service(backend)
+            service.store.add(Task("shared", "shared", "", TODAY, TODAY, False))
+            service.close()
+
+            ready = Barrier(writers)
+            times = Queue()
+            processes = [
+                Process(
+                    target=writer,
+                    args=(directory, backend, number, ops, ready, times),
+                )
+                for number in range(writers)
+            ]
+            for process in processes:
+                process.start()
+            spans = [times.get() for _ in processes]
+            for process in processes:
+                process.join()
+            elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+            return elapsed, check(backend, writers, ops)
+        finally:
+            os.chdir(original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--backend", choices=["log", "sqlite"], default="log")
+    args = parser.parse_args()
+
+    print(f"{'writers':>8} {'changes/s':>10} {'problems':>9}")
+    for writers in args.writers:
+        elapsed, problems = run(args.backend, writers, args.ops)
+        # Each op is an add, a completion and a shared update.
+        rate = 3 * writers * args.ops / elapsed
+        print(f"{writers:>8} {rate:>10.0f} {len(problems):>9}")
+        for problem in problems[:10]:
+            print(f"         {problem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmarks task date parsing.
+
+Compares repeated datetime.strptime calls, as the task manager used to make,
+with the memoized task_dates.parse_date on a stream of due dates drawn from a
+realistic pool (dates repeat heavily and mix both supported formats).
+
+Run from the repository root:
+    python -m benchmarks.bench_dates --rows 2000000
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from task_dates import parse_date
+
+
+def make_dates(rows, distinct, seed=1):
+    """Returns `rows` date strings drawn from `distinct` days in both formats."""
+    rng = random.Random(seed)
+    start = date(2019, 1, 1)
+    pool = []
+    for offset in range(distinct):
+        day = start + timedelta(days=offset)
+        pool.append(day.strftime("%d %b %Y"))
+        pool.append(day.isoformat())
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def time_strptime(texts):
+    """Parses with strptime, trying each format in turn."""
+    started = time.perf_counter()
+    for text in texts:
+        try:
+            datetime.strptime(text, "%d %b %Y")
+        except ValueError:
+            datetime.strptime(text, "%Y-%m-%d")
+    return time.perf_counter() - started
+
+
+def time_parse_date(texts):
+    parse_date.cache_clear()
+    started = time.perf_counter()
+    for text in texts:
+        parse_date(text)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--distinct", type=int, default=2000, help="distinct due dates in the pool"
+    )
+    args = parser.parse_args()
+
+    texts = make_dates(args.rows, args.distinct)
+    for name, run in (("strptime", time_strptime), ("parse_date", time_parse_date)):
+        elapsed = run(texts)
+        print(f"{name:>10}: {elapsed:8.3f}s  {args.rows / elapsed:14,.0f} rows/s")
+    info = parse_date.cache_info()
+    print(f"parse_date cache: {info.hits:,} hits, {info.misses:,} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmarks the memory used to hold tasks in memory.
+
+Compares the original representation, a list of six strings per task built
+with split(", "), with task_store.Task records (__slots__, interned assignee,
+ordinal dates and a bool completion flag).
+
+Run from the repository root:
+    python -m benchmarks.bench_memory --tasks 500000
+"""
+import argparse
+import random
+import tracemalloc
+from datetime import date, timedelta
+
+from task_store import Task
+
+
+def make_lines(tasks, users, seed=1):
+    """Returns `tasks` lines in the legacy tasks.txt format."""
+    rng = random.Random(seed)
+    names = [f"user{n}" for n in range(users)]
+    start = date(2024, 1, 1)
+    lines = []
+    for n in range(tasks):
+        assigned = start + timedelta(days=rng.randrange(365))
+        due = assigned + timedelta(days=rng.randrange(1, 60))
+        lines.append(
+            f"{rng.choice(names)}, Task {n}, Description of task {n}, "
+            f"{assigned:%d %b %Y}, {due:%d %b %Y}, {rng.choice(['Yes', 'No'])}\n"
+        )
+    return lines
+
+
+def measure(build, lines):
+    """Returns the bytes allocated by build(lines) that are still alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = build(lines)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tasks
+    return after - before
+
+
+def as_lists(lines):
+    return [line.strip().split(", ") for line in lines]
+
+
+def as_tasks(lines):
+    return [Task.from_fields(line.strip().split(", ")) for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    lines = make_lines(args.tasks, args.users)
+    for name, build in (("list of lists", as_lists), ("Task records", as_tasks)):
+        used = measure(build, lines)
+        print(
+            f"{name:>14}: {used / 2**20:8.1f} MiB  "
+            f"{used / args.tasks:6.0f} bytes/task"
+        )
+
+
+if __name__ == "__main__":
+    main()
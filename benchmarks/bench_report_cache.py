@@ -0,0 +1,135 @@
+"""
+Benchmarks the report cache against regenerating the reports.
+
+A temporary task store is filled with synthetic tasks and the reports are
+requested through the cache after each kind of change it distinguishes:
+none at all, a task log that was touched but not modified, a new user, a
+few added and completed tasks, and a deletion (which forces a full
+regeneration). The same kinds of change are then made from a second
+process, whose records this process's indexes have not seen yet. Each row
+shows how the cache answered, how long it took and whether the reports it
+left match a full count of the tasks, next to the time of a full
+single-process regeneration.
+
+Run from the repository root:
+    python -m benchmarks.bench_report_cache --tasks 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+from multiprocessing import Process
+
+from benchmarks.bench_reports import read_reports, synthetic_tasks
+from task_auth import Credentials
+from task_report_cache import ReportCache
+from task_reports import ReportCounters, format_task_overview, format_user_overview
+from task_service import TaskService
+
+
+def timed(operation):
+    started = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - started, result
+
+
+def change_elsewhere(change, count):
+    """Changes tasks from a separate process, as another client would."""
+    service = TaskService(backend="log")
+    if change == "add":
+        for n in range(count):
+            service.add_task("user1", "New", "Task", date.today().isoformat())
+    elif change == "reassign":
+        service.edit_task(5, "user2")
+    else:
+        # Task 8 is user7's; the tombstone does not say so.
+        service.delete_task(8)
+        service.edit_task(6, "user7")
+    service.close()
+
+
+def elsewhere(change, count):
+    process = Process(target=change_elsewhere, args=(change, count))
+    process.start()
+    process.join()
+
+
+def reports_correct(service, today):
+    """Returns True if the report files match a full count of the tasks."""
+    counters = ReportCounters(today).add_all(
+        task for _, task in service.store.items()
+    )
+    return read_reports() == [
+        format_task_overview(counters),
+        format_user_overview(counters, len(service.credentials)),
+    ]
+
+
+def run(args):
+    with open("user.txt", "w", encoding="utf-8") as user_file:
+        user_file.write("admin, password\n")
+        for n in range(args.users):
+            user_file.write(f"user{n}, password\n")
+    # Hash the synthetic passwords cheaply; only their presence matters here.
+    Credentials().upgrade(iterations=1000)
+
+    service = TaskService(backend="log")
+    service.store.add_many(synthetic_tasks(args.tasks, args.users))
+    cache = ReportCache(service)
+    today = date.today()
+
+    def add_tasks():
+        for n in range(args.changes):
+            service.add_task("user1", "New", "Task", today.isoformat())
+        service.complete_task(2)
+
+    steps = [
+        ("first request", None),
+        ("no change", None),
+        ("log touched", lambda: os.utime(service.store.log_path)),
+        ("user added", lambda: service.register_user("newcomer", "password")),
+        (f"{args.changes} tasks added", add_tasks),
+        ("task deleted", lambda: service.delete_task(3)),
+        ("added elsewhere", lambda: elsewhere("add", args.changes)),
+        ("moved elsewhere", lambda: elsewhere("reassign", args.changes)),
+        ("deleted elsewhere", lambda: elsewhere("delete", args.changes)),
+    ]
+    rows = []
+    for name, change in steps:
+        if change is not None:
+            change()
+        elapsed, (status, _) = timed(lambda: cache.refresh(today))
+        rows.append((name, status, elapsed, reports_correct(service, today)))
+    full, _ = timed(lambda: service.generate_reports(workers=1, today=today))
+    service.close()
+    return rows, full
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--changes", type=int, default=10)
+    args = parser.parse_args()
+
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            rows, full = run(args)
+        finally:
+            os.chdir(original)
+
+    print(f"{args.tasks} tasks, {args.users} users")
+    print(f"full regeneration: {full * 1000:.1f} ms\n")
+    print(f"{'change':>17} {'answer':>12} {'time (ms)':>10} {'correct':>8}")
+    for name, status, elapsed, correct in rows:
+        print(
+            f"{name:>17} {status:>12} {elapsed * 1000:>10.1f} "
+            f"{'yes' if correct else 'NO':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
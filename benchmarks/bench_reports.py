@@ -0,0 +1,89 @@
+"""
+Benchmarks overview report generation across worker process counts.
+
+A temporary task store of the given size is filled with synthetic tasks.
+The reports are then generated once in a single pass and once for each
+worker count, and every parallel run is checked to produce exactly the same
+task_overview.txt and user_overview.txt as the single pass.
+
+Run from the repository root:
+    python -m benchmarks.bench_reports --tasks 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+import task_reports
+from task_store import Task, TaskStore
+
+REPORT_FILES = [task_reports.TASK_OVERVIEW_FILE, task_reports.USER_OVERVIEW_FILE]
+
+
+def synthetic_tasks(count, users):
+    """Yields tasks spread over `users` assignees with a mix of states."""
+    start = date(2024, 1, 1).toordinal()
+    for n in range(count):
+        yield Task(
+            f"user{n % users}",
+            f"Task {n}",
+            f"Description {n}",
+            start + n % 365,
+            start + n % 730,
+            n % 3 == 0,
+        )
+
+
+def read_reports():
+    reports = []
+    for name in REPORT_FILES:
+        with open(name, "r", encoding="utf-8") as report:
+            reports.append(report.read())
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    today = date(2025, 1, 1)
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            store = TaskStore(legacy_path=None)
+            store.add_many(synthetic_tasks(args.tasks, args.users))
+            size = os.path.getsize(store.log_path)
+            print(f"{args.tasks} tasks, {size / (1 << 20):.1f} MiB log")
+
+            started = time.perf_counter()
+            task_reports.generate_reports(
+                (task for _, task in store.items()), args.users, today
+            )
+            serial = time.perf_counter() - started
+            expected = read_reports()
+
+            print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8} {'identical':>10}")
+            print(f"{'serial':>8} {serial:>9.2f} {1:>8.2f} {'-':>10}")
+            for workers in args.workers:
+                started = time.perf_counter()
+                task_reports.generate_reports_parallel(
+                    store, args.users, workers, today
+                )
+                elapsed = time.perf_counter() - started
+                identical = "yes" if read_reports() == expected else "NO"
+                print(
+                    f"{workers:>8} {elapsed:>9.2f} {serial / elapsed:>8.2f} "
+                    f"{identical:>10}"
+                )
+            store.close()
+        finally:
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmarks task search with the inverted word index.
+
+A temporary store is filled with synthetic tasks whose titles and
+descriptions draw words from a fixed vocabulary, with a few words far more
+common than the rest. The benchmark times the following:
+  - building the index;
+  - loading its checkpoint at startup;
+  - several kinds of query, each compared with a linear scan of every task.
+
+Run from the repository root:
+    python -m benchmarks.bench_search --tasks 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date
+from itertools import islice
+
+from task_index import SearchIndex, UserIndex, words_in
+from task_store import Task, TaskStore
+
+VOCABULARY = [
+    f"{stem}{n}" for stem in ("alpha", "beta", "gamma", "delta") for n in range(2500)
+]
+LIMIT = 20
+
+
+def synthetic_tasks(count, users):
+    day = date(2025, 1, 1).toordinal()
+    rng = random.Random(1)
+    for n in range(count):
+        # Squaring skews the choice towards the start of the vocabulary.
+        words = [
+            VOCABULARY[int(rng.random() ** 2 * len(VOCABULARY))] for _ in range(8)
+        ]
+        yield Task(
+            f"user{n % users}",
+            " ".join(words[:3]),
+            " ".join(words[3:]),
+            day,
+            day + n % 365,
+            n % 3 == 0,
+        )
+
+
+def timed(operation, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = operation()
+    return (time.perf_counter() - started) / repeats, result
+
+
+def indexed(index, by_user, query, assigned_to=None):
+    """The first page of matches, found through the indexes."""
+    within = None if assigned_to is None else by_user.ids_for(assigned_to)
+    return list(islice(index.search(query, 0, within), LIMIT))
+
+
+def scanned(store, query, assigned_to=None):
+    """The first page of matches, found by reading every task in turn."""
+    terms = query.split()
+
+    def matches():
+        for task_id, task in store.items():
+            if assigned_to is not None and task.assigned_to != assigned_to:
+                continue
+            words = words_in(task.title) | words_in(task.description)
+            if all(
+                any(word.startswith(term[:-1]) for word in words)
+                if term.endswith("*") else term in words
+                for term in terms
+            ):
+                yield task_id
+    return list(islice(matches(), LIMIT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    queries = [
+        ("common word", "alpha1", None),
+        ("rare word", "delta2499", None),
+        ("two words", "alpha1 alpha2", None),
+        ("rare pair", "gamma10 delta20", None),
+        ("prefix", "beta25*", None),
+        ("word + user", "alpha3", "user7"),
+    ]
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            store = TaskStore(legacy_path=None)
+            store.add_many(synthetic_tasks(args.tasks, args.users))
+            by_user = UserIndex(store)
+            built, index = timed(lambda: SearchIndex(store), 1)
+            loaded, _ = timed(lambda: SearchIndex(store), 1)
+            print(f"{args.tasks} tasks, {len(index.words)} distinct words")
+            print(f"build {built:.2f}s, load checkpoint {loaded:.2f}s\n")
+
+            print(f"{'query':>12} {'index (ms)':>11} {'scan (ms)':>10} {'same':>5}")
+            for name, query, user in queries:
+                fast, found = timed(
+                    lambda: indexed(index, by_user, query, user), args.repeats
+                )
+                slow, expected = timed(lambda: scanned(store, query, user), 1)
+                same = "yes" if found == expected else "NO"
+                print(
+                    f"{name:>12} {fast * 1000:>11.3f} {slow * 1000:>10.1f} "
+                    f"{same:>5}"
+                )
+            store.close()
+        finally:
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Load-tests the asyncio task server with many simulated users.
+
+A task server is started in a subprocess against a temporary directory with
+one registered account per simulated user. Each user opens a connection,
+logs in and then sends a mix of requests one at a time:
+  - 60% list-mine;
+  - 25% add;
+  - 10% complete;
+  - 5% edit.
+The benchmark reports requests per second and the latency percentiles seen
+by the clients. Every user logs in before the clock starts, so logins are not
+included in the figures.
+
+Run from the repository root:
+    python -m benchmarks.bench_server --users 100 300 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from task_auth import Credentials, hash_password
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "password"
+
+
+def write_users(directory, users):
+    """
+    Registers admin and user0..user{n-1}.
+
+    The shared hash is made at the server's work factor, so no login
+    triggers a rehash.
+    """
+    credentials = Credentials(os.path.join(directory, "user.txt"))
+    secret = hash_password(PASSWORD, credentials.iterations)
+    names = sorted(["admin"] + [f"user{n:05d}" for n in range(users)])
+    credentials._write((name, secret) for name in names)
+
+
+def start_server(directory):
+    """Starts task_server.py on a free port and returns (process, port)."""
+    env = dict(os.environ, PYTHONPATH=REPO)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO, "task_server.py"), "--port", "0"],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    banner = process.stdout.readline()
+    return process, int(banner.rsplit(":", 1)[1])
+
+
+async def simulated_user(
+    port, username, requests, latencies, errors, logged_in, start
+):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def call(**request):
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    response = await call(op="login", username=username, password=PASSWORD)
+    if not response["ok"]:
+        errors.append(response["error"])
+    logged_in.release()
+    await start.wait()
+
+    mine = []
+    for n in range(requests):
+        roll = random.random()
+        if roll < 0.25 or not mine:
+            request = {
+                "op": "add", "title": f"Task {n}", "description": "Load test",
+                "due_date": "2030-01-01",
+            }
+        elif roll < 0.35:
+            request = {"op": "complete", "task_id": mine.pop()}
+        elif roll < 0.40:
+            request = {"op": "edit", "task_id": mine[-1], "due_date": "2031-01-01"}
+        else:
+            request = {"op": "list-mine", "limit": 20}
+        started = time.perf_counter()
+        response = await call(**request)
+        latencies.append(time.perf_counter() - started)
+        if not response["ok"]:
+            errors.append(response["error"])
+        elif request["op"] == "add":
+            mine.append(response["task_id"])
+    writer.close()
+
+
+async def load(port, users, requests):
+    latencies, errors = [], []
+    logged_in, start = asyncio.Semaphore(0), asyncio.Event()
+    clients = asyncio.gather(
+        *(
+            simulated_user(
+                port, f"user{n:05d}", requests, latencies, errors, logged_in, start
+            )
+            for n in range(users)
+        )
+    )
+    # Start the clock once every user has logged in.
+    for _ in range(users):
+        await logged_in.acquire()
+    started = time.perf_counter()
+    start.set()
+    await clients
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'users':>6} {'requests':>9} {'req/s':>8} {'p50 (ms)':>9} "
+        f"{'p99 (ms)':>9} {'errors':>7}"
+    )
+    for users in args.users:
+        with tempfile.TemporaryDirectory() as directory:
+            write_users(directory, users)
+            process, port = start_server(directory)
+            try:
+                elapsed, latencies, errors = asyncio.run(
+                    load(port, users, args.requests)
+                )
+            finally:
+                process.terminate()
+                process.wait()
+        print(
+            f"{users:>6} {len(latencies):>9} {len(latencies) / elapsed:>8.0f} "
+            f"{percentile(latencies, 0.5) * 1000:>9.2f} "
+            f"{percentile(latencies, 0.99) * 1000:>9.2f} {len(errors):>7}"
+        )
+        for error in sorted(set(errors))[:5]:
+            print(f"       {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Compares pooled connections with connect-per-call for the ebookstore.
+
+Two copies of a synthetic catalogue are created in a temporary directory.
+The same mix of the queries shelf_track.py issues is then run against each
+copy: a book lookup by ID, the book-and-author join behind 'update book', an
+author's books and, for the share of operations set by --writes, a quantity
+update with its commit. The two ways of connecting are:
+  - per call: a fresh sqlite3 connection for every operation, closed
+    afterwards, as shelf_track.py used to do;
+  - pooled: each thread's long-lived, tuned connection from shelf_db.
+
+Operations per second are reported for each thread count.
+
+Run from the repository root:
+    python -m benchmarks.bench_shelf_connections --books 100000 --threads 1 4
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from shelf_db import ConnectionPool
+
+AUTHORS = 1000
+
+
+def create_catalogue(path, books):
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE book(id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+        "authorid INTEGER NOT NULL, qty INTEGER NOT NULL)"
+    )
+    db.execute(
+        "CREATE TABLE author(id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+        "country TEXT NOT NULL)"
+    )
+    db.executemany(
+        "INSERT INTO author VALUES (?, ?, ?)",
+        ((n, f"Author {n}", "England") for n in range(AUTHORS)),
+    )
+    db.executemany(
+        "INSERT INTO book VALUES (?, ?, ?, ?)",
+        ((n, f"Book {n}", n % AUTHORS, 10) for n in range(books)),
+    )
+    db.commit()
+    db.close()
+
+
+def operation(db, rng, books, writes):
+    """Runs one clerk operation, chosen at random, on a connection."""
+    book_id = rng.randrange(books)
+    choice = rng.random()
+    if choice < writes:
+        db.execute(
+            "UPDATE book SET qty = ? WHERE id = ?", (rng.randrange(50), book_id)
+        )
+        db.commit()
+    elif choice < 0.4:
+        db.execute("SELECT * FROM book WHERE id = ?", (book_id,)).fetchone()
+    elif choice < 0.7:
+        db.execute(
+            "SELECT book.qty, author.name, author.country, author.id "
+            "FROM book JOIN author ON book.authorid = author.id "
+            "WHERE book.id = ?",
+            (book_id,),
+        ).fetchone()
+    else:
+        author_id = book_id % AUTHORS
+        db.execute("SELECT name FROM author WHERE id = ?", (author_id,)).fetchone()
+        db.execute(
+            "SELECT title, qty FROM book WHERE authorid = ?", (author_id,)
+        ).fetchall()
+
+
+def per_call(path):
+    def run(rng, books, writes):
+        db = sqlite3.connect(path)
+        try:
+            operation(db, rng, books, writes)
+        finally:
+            db.close()
+    return run, lambda: None
+
+
+def pooled(path):
+    pool = ConnectionPool(path)
+
+    def run(rng, books, writes):
+        db = pool.acquire()
+        try:
+            operation(db, rng, books, writes)
+        finally:
+            pool.release(db)
+    return run, pool.close
+
+
+def throughput(run, threads, seconds, books, writes):
+    """Returns operations per second over `seconds` with `threads` threads."""
+    counts = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def worker(number):
+        rng = random.Random(number)
+        while time.perf_counter() < stop:
+            run(rng, books, writes)
+            counts[number] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--writes", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{args.books} books, {AUTHORS} authors, "
+            f"{args.writes:.0%} of operations update"
+        )
+        print(f"{'threads':>7} {'per call (ops/s)':>17} {'pooled (ops/s)':>15}")
+        for threads in args.threads:
+            rates = []
+            for name, mode in (("per_call", per_call), ("pooled", pooled)):
+                path = os.path.join(directory, f"{name}{threads}.db")
+                create_catalogue(path, args.books)
+                run, close = mode(path)
+                rates.append(
+                    throughput(run, threads, args.seconds, args.books, args.writes)
+                )
+                close()
+            print(f"{threads:>7} {rates[0]:>17,.0f} {rates[1]:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmarks the ebookstore bulk import against adding books one at a time.
+
+A synthetic catalogue file is written in each format: books with generated
+titles, authors drawn from a fixed pool of names and a few invalid rows. For
+each format the benchmark times, on a fresh database:
+  - the pattern the clerk menu uses, one INSERT and commit per book, on a
+    sample of the rows;
+  - import_books into an empty catalogue, keeping the indexes up to date;
+  - import_books with rebuild_indexes, dropping and rebuilding them;
+  - importing the same file again, so that every row is an update.
+
+Run from the repository root:
+    python -m benchmarks.bench_shelf_import --books 1000000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+from shelf_db import connect, migrate
+from shelf_import import COLUMNS, import_books
+
+WORDS = [f"word{n}" for n in range(5_000)]
+COUNTRIES = ["England", "Ireland", "France", "Japan", "United States"]
+SAMPLE = 2_000
+
+
+def catalogue(books, authors):
+    rng = random.Random(1)
+    for n in range(1, books + 1):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        author = rng.randrange(authors)
+        row = {
+            "id": n,
+            "title": title.title(),
+            "author": f"Author {author}",
+            "country": COUNTRIES[author % len(COUNTRIES)],
+            "qty": rng.randint(0, 50),
+        }
+        if n % 10_000 == 0:
+            row["qty"] = "many"
+        yield row
+
+
+def write_file(path, fmt, books, authors):
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        if fmt == "csv":
+            writer = csv.DictWriter(target, COLUMNS)
+            writer.writeheader()
+            writer.writerows(catalogue(books, authors))
+        else:
+            for row in catalogue(books, authors):
+                target.write(json.dumps(row) + "\n")
+
+
+def fresh_database(directory, name):
+    db = connect(os.path.join(directory, name))
+    migrate(db)
+    return db
+
+
+def one_at_a_time(db, books):
+    """The clerk menu's add_book: one INSERT and commit per book."""
+    started = time.perf_counter()
+    for n in range(10_000, 10_000 + books):
+        db.execute(
+            "INSERT INTO book VALUES (?, ?, ?, ?)", (n, f"Book {n}", 1290, 10)
+        )
+        db.commit()
+    return books / (time.perf_counter() - started)
+
+
+def timed_import(db, path, rebuild_indexes=False):
+    rejected = []
+    started = time.perf_counter()
+    imported, _ = import_books(
+        db, path, rejected=rejected, rebuild_indexes=rebuild_indexes
+    )
+    elapsed = time.perf_counter() - started
+    return (imported + len(rejected)) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=500_000)
+    parser.add_argument("--authors", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{args.books} books by {args.authors} authors (rows/s)")
+    print(
+        f"{'format':>7} {'one by one':>11} {'indexed':>10} "
+        f"{'rebuild':>10} {'re-import':>10}"
+    )
+    for fmt in ("csv", "jsonl"):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"books.{fmt}")
+            write_file(path, fmt, args.books, args.authors)
+
+            db = fresh_database(directory, "single.db")
+            single = one_at_a_time(db, SAMPLE)
+            db.close()
+
+            db = fresh_database(directory, "indexed.db")
+            indexed = timed_import(db, path)
+            db.close()
+
+            db = fresh_database(directory, "rebuild.db")
+            rebuilt = timed_import(db, path, rebuild_indexes=True)
+            again = timed_import(db, path)
+            db.close()
+        print(
+            f"{fmt:>7} {single:>11,.0f} {indexed:>10,.0f} "
+            f"{rebuilt:>10,.0f} {again:>10,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
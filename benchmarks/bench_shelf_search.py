@@ -0,0 +1,104 @@
+"""
+Benchmarks ebookstore title search with the FTS5 index against LIKE.
+
+A synthetic catalogue is written to a temporary database: titles of three to
+six words drawn from a vocabulary in which a few words are far more common
+than the rest, and authors with generated names. The benchmark times
+indexing the whole catalogue, then runs several searches both through
+search_books and as the original "title LIKE '%term%'" scan, reporting the
+mean latency of each.
+
+Run from the repository root:
+    python -m benchmarks.bench_shelf_search --books 2000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from shelf_db import connect
+from shelf_search import create_search_index, search_books
+
+VOCABULARY = [
+    f"{stem}{suffix}"
+    for stem in ("shadow", "river", "garden", "winter", "crown", "letter")
+    for suffix in ("", "s", "fall", "light", "wood", "keeper", "song", "born")
+] + [f"word{n}" for n in range(20_000)]
+
+
+def fill_catalogue(db, books, authors):
+    rng = random.Random(1)
+    db.execute(
+        "CREATE TABLE book(id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+        "authorid INTEGER NOT NULL, qty INTEGER NOT NULL)"
+    )
+    db.execute(
+        "CREATE TABLE author(id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+        "country TEXT NOT NULL)"
+    )
+    db.executemany(
+        "INSERT INTO author VALUES (?, ?, ?)",
+        ((n, f"Author{n} Surname{n % 997}", "England") for n in range(authors)),
+    )
+
+    def titles():
+        for n in range(books):
+            # Squaring skews the choice towards the start of the vocabulary.
+            words = [
+                VOCABULARY[int(rng.random() ** 2 * len(VOCABULARY))]
+                for _ in range(rng.randint(3, 6))
+            ]
+            yield n, " ".join(words).title(), rng.randrange(authors), 10
+
+    db.executemany("INSERT INTO book VALUES (?, ?, ?, ?)", titles())
+    db.commit()
+
+
+def timed(operation, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = operation()
+    return (time.perf_counter() - started) / repeats, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=500_000)
+    parser.add_argument("--authors", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    searches = [
+        ("common word", "shadow"),
+        ("rare word", "word19999"),
+        ("prefix", "gardenk"),
+        ("two words", "river crown"),
+        ("author", "surname42"),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        db = connect(os.path.join(directory, "ebookstore.db"))
+        fill_catalogue(db, args.books, args.authors)
+        built, _ = timed(lambda: create_search_index(db), 1)
+        db.commit()
+        print(f"{args.books} books, {args.authors} authors")
+        print(f"index build {built:.1f}s\n")
+
+        print(f"{'search':>12} {'fts (ms)':>9} {'like (ms)':>10} {'matches':>8}")
+        for name, text in searches:
+            fast, found = timed(lambda: search_books(db, text), args.repeats)
+            slow, _ = timed(
+                lambda: db.execute(
+                    "SELECT * FROM book WHERE title LIKE ?", ("%" + text + "%",)
+                ).fetchall(),
+                1,
+            )
+            print(
+                f"{name:>12} {fast * 1000:>9.2f} {slow * 1000:>10.1f} "
+                f"{len(found):>8}"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
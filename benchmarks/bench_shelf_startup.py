@@ -0,0 +1,112 @@
+"""
+Benchmarks ebookstore startup and author lookups as the catalogue grows.
+
+For each catalogue size a database is created the way shelf_track.py used to
+create it, without a schema version or indexes. The benchmark then times:
+  - the old startup: creating the tables if missing, re-inserting the sample
+    rows and committing, as every launch did;
+  - the one-time migration of that database to the current schema;
+  - startup once the database is current: connecting and checking the
+    schema version;
+  - the books-by-author query behind 'search for an author', before and
+    after the migration adds its index.
+
+Run from the repository root:
+    python -m benchmarks.bench_shelf_startup --books 10000 1000000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from shelf_db import SEED_AUTHORS, SEED_BOOKS, connect, migrate
+
+AUTHORS = 10_000
+REPEATS = 20
+
+
+def old_startup(path):
+    """The statements shelf_track.py ran at every launch before migrations."""
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS book(id INTEGER PRIMARY KEY, "
+        "title TEXT NOT NULL, authorid INTEGER NOT NULL, qty INTEGER NOT NULL)"
+    )
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS author(id INTEGER PRIMARY KEY, "
+        "name TEXT NOT NULL, country TEXT NOT NULL)"
+    )
+    db.executemany("INSERT OR IGNORE INTO book VALUES (?, ?, ?, ?)", SEED_BOOKS)
+    db.executemany("INSERT OR IGNORE INTO author VALUES (?, ?, ?)", SEED_AUTHORS)
+    db.commit()
+    db.close()
+
+
+def current_startup(path):
+    db = connect(path)
+    migrate(db)
+    db.close()
+
+
+def fill_catalogue(path, books):
+    old_startup(path)
+    db = sqlite3.connect(path)
+    db.executemany(
+        "INSERT OR IGNORE INTO author VALUES (?, ?, ?)",
+        ((n, f"Author {n}", "England") for n in range(AUTHORS)),
+    )
+    db.executemany(
+        "INSERT OR IGNORE INTO book VALUES (?, ?, ?, ?)",
+        ((n, f"Book {n}", n % AUTHORS, 10) for n in range(books)),
+    )
+    db.commit()
+    db.close()
+
+
+def timed(operation, repeats=REPEATS):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        operation()
+    return (time.perf_counter() - started) / repeats
+
+
+def author_lookup(path):
+    db = connect(path)
+
+    def query():
+        return db.execute(
+            "SELECT title, qty FROM book WHERE authorid = ?", (42,)
+        ).fetchall()
+
+    elapsed = timed(query)
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, nargs="+", default=[10_000, 500_000])
+    args = parser.parse_args()
+
+    print(
+        f"{'books':>9} {'old start (ms)':>15} {'migrate (s)':>12} "
+        f"{'start (ms)':>11} {'author scan (ms)':>17} {'author index (ms)':>18}"
+    )
+    for books in args.books:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ebookstore.db")
+            fill_catalogue(path, books)
+            old = timed(lambda: old_startup(path))
+            scan = author_lookup(path)
+            migrated = timed(lambda: current_startup(path), 1)
+            start = timed(lambda: current_startup(path))
+            indexed = author_lookup(path)
+        print(
+            f"{books:>9} {old * 1000:>15.2f} {migrated:>12.2f} "
+            f"{start * 1000:>11.2f} {scan * 1000:>17.2f} {indexed * 1000:>18.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmarks task manager import and startup time as the data files grow.
+
+For each scale a temporary directory is filled with a user.txt and a
+tasks.txt of the given size. The benchmark then times, in a fresh
+interpreter, importing task_manager and creating a TaskService. Neither
+should read the data files, so the times should stay flat across scales.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --scales 1000 100000 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+started = time.perf_counter()
+import task_manager
+imported = time.perf_counter()
+from task_service import TaskService
+TaskService()
+created = time.perf_counter()
+print(imported - started, created - imported)
+"""
+
+
+def write_data(directory, rows):
+    """Writes a user.txt and a legacy tasks.txt with `rows` lines each."""
+    with open(os.path.join(directory, "user.txt"), "w", encoding="utf-8") as users:
+        users.write("admin, adm1n\n")
+        for n in range(rows):
+            users.write(f"user{n}, password{n}\n")
+    with open(os.path.join(directory, "tasks.txt"), "w", encoding="utf-8") as tasks:
+        for n in range(rows):
+            tasks.write(
+                f"user{n % 100}, Task {n}, Description {n}, "
+                "01 Jan 2025, 01 Feb 2025, No\n"
+            )
+
+
+def probe(directory, repeats):
+    """Returns the best (import, service creation) times over `repeats` runs."""
+    env = dict(os.environ, PYTHONPATH=REPO, PYTHONDONTWRITEBYTECODE="1")
+    best = None
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=directory,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        times = tuple(float(value) for value in output.split())
+        best = times if best is None else tuple(map(min, best, times))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'import (ms)':>12} {'service (ms)':>13}")
+    for rows in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            write_data(directory, rows)
+            imported, created = probe(directory, args.repeats)
+        print(f"{rows:>10} {imported * 1000:>12.2f} {created * 1000:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
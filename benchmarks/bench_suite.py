@@ -0,0 +1,216 @@
+"""
+Times the task manager's menu operations on generated data at several scales.
+
+For each scale a temporary directory is filled with a synthetic user.txt and
+tasks.txt (see generate_data.py), and a TaskService is opened on it. The
+suite then times, without any prompts, what each menu option does:
+  - importing tasks.txt into the task store on first use;
+  - 'va' and 'vm': the first page of all tasks and of one user's tasks, for
+    the busiest and the least busy user, and walking every page of 'va';
+  - 'vm' edits: completing a task and changing a due date;
+  - 'del': deleting a task;
+  - 'gr': regenerating the reports, and serving them from the report cache;
+  - 'ds': computing and formatting the statistics.
+
+Each operation is repeated and its mean, median, 95th percentile and worst
+time are printed. With --output, the results are also appended to a JSON
+Lines file as one object per run, tagged with the git commit, so that runs
+from different versions can be compared.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --scales 1000 100000 1000000 \
+        --output bench_results.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+from benchmarks.generate_data import generate
+from task_manager import format_task
+from task_report_cache import ReportCache
+from task_reports import format_task_overview, format_user_overview
+from task_service import TaskService
+from task_sqlite import migrate
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    """Returns the repository's current commit, or None outside git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarise(samples):
+    """Returns timing statistics in milliseconds for a list of seconds."""
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def sample(operation, repeats):
+    """Times `repeats` calls to operation, each with its repeat number."""
+    samples = []
+    for n in range(repeats):
+        started = time.perf_counter()
+        operation(n)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def pick_tasks(service, count, rng):
+    """Returns IDs of up to `count` distinct incomplete tasks."""
+    last = len(service.store)  # Fresh data, so IDs run from 1 without gaps.
+    picked = set()
+    for _ in range(count * 20):
+        task_id = rng.randint(1, last)
+        task = service.get_task(task_id)
+        if task is not None and not task.completed:
+            picked.add(task_id)
+            if len(picked) == count:
+                break
+    return list(picked)
+
+
+def show_page(service, **filters):
+    """Fetches and formats one page, as 'va' and 'vm' display it."""
+    page, _ = service.list_tasks(0, **filters)
+    return [format_task(task_id, task) for task_id, task in page]
+
+
+def walk_pages(service):
+    """Fetches and formats every page of 'va'."""
+    cursor = 0
+    while cursor is not None:
+        page, cursor = service.list_tasks(cursor)
+        for task_id, task in page:
+            format_task(task_id, task)
+
+
+def show_statistics(service):
+    counters = service.statistics()
+    format_task_overview(counters)
+    format_user_overview(counters, len(service.credentials))
+
+
+def run_scale(tasks, users, args):
+    """Runs every operation on one scale and returns {operation: stats}."""
+    generate(".", tasks, users, args.skew)
+    service = TaskService(backend=args.backend)
+    rng = random.Random(1)
+    repeats = args.repeats
+    results = {}
+
+    started = time.perf_counter()
+    if args.backend == "sqlite":
+        migrate(service.db_path)
+    service.store  # With the task log, the first access imports tasks.txt.
+    results["import tasks.txt"] = [time.perf_counter() - started]
+
+    busiest, quietest = "user0", f"user{users - 1}"
+    # Mutations use their own tasks so each repeat changes a different one.
+    changed = pick_tasks(service, 3 * repeats, rng)
+    completing, editing, deleting = (
+        changed[:repeats], changed[repeats:2 * repeats], changed[2 * repeats:]
+    )
+    new_due = date.today().isoformat()
+    cache = ReportCache(service)
+    operations = [
+        ("va first page", lambda n: show_page(service)),
+        ("vm busiest user", lambda n: show_page(service, assigned_to=busiest)),
+        ("vm quietest user", lambda n: show_page(service, assigned_to=quietest)),
+        ("complete task", lambda n: service.complete_task(completing[n])),
+        ("edit due date", lambda n: service.edit_task(editing[n], due_date=new_due)),
+        ("delete task", lambda n: service.delete_task(deleting[n])),
+        ("ds statistics", lambda n: show_statistics(service)),
+    ]
+    for name, operation in operations:
+        if name in ("complete task", "edit due date", "delete task"):
+            count = min(repeats, len(completing), len(editing), len(deleting))
+        else:
+            count = repeats
+        results[name] = sample(operation, count)
+
+    slow_repeats = args.slow_repeats
+    results["va every page"] = sample(lambda n: walk_pages(service), slow_repeats)
+    results["gr regenerate"] = sample(
+        lambda n: service.generate_reports(), slow_repeats
+    )
+    cache.refresh()
+    results["gr cached"] = sample(lambda n: cache.refresh(), repeats)
+    service.close()
+    return {name: summarise(samples) for name, samples in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--backend", choices=["log", "sqlite"], default="log")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--slow-repeats", type=int, default=3)
+    parser.add_argument("--output", help="JSON Lines file to append results to")
+    args = parser.parse_args()
+
+    run = {
+        "suite": "task_manager",
+        "commit": git_commit(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "users": args.users,
+        "skew": args.skew,
+        "scales": {},
+    }
+    original = os.getcwd()
+    for tasks in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                run["scales"][str(tasks)] = run_scale(tasks, args.users, args)
+            finally:
+                os.chdir(original)
+
+    for tasks, results in run["scales"].items():
+        print(f"\n{tasks} tasks, {args.users} users ({args.backend})")
+        print(
+            f"{'operation':>18} {'n':>4} {'mean (ms)':>10} {'p50 (ms)':>10} "
+            f"{'p95 (ms)':>10} {'max (ms)':>10}"
+        )
+        for name, stats in results.items():
+            print(
+                f"{name:>18} {stats['n']:>4} {stats['mean_ms']:>10.3f} "
+                f"{stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                f"{stats['max_ms']:>10.3f}"
+            )
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as output:
+            output.write(json.dumps(run) + "\n")
+        print(f"\nResults appended to '{args.output}'.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmarks trend queries over the daily snapshot history.
+
+A temporary history of synthetic daily snapshots is written, one per day for
+every user. The benchmark times loading it into prefix arrays and answering
+date-range queries of several lengths, and compares each query with summing
+the snapshots in the range directly.
+
+Run from the repository root:
+    python -m benchmarks.bench_trends --days 730 --users 1000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from task_reports import ReportCounters
+from task_trends import TaskHistory
+
+
+def timed(operation, repeats=1):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = operation()
+    return (time.perf_counter() - started) / repeats, result
+
+
+def write_history(history, days, users):
+    """Records one synthetic snapshot per day and returns them all."""
+    rng = random.Random(1)
+    first = date(2024, 1, 1)
+    counts = {f"user{n}": [0, 0, 0] for n in range(users)}
+    snapshots = []
+    for offset in range(days):
+        for user_counts in counts.values():
+            added = rng.randrange(3)
+            user_counts[0] += added
+            user_counts[1] = min(user_counts[0], user_counts[1] + rng.randrange(3))
+            user_counts[2] = rng.randrange(user_counts[0] - user_counts[1] + 1)
+        counters = ReportCounters(first + timedelta(days=offset))
+        counters.users = counts
+        history.record(counters)
+        snapshots.append({user: list(c) for user, c in counts.items()})
+    return first, snapshots
+
+
+def summed(snapshots, first, last):
+    """Per-user sums over a range of snapshots, computed directly."""
+    totals = {}
+    for snapshot in snapshots[first:last + 1]:
+        for user, counts in snapshot.items():
+            mine = totals.setdefault(user, [0, 0, 0])
+            for position, count in enumerate(counts):
+                mine[position] += count
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            history = TaskHistory()
+            first, snapshots = write_history(history, args.days, args.users)
+            size = os.path.getsize(history.path)
+            loaded, _ = timed(history.load)
+            print(
+                f"{args.days} days, {args.users} users, "
+                f"history {size / 1e6:.1f} MB"
+            )
+            print(f"load into prefix arrays: {loaded * 1000:.1f} ms\n")
+            print(f"{'range (days)':>12} {'prefix (ms)':>12} {'summed (ms)':>12}")
+            lengths = sorted({min(n, args.days) for n in (7, 30, 90, args.days)})
+            for length in lengths:
+                start = first + timedelta(days=args.days - length)
+                end = start + timedelta(days=length - 1)
+                fast, _ = timed(
+                    lambda: list(history.trends(start, end)), args.repeats
+                )
+                slow, _ = timed(
+                    lambda: summed(snapshots, args.days - length, args.days - 1)
+                )
+                print(f"{length:>12} {fast * 1000:>12.2f} {slow * 1000:>12.2f}")
+        finally:
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    main()
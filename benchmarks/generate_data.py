@@ -0,0 +1,124 @@
+"""
+Generates a synthetic user.txt and tasks.txt for benchmarking.
+
+The files use the formats the task manager reads: 'user.txt' holds one
+'username, password' line per user, and 'tasks.txt' holds legacy
+', '-separated task lines, which are imported into the task store the first
+time it is opened. The data is shaped like a real team's:
+  - assignees follow a Zipf distribution, so a few users own most tasks;
+  - dates mix the 'DD Mon YYYY' and ISO formats, with a small share of
+    unparseable due dates;
+  - about a third of the tasks are completed, and due dates fall on either
+    side of today so that some incomplete tasks are overdue.
+
+The passwords are 'password' followed by the user number. They are hashed
+with a deliberately low PBKDF2 work factor so that generating thousands of
+users stays fast; use --hash-iterations 0 to leave them in plain text.
+The files go to the 'data' directory unless --out names another.
+
+Run from the repository root:
+    python -m benchmarks.generate_data --tasks 1000000 --users 1000 --out data
+"""
+import argparse
+import os
+import random
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate
+
+from task_auth import Credentials
+from task_dates import DISPLAY_FORMAT
+
+ISO_FORMAT = "%Y-%m-%d"
+INVALID_DATE = "31 Feb 2025"
+
+
+def write_users(path, users, hash_iterations=1000):
+    """
+    Writes 'admin' and `users` numbered users to a user file.
+
+    Parameters:
+        path (str): The user file to write.
+        users (int): Number of users besides the admin.
+        hash_iterations (int): PBKDF2 work factor for the stored hashes; 0
+            leaves the passwords in plain text.
+    """
+    with open(path, "w", encoding="utf-8") as user_file:
+        user_file.write("admin, password\n")
+        for n in range(users):
+            user_file.write(f"user{n}, password{n}\n")
+    if hash_iterations:
+        Credentials(path).upgrade(hash_iterations)
+
+
+def assignee_weights(users, skew):
+    """Returns cumulative Zipf weights for users ranked 0 to users - 1."""
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(users)))
+
+
+def task_lines(count, users, skew=1.0, invalid=0.001, today=None, seed=1):
+    """
+    Yields synthetic legacy task lines.
+
+    Parameters:
+        count (int): Number of tasks.
+        users (int): Number of users the tasks are spread over.
+        skew (float): Zipf exponent of the assignee distribution; 0 spreads
+            tasks evenly.
+        invalid (float): Share of tasks with an unparseable due date.
+        today (date): The date due dates are spread around.
+        seed (int): Seed for the random generator.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    weights = assignee_weights(users, skew)
+    total_weight = weights[-1]
+    # Formatting every date is slow, so format each day once per style.
+    first = today - timedelta(days=730)
+    days = [first + timedelta(days=n) for n in range(1095)]
+    styles = [
+        [day.strftime(DISPLAY_FORMAT) for day in days],
+        [day.strftime(ISO_FORMAT) for day in days],
+    ]
+    for n in range(count):
+        user = bisect(weights, rng.random() * total_weight)
+        assigned = rng.randrange(730)
+        due = assigned + rng.randrange(365)
+        style = styles[rng.random() < 0.5]
+        due_text = INVALID_DATE if rng.random() < invalid else style[due]
+        completed = "Yes" if rng.random() < 1 / 3 else "No"
+        yield (
+            f"user{user}, Task {n}, Synthetic task number {n}, "
+            f"{style[assigned]}, {due_text}, {completed}\n"
+        )
+
+
+def generate(directory, tasks, users, skew=1.0, hash_iterations=1000, seed=1):
+    """Writes user.txt and tasks.txt into a directory."""
+    os.makedirs(directory, exist_ok=True)
+    write_users(os.path.join(directory, "user.txt"), users, hash_iterations)
+    with open(
+        os.path.join(directory, "tasks.txt"), "w", encoding="utf-8"
+    ) as tasks_file:
+        tasks_file.writelines(task_lines(tasks, users, skew, seed=seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.0)
+    parser.add_argument("--hash-iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    # Never the repository root, whose user.txt and tasks.txt are real data.
+    parser.add_argument("--out", default="data", help="directory to write into")
+    args = parser.parse_args()
+
+    generate(
+        args.out, args.tasks, args.users, args.skew, args.hash_iterations, args.seed
+    )
+    print(f"Wrote {args.users + 1} users and {args.tasks} tasks to '{args.out}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Streaming row readers shared by the bulk import commands.
+
+task_bulk (tasks) and shelf_import (ebookstore books) both accept CSV files
+with a header row and JSONL files of one object per line. Rows are yielded
+one at a time with their line number, so callers can report rejected rows
+without holding the file in memory.
+"""
+import csv
+import json
+
+
+def detect_format(path, fmt=None):
+    """Returns 'jsonl' or 'csv', from an explicit choice or the file suffix."""
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+
+
+def read_rows(path, fmt):
+    """Streams (line number, row dict) pairs from a CSV or JSONL file."""
+    with open(path, "r", encoding="utf-8", newline="") as source:
+        if fmt == "csv":
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
@@ -0,0 +1,226 @@
+"""
+Connection management for the ebookstore database.
+
+Opening a SQLite connection is cheap, but every new connection starts with
+an empty page cache and has to prepare its statements again. ConnectionPool
+keeps one long-lived connection per thread instead, tuned for this workload:
+  - WAL journaling, so readers never block the writer;
+  - synchronous=NORMAL, which in WAL mode syncs at checkpoints rather than on
+    every commit, while still never corrupting the database;
+  - a 64 MiB page cache and a 256 MiB memory map, so hot pages stay in
+    memory between operations;
+  - a larger prepared-statement cache, so repeated queries skip parsing.
+
+Callers acquire() the calling thread's connection and release() it when done.
+Releasing rolls back anything left uncommitted, just as closing a connection
+did, so an operation that fails part way never leaks its changes into the
+next one.
+
+The schema is versioned with SQLite's user_version. migrate() applies the
+MIGRATIONS the database has not had yet, in order and in one transaction,
+so on an up-to-date database startup costs a single pragma read whatever
+the size of the catalogue. The sample books and authors are only inserted
+when the tables are first created.
+"""
+import sqlite3
+import threading
+
+from shelf_search import (
+    UPDATE_TRIGGER,
+    create_search_index,
+    drop_search_index,
+    has_search_index,
+)
+
+DB_FILE = "ebookstore.db"
+
+# Seconds a writer waits for another connection's transaction to finish.
+BUSY_TIMEOUT = 30
+
+# A negative cache_size is in KiB.
+CACHE_KIB = 64 * 1024
+MMAP_BYTES = 256 << 20
+STATEMENT_CACHE = 512
+
+SEED_BOOKS = [
+    (3001, "A Tale of Two Cities", 1290, 30),
+    (3002, "Harry Potter and the Philosopher's Stone", 8937, 40),
+    (3003, "The Lion, the Witch and the Wardrobe", 2356, 25),
+    (3004, "The Lord of the Rings", 6380, 37),
+    (3055, "Alice's Adventures in Wonderland", 5620, 12),
+    (8207, "Verity", 3978, 18),
+    (8208, "It Ends with Us", 3978, 22),
+    (8210, "The Other Side of Midnight", 8211, 12),
+    (8211, "Master of the Game", 8211, 20),
+    (8209, "Reminders of Him", 3978, 15),
+    (8212, "If Tomorrow Comes", 8211, 17)
+]
+
+SEED_AUTHORS = [
+    (1290, "Charles Dickens", "England"),
+    (8937, "J.K. Rowling", "England"),
+    (2356, "C.S. Lewis", "Ireland"),
+    (6380, "J.R.R. Tolkien", "South Africa"),
+    (5620, "Lewis Carroll", "England"),
+    (3978, "Colleen Hoover", "America"),
+    (8211, "Sidney Sheldon", "United States")
+]
+
+
+def connect(path=DB_FILE):
+    """Opens a connection to the database with the tuned settings."""
+    db = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT,
+        cached_statements=STATEMENT_CACHE,
+        # The pool hands each connection to one thread only, but closes them
+        # all from whichever thread shuts it down.
+        check_same_thread=False,
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    db.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+    return db
+
+
+# ---- Schema migrations ----
+def _create_tables(db):
+    """Version 1: the book and author tables, seeded if they are new."""
+    fresh = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'book'"
+    ).fetchone() is None
+    db.execute('''CREATE TABLE IF NOT EXISTS book(
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        authorid INTEGER NOT NULL,
+        qty INTEGER NOT NULL
+    )''')
+    db.execute('''CREATE TABLE IF NOT EXISTS author(
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        country TEXT NOT NULL
+    )''')
+    if fresh:
+        db.executemany("INSERT OR IGNORE INTO book VALUES (?, ?, ?, ?)", SEED_BOOKS)
+        db.executemany("INSERT OR IGNORE INTO author VALUES (?, ?, ?)", SEED_AUTHORS)
+
+
+def _add_indexes(db):
+    """Version 2: indexes for author lookups and joins, and for titles."""
+    db.execute("CREATE INDEX IF NOT EXISTS book_by_author ON book (authorid)")
+    db.execute("CREATE INDEX IF NOT EXISTS book_by_title ON book (title)")
+
+
+def _add_search_index(db):
+    """Version 3: the full-text search table (see shelf_search)."""
+    if not has_search_index(db):
+        create_search_index(db)
+
+
+def _skip_unchanged_search_updates(db):
+    """Version 4: re-index a book only when its title or author changes."""
+    if has_search_index(db):
+        db.execute("DROP TRIGGER IF EXISTS book_search_update")
+        db.execute(UPDATE_TRIGGER)
+
+
+MIGRATIONS = [
+    _create_tables,
+    _add_indexes,
+    _add_search_index,
+    _skip_unchanged_search_updates,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(db):
+    """Returns the number of migrations the database has had."""
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db):
+    """
+    Brings the database schema up to SCHEMA_VERSION.
+
+    The pending migrations and the new version number are committed
+    together, so a failed migration leaves the database as it was. The
+    write lock is taken before the version is checked again, so processes
+    starting at the same time apply each migration once.
+
+    Returns:
+        int: The number of migrations applied.
+    """
+    if schema_version(db) >= SCHEMA_VERSION:
+        return 0
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        version = schema_version(db)
+        for migration in MIGRATIONS[version:]:
+            migration(db)
+        db.execute(f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}")
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return max(SCHEMA_VERSION - version, 0)
+
+
+def drop_indexes(db):
+    """
+    Drops the secondary indexes and the search table ahead of a bulk load.
+
+    The schema version is wound back to 1 in the same transaction, so the
+    next migrate() rebuilds everything dropped here in a single pass, even
+    if the load in between fails or is interrupted.
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DROP INDEX IF EXISTS book_by_author")
+        db.execute("DROP INDEX IF EXISTS book_by_title")
+        drop_search_index(db)
+        db.execute("PRAGMA user_version = 1")
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+class ConnectionPool:
+    """
+    Hands out one long-lived connection per thread.
+
+    Parameters:
+        path (str): The database file.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def acquire(self):
+        """Returns the calling thread's connection, opening it on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = connect(self.path)
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def release(self, db):
+        """Ends an operation, rolling back anything it did not commit."""
+        if db.in_transaction:
+            db.rollback()
+
+    def close(self):
+        """Closes every connection the pool has opened."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+
+pool = ConnectionPool()
@@ -0,0 +1,207 @@
+"""
+Non-interactive bulk catalogue import for the ebookstore.
+
+Imports stream a CSV or JSONL file one row at a time and validate each row
+in the same pass. Authors are given by name and resolved to IDs through an
+in-memory map of the author table, loaded once up front; names not seen
+before become new authors. Valid rows are upserted in chunks of CHUNK_ROWS,
+each chunk one transaction of two executemany calls, so books whose ID is
+already in the catalogue are updated in place and re-running an import that
+was interrupted part way is safe.
+
+Both formats use the columns id, title, author, country and qty. country is
+optional: it sets the country of the book's author, and new authors without
+one are recorded with DEFAULT_COUNTRY.
+
+For very large loads, --rebuild-indexes drops the secondary indexes and the
+search table first and rebuilds them once the rows are in, rather than
+updating them row by row.
+
+Usage (from the directory holding ebookstore.db):
+    python shelf_import.py new_books.csv
+    python shelf_import.py catalogue.jsonl --rebuild-indexes
+"""
+import argparse
+import sys
+import time
+from itertools import islice
+
+from bulk_rows import detect_format, read_rows
+from shelf_db import DB_FILE, connect, drop_indexes, migrate
+
+COLUMNS = ["id", "title", "author", "country", "qty"]
+REQUIRED = ["id", "title", "author", "qty"]
+DEFAULT_COUNTRY = "Unknown"
+CHUNK_ROWS = 50_000
+
+UPSERT_AUTHOR = """
+INSERT INTO author (id, name, country) VALUES (?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET country = excluded.country
+WHERE country IS NOT excluded.country
+"""
+
+UPSERT_BOOK = """
+INSERT INTO book (id, title, authorid, qty) VALUES (?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title, authorid = excluded.authorid, qty = excluded.qty
+WHERE (title, authorid, qty)
+    IS NOT (excluded.title, excluded.authorid, excluded.qty)
+"""
+
+
+def validate_row(row):
+    """
+    Converts one imported row to the values it holds.
+
+    Parameters:
+        row (dict): The row's columns, or None if it could not be decoded.
+
+    Returns:
+        tuple: ((id, title, author, country, qty), None) for a valid row,
+            or (None, reason) otherwise. country is '' if not given.
+    """
+    if row is None:
+        return None, "unreadable row"
+    # JSONL values may be numbers, and a quantity of 0 is not a missing one.
+    values = {
+        column: "" if row.get(column) is None else str(row[column]).strip()
+        for column in COLUMNS
+    }
+    missing = [column for column in REQUIRED if not values[column]]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    try:
+        book_id = int(values["id"])
+    except ValueError:
+        book_id = 0
+    if book_id < 1:
+        return None, f"invalid id '{values['id']}'"
+
+    try:
+        qty = int(values["qty"])
+    except ValueError:
+        qty = -1
+    if qty < 0:
+        return None, f"invalid quantity '{values['qty']}'"
+
+    book = (book_id, values["title"], values["author"], values["country"], qty)
+    return book, None
+
+
+def load_authors(db):
+    """
+    Maps every author's name to their ID.
+
+    Where several authors share a name the lowest ID is used.
+
+    Returns:
+        tuple: (dict of name to ID, the next free author ID).
+    """
+    authors = {}
+    next_id = 1
+    for author_id, name in db.execute(
+        "SELECT id, name FROM author ORDER BY id DESC"
+    ):
+        authors[name] = author_id
+        next_id = max(next_id, author_id + 1)
+    return authors, next_id
+
+
+def import_books(db, path, fmt=None, rejected=None, rebuild_indexes=False):
+    """
+    Streams books from a CSV or JSONL file into the catalogue.
+
+    Parameters:
+        db (sqlite3.Connection): The ebookstore database, already migrated.
+        path (str): The file to import.
+        fmt (str): 'csv' or 'jsonl'; detected from the suffix if omitted.
+        rejected (list): If given, receives (line number, reason) for every
+            row that failed validation.
+        rebuild_indexes (bool): Drop the secondary indexes and the search
+            table for the load and rebuild them once at the end.
+
+    Returns:
+        tuple: (books imported, new authors added).
+    """
+    authors, next_id = load_authors(db)
+    first_new_id = next_id
+
+    def valid_books():
+        for line_number, row in read_rows(path, detect_format(path, fmt)):
+            book, reason = validate_row(row)
+            if book is not None:
+                yield book
+            elif rejected is not None:
+                rejected.append((line_number, reason))
+
+    books = valid_books()
+    imported = 0
+    # Reading the first chunk before dropping anything leaves the indexes
+    # alone if the file is missing or holds no valid rows.
+    chunk = list(islice(books, CHUNK_ROWS))
+    if rebuild_indexes and chunk:
+        drop_indexes(db)
+    try:
+        while chunk:
+            author_rows = {}
+            book_rows = []
+            for book_id, title, name, country, qty in chunk:
+                author_id = authors.get(name)
+                if author_id is None:
+                    author_id = authors[name] = next_id
+                    next_id += 1
+                    country = country or DEFAULT_COUNTRY
+                if country:
+                    author_rows[author_id] = (author_id, name, country)
+                book_rows.append((book_id, title, author_id, qty))
+            with db:
+                db.executemany(UPSERT_AUTHOR, author_rows.values())
+                db.executemany(UPSERT_BOOK, book_rows)
+            imported += len(book_rows)
+            chunk = list(islice(books, CHUNK_ROWS))
+    finally:
+        if rebuild_indexes:
+            migrate(db)
+    return imported, next_id - first_new_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import books.")
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], dest="fmt")
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help="drop the indexes for the load and rebuild them afterwards",
+    )
+    args = parser.parse_args(argv)
+
+    db = connect(DB_FILE)
+    rejected = []
+    started = time.perf_counter()
+    try:
+        migrate(db)
+        count, new_authors = import_books(
+            db, args.path, args.fmt, rejected, args.rebuild_indexes
+        )
+    except FileNotFoundError:
+        print(f"Error: '{args.path}' file not found.")
+        return 1
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    for line_number, reason in rejected:
+        print(f"Rejected line {line_number}: {reason}")
+    print(f"Rejected {len(rejected)} row(s).")
+    rate = count / elapsed if elapsed else 0
+    print(
+        f"Imported {count} book(s) and {new_authors} new author(s) in "
+        f"{elapsed:.2f}s ({rate:,.0f} books/s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Full-text title search for the ebookstore.
+
+'book_search' is an FTS5 table holding each book's title and its author's
+name under the book's ID. Triggers on 'book' and 'author' keep it in step
+with every insert, update and delete, so it never needs rebuilding outside
+of bulk imports (see shelf_import).
+
+search_books matches every word typed as a prefix of a word in the title or
+the author's name, so 'lord ring' finds 'The Lord of the Rings' and 'tolk'
+finds Tolkien's books. Results are ranked by BM25 with title matches
+weighted above author matches, and only the best `limit` are fetched.
+
+SQLite builds without FTS5 fall back to the original LIKE scan of titles.
+"""
+import re
+import sqlite3
+
+SEARCH_LIMIT = 20
+
+# BM25 weights for the title and author columns.
+TITLE_WEIGHT = 10.0
+AUTHOR_WEIGHT = 1.0
+
+_WORD = re.compile(r"\w+")
+
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE book_search USING fts5(
+    title, author, tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# Upserts name every column, so only rows whose indexed values actually
+# change are re-indexed.
+UPDATE_TRIGGER = """
+CREATE TRIGGER book_search_update
+AFTER UPDATE OF id, title, authorid ON book
+WHEN old.id IS NOT new.id OR old.title IS NOT new.title
+    OR old.authorid IS NOT new.authorid
+BEGIN
+    DELETE FROM book_search WHERE rowid = old.id;
+    INSERT INTO book_search (rowid, title, author) VALUES (
+        new.id,
+        new.title,
+        coalesce((SELECT name FROM author WHERE id = new.authorid), '')
+    );
+END
+"""
+
+SEARCH_TRIGGERS = [
+    """
+CREATE TRIGGER book_search_insert AFTER INSERT ON book BEGIN
+    INSERT INTO book_search (rowid, title, author) VALUES (
+        new.id,
+        new.title,
+        coalesce((SELECT name FROM author WHERE id = new.authorid), '')
+    );
+END
+""",
+    UPDATE_TRIGGER,
+    """
+CREATE TRIGGER book_search_delete AFTER DELETE ON book BEGIN
+    DELETE FROM book_search WHERE rowid = old.id;
+END
+""",
+    """
+CREATE TRIGGER book_search_author_insert
+AFTER INSERT ON author BEGIN
+    UPDATE book_search SET author = new.name
+    WHERE rowid IN (SELECT id FROM book WHERE authorid = new.id);
+END
+""",
+    """
+CREATE TRIGGER book_search_author_update
+AFTER UPDATE OF id, name ON author BEGIN
+    UPDATE book_search SET author = ''
+    WHERE rowid IN (SELECT id FROM book WHERE authorid = old.id);
+    UPDATE book_search SET author = new.name
+    WHERE rowid IN (SELECT id FROM book WHERE authorid = new.id);
+END
+""",
+    """
+CREATE TRIGGER book_search_author_delete
+AFTER DELETE ON author BEGIN
+    UPDATE book_search SET author = ''
+    WHERE rowid IN (SELECT id FROM book WHERE authorid = old.id);
+END
+""",
+]
+
+BACKFILL = """
+INSERT INTO book_search (rowid, title, author)
+SELECT book.id, book.title, coalesce(author.name, '')
+FROM book LEFT JOIN author ON author.id = book.authorid
+"""
+
+
+def has_search_index(db):
+    """Returns True if the database has the book_search table."""
+    return db.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'book_search'"
+    ).fetchone() is not None
+
+
+def create_search_index(db):
+    """
+    Creates the search table and its triggers and indexes every book.
+
+    The statements run in the caller's transaction; shelf_db applies this
+    as one of its schema migrations. Nothing is created if SQLite lacks
+    FTS5.
+
+    Returns:
+        bool: True if the table was created.
+    """
+    try:
+        db.execute(SEARCH_TABLE)
+    except sqlite3.OperationalError as error:
+        if "fts5" not in str(error):
+            raise
+        return False
+    for trigger in SEARCH_TRIGGERS:
+        db.execute(trigger)
+    db.execute(BACKFILL)
+    return True
+
+
+def drop_search_index(db):
+    """
+    Drops the search table and its triggers, in the caller's transaction.
+
+    Bulk loads use this so that rows are indexed in one pass afterwards
+    rather than one trigger at a time; create_search_index restores it.
+    """
+    triggers = db.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'trigger' AND name GLOB 'book_search_*'"
+    ).fetchall()
+    for (name,) in triggers:
+        db.execute(f"DROP TRIGGER {name}")
+    db.execute("DROP TABLE IF EXISTS book_search")
+
+
+def fts_query(text):
+    """
+    Turns typed search text into an FTS5 query.
+
+    Each word becomes a quoted prefix term, so punctuation in the text can
+    never be read as query syntax, and all of the words must match.
+
+    Returns:
+        str: The query, or None if the text holds no words.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_books(db, text, limit=SEARCH_LIMIT):
+    """
+    Finds the books best matching some search text.
+
+    Parameters:
+        db (sqlite3.Connection): The ebookstore database.
+        text (str): Words to look for in titles and author names.
+        limit (int): The maximum number of books to return.
+
+    Returns:
+        list: (id, title, authorid, qty) rows, best match first.
+    """
+    if not has_search_index(db):
+        return db.execute(
+            "SELECT * FROM book WHERE title LIKE ? LIMIT ?",
+            ("%" + text + "%", limit),
+        ).fetchall()
+    query = fts_query(text)
+    if query is None:
+        return []
+    return db.execute(
+        "SELECT book.id, book.title, book.authorid, book.qty "
+        "FROM book_search JOIN book ON book.id = book_search.rowid "
+        "WHERE book_search MATCH ? "
+        "ORDER BY bm25(book_search, ?, ?) LIMIT ?",
+        (query, TITLE_WEIGHT, AUTHOR_WEIGHT, limit),
+    ).fetchall()
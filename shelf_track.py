@@ -1,60 +1,18 @@
 """
-Imports the sqlite3 module to enable interaction with a local SQLite database.
-Used throughout the program to connect to 'ebookstore.db', execute SQL
-commands, and manage book inventory data persistently.
+Ebookstore clerk system: a menu for managing the book inventory in
+'ebookstore.db'.
+
+Every operation uses the calling thread's long-lived connection from
+shelf_db.pool, rather than opening and closing a connection of its own. The
+schema is created or upgraded on startup by shelf_db.migrate.
 """
-import sqlite3
-
-# Connect or create database
-conn = sqlite3.connect('ebookstore.db')
-cursor = conn.cursor()
-
-# Create the book table
-cursor.execute('''CREATE TABLE IF NOT EXISTS book(
-    id INTEGER PRIMARY KEY,
-    title TEXT NOT NULL,
-    authorid INTEGER NOT NULL,
-    qty INTEGER NOT NULL
-)''')
-
-# Create author table
-cursor.execute('''CREATE TABLE IF NOT EXISTS author(
-    id INTEGER PRIMARY KEY,
-    name TEXT NOT NULL,
-    country TEXT NOT NULL
-)''')
-
-# Insert initial data
-books = [
-    (3001, "A Tale of Two Cities", 1290, 30),
-    (3002, "Harry Potter and the Philosopher's Stone", 8937, 40),
-    (3003, "The Lion, the Witch and the Wardrobe", 2356, 25),
-    (3004, "The Lord of the Rings", 6380, 37),
-    (3055, "Alice's Adventures in Wonderland", 5620, 12),
-    (8207, "Verity", 3978, 18),
-    (8208, "It Ends with Us", 3978, 22),
-    (8210, "The Other Side of Midnight", 8211, 12),
-    (8211, "Master of the Game", 8211, 20),
-    (8209, "Reminders of Him", 3978, 15),
-    (8212, "If Tomorrow Comes", 8211, 17)
-]
-
-cursor.executemany("INSERT OR IGNORE INTO book VALUES (?, ?, ?, ?)", books)
-
-authors = [
-    (1290, "Charles Dickens", "England"),
-    (8937, "J.K. Rowling", "England"),
-    (2356, "C.S. Lewis", "Ireland"),
-    (6380, "J.R.R. Tolkien", "South Africa"),
-    (5620, "Lewis Carroll", "England"),
-    (3978, "Colleen Hoover", "America"),
-    (8211, "Sidney Sheldon", "United States")
-
-]
-
-cursor.executemany("INSERT OR IGNORE INTO author VALUES (?, ?, ?)", authors)
-conn.commit()
-conn.close()
+from shelf_db import migrate, pool
+from shelf_search import SEARCH_LIMIT, search_books
+
+# Create the database, or bring an older one's schema up to date
+conn = pool.acquire()
+migrate(conn)
+pool.release(conn)
 
 
 def menu():
@@ -95,6 +53,7 @@ def menu():
                 "Exiting the system. Thank you for using the Ebookstore Clerk "
                 "System. Goodbye!"
             )
+            pool.close()
             break
         else:
             print("Invalid Choice. Please try again.")
@@ -106,7 +65,7 @@ def add_book():
     Ensures the book ID is unique.
     Allows user to retry or return to main menu if duplicate ID is entered.
     """
-    db = sqlite3.connect('ebookstore.db')
+    db = pool.acquire()
     cursor = db.cursor()
 
     while True:
@@ -147,7 +106,7 @@ def add_book():
         finally:
             db.commit()
 
-    db.close()
+    pool.release(db)
 
 
 def update_book():
@@ -157,7 +116,7 @@ def update_book():
     Applies updates to both 'book' and 'author' tables. Repeats prompt if book
     ID is invalid, or allows user to return to main menu.
     """
-    db = sqlite3.connect('ebookstore.db')
+    db = pool.acquire()
     cursor = db.cursor()
 
     try:
@@ -226,7 +185,7 @@ def update_book():
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        db.close()
+        pool.release(db)
 
 
 def delete_book():
@@ -234,7 +193,7 @@ def delete_book():
     Deletes a book from the database after confirming its existence and user approval.
     If the book ID doesn't exist, prompts to retry or return to main menu.
     """
-    db = sqlite3.connect('ebookstore.db')
+    db = pool.acquire()
     cursor = db.cursor()
 
     while True:
@@ -286,33 +245,30 @@ def delete_book():
         finally:
             db.commit()
 
-    db.close()
+    pool.release(db)
 
 
 def search_book():
     """
-    Searches for books by title.
-    Prompts the user for a partial or full title.
-    Displays all matching books from the 'book' table.
+    Searches for books by title or author name.
+    Prompts the user for one or more words; each may be the start of a word.
+    Displays the best matching books from the 'book' table, best first.
     """
-    db = sqlite3.connect('ebookstore.db')
-    cursor = db.cursor()
+    db = pool.acquire()
     try:
         title = input("Enter book title to search:")
-        cursor.execute(
-            "SELECT * FROM book WHERE title LIKE ?",
-            ('%' + title + '%',)
-        )
-        results = cursor.fetchall()
+        results = search_books(db, title)
         if results:
             for book in results:
                 print(book)
+            if len(results) == SEARCH_LIMIT:
+                print(f"Showing the best {SEARCH_LIMIT} matches.")
         else:
             print("No matching books found.")
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        db.close()
+        pool.release(db)
 
 
 def search_author():
@@ -320,7 +276,7 @@ def search_author():
     Continuously prompts for an author ID until a valid one is entered.
     Displays the author's name and all books written by them.
     """
-    db = sqlite3.connect('ebookstore.db')
+    db = pool.acquire()
     cursor = db.cursor()
 
     while True:
@@ -355,7 +311,7 @@ def search_author():
         finally:
             db.commit()
 
-    db.close()
+    pool.release(db)
 
 
 def view_books():
@@ -363,7 +319,7 @@ def view_books():
     Displays all books currently in the database.
     Retrieves and prints all entries from the 'book' table.
     """
-    db = sqlite3.connect('ebookstore.db')
+    db = pool.acquire()
     cursor = db.cursor()
     try:
         cursor.execute("SELECT * FROM book")
@@ -373,7 +329,7 @@ def view_books():
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        db.close()
+        pool.release(db)
 
 
 def view_all_book_details():
@@ -384,7 +340,7 @@ def view_all_book_details():
     book's title, the author's name, and their country of origin. Results are
     printed in a formatted layout for easy readability.
     """
-    conn = sqlite3.connect('ebookstore.db')
+    conn = pool.acquire()
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -394,7 +350,7 @@ def view_all_book_details():
     ''')
 
     results = cursor.fetchall()
-    conn.close()
+    pool.release(conn)
 
     print("Details --------------------------------------------------")
     for title, name, country in results:
@@ -405,4 +361,5 @@ def view_all_book_details():
 
 
 # Run the menu
-menu()
+if __name__ == "__main__":
+    menu()
@@ -0,0 +1,418 @@
+"""
+User credentials for the task manager.
+
+'user.txt' keeps its 'username, secret' line format, but the secret is a
+salted PBKDF2-SHA256 hash rather than the plain password. The lines are kept
+sorted by username under a one-line header, so a login memory-maps the file
+and binary-searches it for the one user it needs instead of loading every
+account. Nothing is read when the module is imported.
+
+Plain-text files from earlier versions are upgraded automatically the first
+time they are used: the lines are sorted, every password is hashed at full
+strength and the file is atomically replaced. The hashing is spread over a
+thread pool, but it is still a one-off cost that grows with the number of
+users, so a large file is best upgraded ahead of time with
+Credentials(path).upgrade().
+
+Each hash records its own iteration count, so existing hashes keep verifying
+when HASH_ITERATIONS is raised. A hash made with fewer iterations than the
+current setting is replaced with a full strength one after its user next logs
+in successfully. Secrets are space-padded to SECRET_WIDTH in the file, so the
+new hash is written over the old one in place rather than by rewriting the
+file.
+
+Registrations from several processes are serialised by a lock on
+'user.txt.lock', and a process notices when another one has replaced the file
+and maps the new version.
+"""
+import hashlib
+import hmac
+import mmap
+import os
+import secrets
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: registrations are then only safe in one process.
+    fcntl = None
+
+USER_FILE = "user.txt"
+
+HASH_SCHEME = "pbkdf2_sha256"
+HASH_ITERATIONS = 600_000
+SALT_BYTES = 16
+# Width secrets are padded to in the file: a hash with a ten-digit iteration
+# count, so a rehash always fits over the hash it replaces.
+SECRET_WIDTH = len(HASH_SCHEME) + 10 + 2 * SALT_BYTES + 2 * 32 + 3
+
+HEADER_PREFIX = "#credentials v1 users="
+
+
+def hash_password(password, iterations=HASH_ITERATIONS, salt=None):
+    """
+    Hashes a password for storage.
+
+    Parameters:
+        password (str): The plain-text password.
+        iterations (int): The PBKDF2 work factor.
+        salt (bytes): A salt to use; a random one is generated if omitted.
+
+    Returns:
+        str: 'pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>'.
+    """
+    salt = salt or secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def check_password(password, stored):
+    """Returns True if a password matches a hash from hash_password."""
+    try:
+        scheme, iterations, salt, expected = stored.split("$")
+    except ValueError:
+        return False
+    if scheme != HASH_SCHEME:
+        return False
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations)
+    )
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def needs_rehash(stored, iterations=HASH_ITERATIONS):
+    """Returns True if a hash from hash_password used fewer iterations."""
+    try:
+        scheme, stored_iterations, _, _ = stored.split("$")
+    except ValueError:
+        return False
+    return scheme == HASH_SCHEME and int(stored_iterations) < iterations
+
+
+def validate_username(username):
+    """
+    Checks that a username can be stored.
+
+    Raises:
+        ValueError: If the name is empty or contains characters that the
+            credential file uses as delimiters.
+    """
+    if not username or ", " in username or "\n" in username:
+        raise ValueError("Usernames cannot be empty or contain ', '.")
+    if username.startswith("#"):
+        raise ValueError("Usernames cannot start with '#'.")
+
+
+def _file_mode(path):
+    """
+    Returns the permission bits a rewrite of `path` should keep.
+
+    An existing file keeps its own mode; a new one gets the default for the
+    current umask, as open() would give it.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _parse_line(line):
+    """Splits a 'username, secret' line."""
+    username, _, secret = line.rstrip("\n").partition(", ")
+    return username, secret.rstrip(" ")
+
+
+class Credentials:
+    """
+    Sorted, hashed credential file with binary-search lookups.
+
+    The file is memory-mapped on first use; lookups touch only the pages that
+    the binary search visits.
+    """
+
+    def __init__(self, path=USER_FILE, iterations=HASH_ITERATIONS):
+        self.path = path
+        self.iterations = iterations
+        self._map = None
+        self._file = None
+        self._count = None
+        self._body = 0
+        self._inode = None
+        self._lock_file = None
+        self._thread_lock = threading.RLock()
+
+    # ---- File access ----
+    def _open(self):
+        """Maps the credential file, upgrading a legacy file first."""
+        if self._map is not None:
+            if os.stat(self.path).st_ino == self._inode:
+                return self._map
+            self.close()  # replaced by another process
+
+        with open(self.path, "r", encoding="utf-8") as user_file:
+            header = user_file.readline()
+        if not header.startswith(HEADER_PREFIX):
+            self.upgrade()
+            with open(self.path, "r", encoding="utf-8") as user_file:
+                header = user_file.readline()
+
+        self._count = int(header[len(HEADER_PREFIX):])
+        self._body = len(header.encode("utf-8"))
+        self._file = open(self.path, "rb")
+        file_stat = os.fstat(self._file.fileno())
+        self._inode = file_stat.st_ino
+        size = file_stat.st_size
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        """Releases the memory map; it is reopened on the next lookup."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+    @contextmanager
+    def _locked(self):
+        """
+        Holds the lock on 'user.txt.lock' while the block runs.
+
+        Every change to the file is made under it, and it also excludes the
+        other threads of this process. Blocks may be nested.
+        """
+        with self._thread_lock:
+            if self._lock_file is not None:
+                yield
+                return
+            with open(self.path + ".lock", "a+b") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                self._lock_file = lock
+                try:
+                    yield
+                finally:
+                    self._lock_file = None
+
+    def _write(self, entries):
+        """
+        Atomically writes sorted (username, secret) pairs with a header.
+
+        Each secret is padded to SECRET_WIDTH.
+        """
+        self.close()
+        handle, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path))
+        )
+        count = 0
+        with open(handle, "w", encoding="utf-8") as out:
+            out.write(f"{HEADER_PREFIX}{0:012d}\n")
+            for username, secret in entries:
+                out.write(f"{username}, {secret:<{SECRET_WIDTH}}\n")
+                count += 1
+            out.seek(0)
+            out.write(f"{HEADER_PREFIX}{count:012d}\n")
+        # mkstemp creates the file as 0600, which would lock every other OS
+        # user sharing the data directory out of logging in.
+        os.chmod(tmp_path, _file_mode(self.path))
+        os.replace(tmp_path, self.path)
+
+    def _merged(self, username, secret):
+        """Streams the file's entries with one user's line added or replaced."""
+        key = username.encode("utf-8")
+        pending = True
+        with open(self.path, "r", encoding="utf-8") as user_file:
+            user_file.readline()
+            for line in user_file:
+                entry = _parse_line(line)
+                name = entry[0].encode("utf-8")
+                if pending and name >= key:
+                    yield username, secret
+                    pending = False
+                    if name == key:
+                        continue
+                yield entry
+        if pending:
+            yield username, secret
+
+    def upgrade(self, iterations=None, workers=None):
+        """
+        Converts a plain-text 'user.txt' to the sorted, hashed format.
+
+        Plain passwords are hashed with `iterations`, by default the
+        instance's full strength setting, and lines that already hold a hash
+        are kept as they are. A later duplicate of a username replaces the
+        earlier one, as it did when the file was loaded into a dict. Nothing
+        is done if another process upgraded the file first.
+
+        Parameters:
+            iterations (int): The PBKDF2 work factor for plain passwords.
+            workers (int): Threads hashing in parallel; PBKDF2 releases the
+                GIL. By default one per CPU.
+        """
+        iterations = iterations or self.iterations
+        with self._locked():
+            entries = {}
+            with open(self.path, "r", encoding="utf-8") as user_file:
+                if user_file.readline().startswith(HEADER_PREFIX):
+                    return
+                user_file.seek(0)
+                for line in user_file:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    username, secret = _parse_line(line.strip())
+                    entries[username] = secret
+
+            plain = [
+                username
+                for username, secret in entries.items()
+                if not secret.startswith(HASH_SCHEME + "$")
+            ]
+            with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+                hashed = pool.map(
+                    lambda username: hash_password(entries[username], iterations),
+                    plain,
+                )
+                entries.update(zip(plain, hashed))
+            self._write(
+                sorted(entries.items(), key=lambda entry: entry[0].encode("utf-8"))
+            )
+
+    def _find(self, username):
+        """
+        Binary-searches the mapped file for a user's line.
+
+        Returns:
+            tuple: (start, end, secret): the byte range of the padded secret
+            field and the secret itself, or None if the user is unknown.
+        """
+        data = self._open()
+        key = username.encode("utf-8")
+        low, high = self._body, len(data)
+        while low < high:
+            middle = (low + high) // 2
+            start = data.rfind(b"\n", low - 1, middle) + 1
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            name, _, secret = data[start:end].partition(b", ")
+            if name == key:
+                field = start + len(name) + 2
+                return field, end, secret.rstrip(b" ").decode("utf-8")
+            if name < key:
+                low = end + 1
+            else:
+                high = start
+        return None
+
+    def _lookup(self, username):
+        """Returns a user's stored secret, or None if the user is unknown."""
+        found = self._find(username)
+        return None if found is None else found[2]
+
+    # ---- Public API ----
+    def __contains__(self, username):
+        return self._lookup(username) is not None
+
+    def __len__(self):
+        self._open()
+        return self._count
+
+    def entries(self):
+        """Streams (username, stored secret) pairs in sorted order."""
+        data = self._open()
+        position = self._body
+        while position < len(data):
+            end = data.find(b"\n", position)
+            if end == -1:
+                end = len(data)
+            name, _, secret = data[position:end].partition(b", ")
+            yield name.decode("utf-8"), secret.rstrip(b" ").decode("utf-8")
+            position = end + 1
+
+    def usernames(self):
+        """Streams every registered username in sorted order."""
+        for username, _ in self.entries():
+            yield username
+
+    def stored_secret(self, username):
+        """Returns a user's stored password hash, or None if unknown."""
+        return self._lookup(username)
+
+    def verify(self, username, password):
+        """
+        Returns True if the username exists and the password matches.
+
+        A matching password whose hash is weaker than the current setting is
+        rehashed at full strength.
+        """
+        secret = self._lookup(username)
+        if secret is None or not check_password(password, secret):
+            return False
+        if needs_rehash(secret, self.iterations):
+            self.replace_secret(
+                username, secret, hash_password(password, self.iterations)
+            )
+        return True
+
+    def replace_secret(self, username, old, new):
+        """
+        Swaps a user's stored hash for a new one.
+
+        The new hash is written over the old one's padded field in place, so
+        the cost does not grow with the number of users. Only a file whose
+        field is too narrow, such as one written before secrets were padded,
+        is rewritten, which pads every line for next time.
+
+        Parameters:
+            username (str): The user whose hash to replace.
+            old (str): The hash the new one was made to replace. If the
+                stored hash has changed since, it is left alone.
+            new (str): The replacement hash.
+
+        Returns:
+            bool: True if the hash was replaced.
+        """
+        with self._locked():
+            found = self._find(username)
+            if found is None or found[2] != old:
+                return False
+            start, end, _ = found
+            if len(new) > end - start:
+                self._write(self._merged(username, new))
+                return True
+            with open(self.path, "r+b") as user_file:
+                user_file.seek(start)
+                user_file.write(new.encode("utf-8").ljust(end - start))
+        return True
+
+    def register(self, username, password):
+        """
+        Adds a new user with a hashed password.
+
+        The new line is merged into place in a single streaming pass, keeping
+        the file sorted.
+
+        Parameters:
+            username (str): The new username.
+            password (str): The new user's password.
+
+        Raises:
+            ValueError: If the username is taken or cannot be stored.
+        """
+        validate_username(username)
+        with self._locked():
+            self._register(username, password)
+
+    def _register(self, username, password):
+        """Merges a new user into the file; called with the file lock held."""
+        if username in self:
+            raise ValueError(f"Username '{username}' already exists.")
+
+        secret = hash_password(password, self.iterations)
+        self._write(self._merged(username, secret))
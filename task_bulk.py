@@ -0,0 +1,185 @@
+"""
+Non-interactive bulk import and export for the task manager.
+
+Imports stream a CSV or JSONL file one row at a time. Each row is validated
+against the registered users and the supported date formats in the same pass.
+Valid rows go to the task store in large batches and the store is fsynced
+once at the end. Exports stream the task store out through a buffered writer.
+
+Both formats use the columns assigned_to, title, description, assigned_date,
+due_date and completed. On import only assigned_to, title and due_date are
+required: assigned_date defaults to today and completed defaults to 'No'.
+
+Usage (from the directory holding user.txt and the task store):
+    python task_bulk.py import new_tasks.csv
+    python task_bulk.py export backup.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import date
+
+from bulk_rows import detect_format, read_rows
+from task_dates import parse_date
+from task_service import TaskService
+from task_store import Task
+
+COLUMNS = [
+    "assigned_to", "title", "description", "assigned_date", "due_date", "completed"
+]
+REQUIRED = ["assigned_to", "title", "due_date"]
+WRITE_BUFFER = 1 << 20
+
+
+def validate_row(row, usernames, today):
+    """
+    Converts one imported row to a Task.
+
+    Parameters:
+        row (dict): The row's columns, or None if it could not be decoded.
+        usernames (set): Registered usernames that tasks may be assigned to.
+        today (int): Day ordinal used when no assigned date is given.
+
+    Returns:
+        tuple: (Task, None) for a valid row, or (None, reason) otherwise.
+    """
+    if row is None:
+        return None, "unreadable row"
+    missing = [
+        column for column in REQUIRED if not str(row.get(column) or "").strip()
+    ]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    assigned_to = str(row["assigned_to"]).strip()
+    if assigned_to not in usernames:
+        return None, f"unknown user '{assigned_to}'"
+
+    due = parse_date(str(row["due_date"]))
+    if due is None:
+        return None, f"invalid due date '{row['due_date']}'"
+
+    assigned_text = str(row.get("assigned_date") or "").strip()
+    assigned = parse_date(assigned_text) if assigned_text else today
+    if assigned is None:
+        return None, f"invalid assigned date '{assigned_text}'"
+
+    completed = str(row.get("completed") or "No").strip().lower()
+    if completed not in ("yes", "no"):
+        return None, f"invalid completed flag '{row['completed']}'"
+
+    task = Task(
+        assigned_to,
+        str(row["title"]).strip(),
+        str(row.get("description") or "").strip(),
+        assigned,
+        due,
+        completed == "yes",
+    )
+    return task, None
+
+
+def import_tasks(store, path, usernames, fmt=None, rejected=None):
+    """
+    Streams tasks from a CSV or JSONL file into the store.
+
+    Parameters:
+        store (TaskStore): The store to add the tasks to.
+        path (str): The file to import.
+        usernames (set): Registered usernames that tasks may be assigned to.
+        fmt (str): 'csv' or 'jsonl'; detected from the suffix if omitted.
+        rejected (list): If given, receives (line number, reason) for every
+            row that failed validation.
+
+    Returns:
+        int: The number of tasks imported.
+    """
+    today = date.today().toordinal()
+
+    def valid_tasks():
+        for line_number, row in read_rows(path, detect_format(path, fmt)):
+            task, reason = validate_row(row, usernames, today)
+            if task is not None:
+                yield task
+            elif rejected is not None:
+                rejected.append((line_number, reason))
+
+    return store.add_many(valid_tasks())
+
+
+def export_tasks(store, path, fmt=None):
+    """
+    Streams every task in the store to a CSV or JSONL file.
+
+    Parameters:
+        store (TaskStore): The store to export.
+        path (str): The file to write.
+        fmt (str): 'csv' or 'jsonl'; detected from the suffix if omitted.
+
+    Returns:
+        int: The number of tasks exported.
+    """
+    fmt = detect_format(path, fmt)
+    exported = 0
+    with open(
+        path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER
+    ) as target:
+        if fmt == "csv":
+            writer = csv.writer(target)
+            writer.writerow(["id"] + COLUMNS)
+            for task_id, task in store.items():
+                writer.writerow([task_id] + task.to_fields())
+                exported += 1
+        else:
+            for task_id, task in store.items():
+                row = dict(zip(COLUMNS, task.to_fields()), id=task_id)
+                target.write(json.dumps(row) + "\n")
+                exported += 1
+    return exported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import or export tasks.")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], dest="fmt")
+    args = parser.parse_args(argv)
+
+    service = TaskService()
+    rejected = []
+    started = time.perf_counter()
+    try:
+        if args.action == "import":
+            try:
+                usernames = set(service.credentials.usernames())
+            except FileNotFoundError:
+                print("Error: 'user.txt' file not found.")
+                return 1
+            count = import_tasks(
+                service.store, args.path, usernames, args.fmt, rejected
+            )
+        else:
+            count = export_tasks(service.store, args.path, args.fmt)
+    except FileNotFoundError:
+        print(f"Error: '{args.path}' file not found.")
+        return 1
+    finally:
+        service.close()
+    elapsed = time.perf_counter() - started
+
+    for line_number, reason in rejected:
+        print(f"Rejected line {line_number}: {reason}")
+    if args.action == "import":
+        print(f"Rejected {len(rejected)} row(s).")
+    rate = count / elapsed if elapsed else 0
+    print(
+        f"{args.action.title()}ed {count} task(s) in {elapsed:.2f}s "
+        f"({rate:,.0f} tasks/s)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Date parsing for task dates.
+
+tasks.txt holds dates written as '10 Oct 2019' (the format the task manager
+asks for) as well as ISO dates such as '2025-08-21'. parse_date accepts both
+and returns an integer day ordinal (see date.toordinal), which is cheap to
+compare, sort and store in arrays.
+
+Due dates repeat heavily across tasks, so results are memoized in a bounded
+LRU cache and most lookups never reach the parser.
+"""
+from datetime import date
+from functools import lru_cache
+
+DISPLAY_FORMAT = "%d %b %Y"
+CACHE_SIZE = 65536
+
+# Fixed English abbreviations, matching '%b' in the C locale.
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        "Jan Feb Mar Apr May Jun Jul Aug Sep Oct Nov Dec".split(), 1
+    )
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(text):
+    """
+    Parses a task date in 'DD Mon YYYY' or 'YYYY-MM-DD' format.
+
+    Parameters:
+        text (str): The date as written in a task.
+
+    Returns:
+        int: The date's day ordinal, or None if the text is not a valid date
+        in either format.
+    """
+    text = text.strip()
+    try:
+        if len(text) == 10 and text[4] == "-" and text[7] == "-":
+            return date(int(text[:4]), int(text[5:7]), int(text[8:])).toordinal()
+        day, month, year = text.split()
+        return date(int(year), _MONTHS[month.title()], int(day)).toordinal()
+    except (ValueError, KeyError):
+        return None
+
+
+def format_date(ordinal):
+    """Returns a day ordinal formatted as 'DD Mon YYYY'."""
+    return date.fromordinal(ordinal).strftime(DISPLAY_FORMAT)
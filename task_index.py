@@ -0,0 +1,403 @@
+"""
+Secondary indexes over the task store.
+
+Each index listens to the store, updates itself as tasks change and is
+checkpointed to a compact binary file stamped with the store's version. A
+missing or stale checkpoint is rebuilt with a single pass over the tasks.
+
+UserIndex maps each assignee to the sorted IDs of their tasks, so a user's
+"my tasks" screen reads only their own tasks instead of scanning everyone's.
+
+DueIndex keeps the incomplete tasks ordered by due date, globally and per
+user, as arrays of packed (day ordinal, task ID) keys. Overdue counts and
+"due in the next N days" lookups are binary searches over those arrays.
+
+SearchIndex is an inverted index from each word in a task's title and
+description to the sorted IDs of the tasks containing it. Searches intersect
+those lists instead of reading every task.
+"""
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+USER_INDEX_FILE = "tasks_by_user.idx"
+DUE_INDEX_FILE = "tasks_by_due.idx"
+SEARCH_INDEX_FILE = "tasks_by_word.idx"
+
+_WORD = re.compile(r"\w+")
+# A search term: a word, optionally followed by '*' for a prefix match.
+_TERM = re.compile(r"(\w+)(\*?)")
+
+# DueIndex keys pack the due-date ordinal above a 32-bit task ID.
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+_ALL = "*"
+
+_VERSION = struct.Struct("<q")
+_KEY = struct.Struct("<H")
+_COUNT = struct.Struct("<q")
+
+
+def save_arrays(path, version, arrays):
+    """
+    Atomically writes a mapping of names to integer arrays.
+
+    Parameters:
+        path (str): The checkpoint file to write.
+        version (int): The store version the arrays reflect.
+        arrays (dict): Maps str keys to array('q') values.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_VERSION.pack(version))
+        for key, values in arrays.items():
+            name = key.encode("utf-8")
+            out.write(_KEY.pack(len(name)) + name + _COUNT.pack(len(values)))
+            out.write(values.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_arrays(path):
+    """
+    Reads a checkpoint written by save_arrays.
+
+    Returns:
+        tuple: (version, dict of arrays), or (None, None) if the file is
+        missing or truncated.
+    """
+    try:
+        with open(path, "rb") as source:
+            data = source.read()
+    except FileNotFoundError:
+        return None, None
+
+    try:
+        (version,) = _VERSION.unpack_from(data)
+        arrays = {}
+        position = _VERSION.size
+        while position < len(data):
+            (length,) = _KEY.unpack_from(data, position)
+            position += _KEY.size
+            key = data[position:position + length].decode("utf-8")
+            position += length
+            (count,) = _COUNT.unpack_from(data, position)
+            position += _COUNT.size
+            values = array("q")
+            values.frombytes(data[position:position + count * values.itemsize])
+            position += count * values.itemsize
+            if len(values) != count:
+                return None, None
+            arrays[key] = values
+    except struct.error:
+        return None, None
+    return version, arrays
+
+
+def _insert(values, item):
+    """Inserts an item into a sorted array."""
+    values.insert(bisect_left(values, item), item)
+
+
+def _remove(values, item):
+    """Removes an item from a sorted array."""
+    position = bisect_left(values, item)
+    if position < len(values) and values[position] == item:
+        del values[position]
+
+
+class UserIndex:
+    """
+    Persistent index from assignee username to their task IDs.
+
+    Kept in sync with the store through its listener hook, so adding a task,
+    reassigning one in the edit path and deleting one all update it.
+    """
+
+    def __init__(self, store, path=USER_INDEX_FILE):
+        self.store = store
+        self.path = path
+        version, users = load_arrays(path)
+        if version == store.version:
+            self.users = users
+        else:
+            self.rebuild()
+        store.listeners.append(self)
+
+    def rebuild(self):
+        """Recreates the index with a single pass over the store."""
+        self.users = {}
+        for task_id, task in self.store.items():
+            self.users.setdefault(task.assigned_to, array("q")).append(task_id)
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Saves the index, stamped with the store version."""
+        save_arrays(self.path, self.store.version, self.users)
+
+    def task_changed(self, task_id, old, new):
+        """Store listener hook: moves a task ID between assignees."""
+        old_user = old and old.assigned_to
+        new_user = new and new.assigned_to
+        if old_user == new_user:
+            return
+        if old is not None:
+            _remove(self.users[old_user], task_id)
+            if not self.users[old_user]:
+                del self.users[old_user]
+        if new is not None:
+            _insert(self.users.setdefault(new_user, array("q")), task_id)
+
+    def ids_for(self, username):
+        """Returns the sorted IDs of the tasks assigned to a user."""
+        self.store.refresh()
+        return list(self.users.get(username, ()))
+
+    def tasks_for(self, username):
+        """
+        Fetches every task assigned to a user.
+
+        Parameters:
+            username (str): The assignee to look up.
+
+        Returns:
+            list: (task_id, Task) pairs in ID order. Tasks deleted since the
+            IDs were read are left out.
+        """
+        pairs = (
+            (task_id, self.store.get(task_id))
+            for task_id in self.ids_for(username)
+        )
+        return [(task_id, task) for task_id, task in pairs if task is not None]
+
+
+def _due_key(task_id, task):
+    """Returns the DueIndex key of a task, or None if it is not indexed."""
+    if task is None or task.completed:
+        return None
+    day = task.due_ordinal
+    if day is None:
+        return None
+    return (day << _ID_BITS) | task_id
+
+
+class DueIndex:
+    """
+    Persistent due-date ordered index over incomplete tasks.
+
+    Completed tasks and tasks with an unparseable due date are left out. Each
+    array holds sorted keys of the form (due ordinal << 32) | task ID, so the
+    tasks due before a given day are exactly the keys below day << 32.
+    """
+
+    def __init__(self, store, path=DUE_INDEX_FILE):
+        self.store = store
+        self.path = path
+        version, keys = load_arrays(path)
+        if version == store.version:
+            self.keys = keys
+        else:
+            self.rebuild()
+        store.listeners.append(self)
+
+    def rebuild(self):
+        """Recreates the index with a single pass over the store."""
+        self.keys = {_ALL: array("q")}
+        for task_id, task in self.store.items():
+            key = _due_key(task_id, task)
+            if key is not None:
+                self.keys[_ALL].append(key)
+                self.keys.setdefault("@" + task.assigned_to, array("q")).append(key)
+        for keys in self.keys.values():
+            keys[:] = array("q", sorted(keys))
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Saves the index, stamped with the store version."""
+        save_arrays(self.path, self.store.version, self.keys)
+
+    def task_changed(self, task_id, old, new):
+        """Store listener hook: re-files a task under its new due date."""
+        old_key = _due_key(task_id, old)
+        new_key = _due_key(task_id, new)
+        if old_key == new_key and (
+            old_key is None or old.assigned_to == new.assigned_to
+        ):
+            return
+        if old_key is not None:
+            _remove(self.keys[_ALL], old_key)
+            user_keys = self.keys["@" + old.assigned_to]
+            _remove(user_keys, old_key)
+            if not user_keys:
+                del self.keys["@" + old.assigned_to]
+        if new_key is not None:
+            _insert(self.keys[_ALL], new_key)
+            _insert(self.keys.setdefault("@" + new.assigned_to, array("q")), new_key)
+
+    def _keys(self, username):
+        self.store.refresh()
+        if username is None:
+            return self.keys[_ALL]
+        return self.keys.get("@" + username, array("q"))
+
+    def overdue_count(self, as_of, username=None):
+        """
+        Counts incomplete tasks due before a date.
+
+        Parameters:
+            as_of (date): Tasks due strictly before this day are overdue.
+            username (str): Limit the count to one assignee, or None for all.
+
+        Returns:
+            int: The number of overdue tasks.
+        """
+        return bisect_left(self._keys(username), as_of.toordinal() << _ID_BITS)
+
+    def due_between(self, start, end, username=None):
+        """
+        Lists incomplete tasks due in a date range.
+
+        Parameters:
+            start (date): First due date to include, or None for no lower
+                bound.
+            end (date): Last due date to include.
+            username (str): Limit the results to one assignee, or None for all.
+
+        Returns:
+            list: Task IDs ordered by due date.
+        """
+        keys = self._keys(username)
+        low = 0 if start is None else bisect_left(keys, start.toordinal() << _ID_BITS)
+        high = bisect_left(keys, (end.toordinal() + 1) << _ID_BITS)
+        return [key & _ID_MASK for key in keys[low:high]]
+
+
+def words_in(text):
+    """Returns the set of lower-case words in a piece of text."""
+    return set(_WORD.findall(text.lower()))
+
+
+def query_terms(query):
+    """
+    Splits a search query into lower-case terms.
+
+    A term keeps a trailing '*' when it is to match any word starting with it.
+
+    Raises:
+        ValueError: If the query has no searchable words.
+    """
+    terms = [word + star for word, star in _TERM.findall(query.lower())]
+    if not terms:
+        raise ValueError("Enter at least one word to search for.")
+    return terms
+
+
+def _task_words(task):
+    if task is None:
+        return set()
+    return words_in(task.title) | words_in(task.description)
+
+
+class SearchIndex:
+    """
+    Persistent inverted index over task titles and descriptions.
+
+    Maps every word to the sorted IDs of the tasks whose title or
+    description contains it. A query term ending in '*' matches every word
+    with that prefix; the sorted vocabulary needed for that is built on the
+    first prefix search and reused until a word is added or dropped.
+    """
+
+    def __init__(self, store, path=SEARCH_INDEX_FILE):
+        self.store = store
+        self.path = path
+        self._vocabulary = None
+        version, words = load_arrays(path)
+        if version == store.version:
+            self.words = words
+        else:
+            self.rebuild()
+        store.listeners.append(self)
+
+    def rebuild(self):
+        """Recreates the index with a single pass over the store."""
+        self.words = {}
+        self._vocabulary = None
+        for task_id, task in self.store.items():
+            for word in _task_words(task):
+                self.words.setdefault(word, array("q")).append(task_id)
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Saves the index, stamped with the store version."""
+        save_arrays(self.path, self.store.version, self.words)
+
+    def task_changed(self, task_id, old, new):
+        """Store listener hook: re-files a task under its current words."""
+        old_words = _task_words(old)
+        new_words = _task_words(new)
+        for word in old_words - new_words:
+            ids = self.words[word]
+            _remove(ids, task_id)
+            if not ids:
+                del self.words[word]
+                self._vocabulary = None
+        for word in new_words - old_words:
+            ids = self.words.get(word)
+            if ids is None:
+                ids = self.words[word] = array("q")
+                self._vocabulary = None
+            _insert(ids, task_id)
+
+    def _postings(self, term):
+        """Returns the sorted task IDs matching one query term."""
+        if not term.endswith("*"):
+            return self.words.get(term, ())
+        prefix = term.rstrip("*")
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.words)
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for word in self._vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.append(self.words[word])
+        if len(matches) == 1:
+            return matches[0]
+        return sorted(set().union(*matches))
+
+    def search(self, query, after=0, within=None):
+        """
+        Lazily yields the IDs of tasks containing every term of a query.
+
+        Terms are the words of the query, and a trailing '*' makes a term
+        match any word starting with it. Matching tasks are found by walking the
+        shortest posting list and binary-searching the others.
+
+        Parameters:
+            query (str): Space-separated search terms.
+            after (int): Only yield IDs greater than this.
+            within (list): Optional sorted task IDs to restrict the results
+                to, such as one user's tasks from UserIndex.
+
+        Yields:
+            int: Matching task IDs in ascending order.
+
+        Raises:
+            ValueError: If the query has no searchable words.
+        """
+        terms = query_terms(query)
+        self.store.refresh()
+        postings = [self._postings(term) for term in terms]
+        if within is not None:
+            postings.append(within)
+        postings.sort(key=len)
+        driver, others = postings[0], postings[1:]
+        for task_id in driver[bisect_right(driver, after):]:
+            for ids in others:
+                position = bisect_left(ids, task_id)
+                if position == len(ids) or ids[position] != task_id:
+                    break
+            else:
+                yield task_id
@@ -1,60 +1,86 @@
 # ===== Importing external modules ===========
 """
-Imports date and datetime classes from Python's built-in datetime module.
+Imports date and timedelta classes from Python's built-in datetime module.
 
 These classes are used for handling and formatting date-related operations
 throughout the program, such as assigning task dates, validating deadlines,
 and generating reports.
+
+Running this file starts the interactive task manager. Importing it only
+defines the menu functions; the task operations themselves live in
+task_service.TaskService.
 """
 
 
-from datetime import date, datetime
+import sys
+from datetime import date, timedelta
+
+import task_reports
+from task_dates import parse_date
+from task_metrics import Metrics
+from task_report_cache import CACHED, REGENERATED, ReportCache
+from task_service import TaskService
+from task_trends import TRENDS_FILE, write_trends
 
-# ==== Login Section ====
-credentials = {}
-try:
-    with open("user.txt", "r", encoding="utf-8") as file:
-        file.seek(0)
-        for line in file:
-            username, password = line.strip().split(", ")
-            credentials[username] = password
-except FileNotFoundError:
-    print("Error: 'user.txt' file not found.")
-    exit()
+# All task, user and report operations go through the service. It reads
+# nothing from disk until an operation needs it, so importing this module is
+# cheap and the functions below can be reused outside the menu.
+service = TaskService()
+report_cache = ReportCache(service)
+metrics = Metrics.from_environment(service)
 
-# Validate user login
-while True:
-    username = input("Enter your username: ").strip()
-    password = input("Enter your password: ").strip()
+# With metrics on, prompts go through metrics.input so that time spent
+# waiting for the user is not counted in operation latencies.
+input = metrics.input
 
-    if username in credentials and credentials[username] == password:
-        print(f"Welcome, {username}!")
-        break
-    else:
-        print("Invalid username or password. Please try again.")
+# The longest look-ahead view_due accepts, in days.
+MAX_DUE_DAYS = 3650
 
-# After successful login
-current_user = username
-is_admin = current_user == "admin"
+
+ADMIN_MENU = '''\nSelect one of the following options:
+r  - register a user
+a  - add task
+va - view all tasks
+vm - view my tasks
+vd - view overdue and upcoming tasks
+vc - view completed tasks
+s  - search tasks
+del-delete tasks
+bd - bulk delete tasks
+ds - display statistics
+gr -generate reports
+tr - trend report
+mt - view metrics
+e  - exit
+: '''
+
+USER_MENU = '''\nPlease select one of the following options:
+a   - add task
+va  - view all tasks
+vm  - view my tasks
+vd  - view overdue and upcoming tasks
+s   - search tasks
+e   - exit
+: '''
 
 
 # ==== Function Definitions ====
-def reg_user():
+@metrics.operation("reg_user")
+def reg_user(current_user):
     """
     Registers a new user to the system.
 
     This function can only be accessed by an admin user. It prompts for a new
-    username and password, checks for duplicates, and writes the new
-    credentials
-    to 'user.txt'.
+    username and password, checks for duplicates, and stores the new
+    credentials, with the password hashed, in 'user.txt'.
 
     Parameters:
-        None (relies on input prompts and current user context)
+        current_user (str): The username of the currently logged-in user.
 
     Returns:
         None (writes to 'user.txt' and prints confirmation messages)
     """
-    if not is_admin:
+    if current_user != "admin":
         print("Only the admin can register new users.")
         return
 
@@ -66,7 +92,7 @@ def reg_user():
             print("Registration cancelled.")
             return
 
-        if new_username in credentials:
+        if new_username in service.credentials:
             print("Username already exists. Please choose a different one.")
             continue
         else:
@@ -81,27 +107,28 @@ def reg_user():
         else:
             break
 
-    with open("user.txt", "a", encoding="utf-8") as record_file:
-        record_file.write(f"{new_username}, {new_password}\n")
-
-    credentials[new_username] = new_password
+    try:
+        service.register_user(new_username, new_password)
+    except ValueError as error:
+        print(error)
+        return
     print(f"User '{new_username}' registered successfully.")
 
 
+@metrics.operation("add_task")
 def add_task():
     """
-    Prompts the user to input details for a new task and appends it to the
-    'tasks.txt' file.
+    Prompts the user to input details for a new task and adds it to the task
+    store.
 
     The function performs the following steps:
     - Asks for the username to assign the task to and checks if it exists in
       the credentials.
     - Collects the task title, description, and due date from the user.
-    - Validates the due date format ('DD Mon YYYY').
+    - Validates the due date ('DD Mon YYYY', or ISO 'YYYY-MM-DD').
     - Automatically sets the assigned date to today's date and marks the task
       as incomplete.
-    - Writes the task details to the 'tasks.txt' file in a comma-separated
-      format.
+    - Appends the task to the task store under a new task ID.
 
     Returns:
         None
@@ -109,42 +136,88 @@ def add_task():
     Effects
         - Prints messages to the console based on input validation and task
           creation status.
-        - Appends a new line to 'tasks.txt' if all inputs are valid.
+        - Appends a new task record if all inputs are valid.
     """
 
     assigned_to = input("Enter the username to assign the task to: ").strip()
-    if assigned_to not in credentials:
+    if assigned_to not in service.credentials:
         print("User does not exist.")
         return
 
     title = input("Enter task title: ").strip()
     description = input("Enter task description: ").strip()
-    try:
-        due_date = input("Enter due date (e.g. 10 Oct 2019): ").strip()
-        datetime.strptime(due_date, "%d %b %Y")
-    except ValueError:
+    due_date = input("Enter due date (e.g. 10 Oct 2019): ").strip()
+    if parse_date(due_date) is None:
         print("Invalid date format. Please use 'DD Mon YYYY'.")
         return
 
-    assigned_date = date.today().strftime("%d %b %Y")
-    completed = "No"
+    task_id = service.add_task(assigned_to, title, description, due_date)
+
+    print(f"Task {task_id} added successfully.")
+
+
+def format_task(task_id, task):
+    """
+    Formats one task's details as a block of text.
+
+    Parameters:
+        task_id (int): The task's ID, used as its label.
+        task (Task): The task to format.
+
+    Returns:
+        str: The task's details, one per line.
+    """
+    assigned_to, title, description, assigned_date, due_date, completed = (
+        task.to_fields()
+    )
+    return (
+        f"\nTask {task_id}:\n"
+        f"Assigned to: {assigned_to}\n"
+        f"Title: {title}\n"
+        f"Description: {description}\n"
+        f"Assigned Date: {assigned_date}\n"
+        f"Due Date: {due_date}\n"
+        f"Completed: {completed}\n"
+    )
+
+
+def show_task_pages(**filters):
+    """
+    Prints matching tasks one page at a time.
 
-    with open("tasks.txt", "a", encoding="utf-8") as source:
-        source.write(
-            f"{assigned_to}, {title}, {description}, "
-            f"{assigned_date}, {due_date}, {completed}\n"
-                  )
+    Each page is fetched lazily from the store and written to the terminal
+    in a single buffered write. The user presses Enter for the next page or
+    'q' to stop, so the first page appears without reading the rest.
 
-    print("Task added successfully.")
+    Parameters:
+        **filters: Task filters accepted by TaskService.iter_tasks.
+
+    Returns:
+        bool: True if any task was shown.
+    """
+    cursor = 0
+    shown = False
+    while True:
+        page, cursor = service.list_tasks(cursor, **filters)
+        if page:
+            shown = True
+            sys.stdout.write(
+                "".join(format_task(task_id, task) for task_id, task in page)
+            )
+        if cursor is None:
+            return shown
+        more = input("\nPress Enter for the next page or 'q' to stop: ")
+        if more.strip().lower() == "q":
+            return shown
 
 
+@metrics.operation("view_all")
 def view_all():
     """
-    Displays all tasks stored in 'tasks.txt'.
+    Displays all tasks in the task store.
 
-    Reads each line from the file, splits it into task components, and prints
-    the details in a readable format. Skips any malformed lines that do not
-    contain the expected number of fields.
+    Streams tasks from the store a page at a time and prints their details
+    in a readable format, labelled with each task's ID.
 
     Parameters:
         None
@@ -152,44 +225,19 @@ def view_all():
     Returns:
         None
     """
-    try:
-        with open("tasks.txt", "r", encoding="utf-8") as transcript:
-            tasks = transcript.readlines()
-            if not tasks:
-                print("No tasks found.")
-                return
-            for i, task in enumerate(tasks, 1):
-                task_parts = task.strip().split(", ")
-
-                if len(task_parts) < 6:
-                    task_parts = task.strip().split(", ")
-                    continue
-
-                assigned_to = task_parts[0]
-                title = task_parts[1]
-                description = task_parts[2]
-                assigned_date = task_parts[3]
-                due_date = task_parts[4]
-                completed = task_parts[5]
-
-                print(f"\n Task {i}")
-                print(f"Assigned to: {assigned_to}")
-                print(f"Assigned Date: {assigned_date}")
-                print(f"Title: {title}")
-                print(f"Description: {description}")
-                print(f"Due Date: {due_date}")
-                print(f"Completed: {completed}")
-    except FileNotFoundError:
-        print("No tasks file found.")
+    if not show_task_pages():
+        print("No tasks found.")
 
 
+@metrics.operation("view_mine")
 def view_mine(current_user):
     """
     Displays and manages tasks assigned to the current user.
 
     Allows the user to view their tasks, mark them as complete, or edit the
-    assignee and due date. Only incomplete tasks can be edited. Updates are
-    written back to 'tasks.txt'.
+    assignee and due date. Only incomplete tasks can be edited. The user's
+    tasks are found through the per-user index rather than a scan of every
+    task, and updates are saved to the task store as a single appended record.
 
     Parameters:
         current_user (str): The username of the currently logged-in user.
@@ -197,93 +245,116 @@ def view_mine(current_user):
     Returns:
         None
     """
-    try:
-        with open("tasks.txt", "r", encoding="utf-8") as readout:
-            tasks = readout.readlines()
+    user_tasks = service.tasks_for(current_user)
 
-        user_tasks = [task for task in tasks if task.startswith(current_user + ",")]
+    if not user_tasks:
+        print("You have no tasks assigned.")
+        return
 
-        if not user_tasks:
-            print("You have no tasks assigned.")
-            return
+    while True:
+        print("\nYour Tasks:")
+        for i, (task_id, task) in enumerate(user_tasks, 1):
+            task_parts = task.to_fields()
+            print(f"\nTask {i}:")
+            print(f"Assigned to: {task_parts[0]}")
+            print(f"Title: {task_parts[1]}")
+            print(f"Description: {task_parts[2]}")
+            print(f"Assigned Date: {task_parts[3]}")
+            print(f"Due Date: {task_parts[4]}")
+            print(f"Completed: {task_parts[5]}")
 
-        while True:
-            print("\nYour Tasks:")
-            for i, task in enumerate(user_tasks, 1):
-                task_parts = task.strip().split(", ")
-                print(f"\nTask {i}:")
-                print(f"Assigned to: {task_parts[0]}")
-                print(f"Title: {task_parts[1]}")
-                print(f"Description: {task_parts[2]}")
-                print(f"Assigned Date: {task_parts[3]}")
-                print(f"Due Date: {task_parts[4]}")
-                print(f"Completed: {task_parts[5]}")
-
-            selection = input("\nEnter task number to manage or '-1' to return to menu: ").strip()
-            if selection == "-1":
-                break
-            if not selection.isdigit() or not (1 <= int(selection) <= len(user_tasks)):
-                print("Invalid selection.")
-                continue
+        selection = input(
+            "\nEnter task number to manage or '-1' to return to menu: "
+        ).strip()
+        if selection == "-1":
+            break
+        if not selection.isdigit() or not (1 <= int(selection) <= len(user_tasks)):
+            print("Invalid selection.")
+            continue
 
-            task_index = int(selection) - 1
-            task_parts = user_tasks[task_index].strip().split(", ")
+        task_index = int(selection) - 1
+        task_id, task = user_tasks[task_index]
 
-            if task_parts[-1].lower() == "yes":
-                print("This task is already completed and cannot be edited.")
-                continue
+        if task.completed:
+            print("This task is already completed and cannot be edited.")
+            continue
 
-            action = input("Enter 'c' to mark complete or 'e' to edit: ").strip().lower()
+        action = input("Enter 'c' to mark complete or 'e' to edit: ").strip().lower()
 
-            if action == "c":
-                task_parts[-1] = "Yes"
-                print("Task marked as complete.")
+        if action == "c":
+            task = service.complete_task(task_id)
+            print("Task marked as complete.")
 
-            elif action == "e":
-                current_assignee = task_parts[0]
-                new_user = input(f"Enter new username (or press Enter to keep '{current_assignee}'): ").strip()
-                new_due = input(f"Enter new due date (DD Mon YYYY) (or press Enter to keep '{task_parts[4]}'): ").strip()
+        elif action == "e":
+            current_assignee = task.assigned_to
+            new_user = input(
+                "Enter new username "
+                f"(or press Enter to keep '{current_assignee}'): "
+            ).strip()
+            new_due = input(
+                "Enter new due date (DD Mon YYYY) "
+                f"(or press Enter to keep '{task.due_text}'): "
+            ).strip()
 
-                if new_user:
-                    if new_user not in credentials:
-                        print("Username does not exist.")
-                        continue
-                    task_parts[0] = new_user
+            try:
+                task = service.edit_task(task_id, new_user, new_due)
+            except ValueError as error:
+                print(error)
+                continue
 
-                if new_due:
-                    try:
-                        datetime.strptime(new_due, "%d %b %Y")
-                        task_parts[4] = new_due
-                    except ValueError:
-                        print("Invalid date format.")
-                        continue
+            print("Task updated.")
 
-                print("Task updated.")
+        else:
+            print("Invalid action.")
+            continue
 
-            else:
-                print("Invalid action.")
-                continue
+        user_tasks[task_index] = (task_id, task)
 
-            # Update the full task list
-            original_task = user_tasks[task_index]
-            updated_task = ", ".join(task_parts) + "\n"
-            user_tasks[task_index] = updated_task
-            tasks[tasks.index(original_task)] = updated_task
 
-            # Write updated task back to file
-            with open("tasks.txt", "w", encoding="utf-8") as data_file:
-                data_file.writelines(tasks)
+@metrics.operation("search_tasks")
+def search_tasks():
+    """
+    Finds tasks whose title and description contain the words entered.
 
-    except FileNotFoundError:
-        print("Error: 'tasks.txt' file not found.")
+    Every word must appear; a word ending in '*' matches any word that
+    starts with it. The search can be narrowed to one assignee and to
+    completed or incomplete tasks. Matches come from the word index and are
+    shown a page at a time.
 
+    Parameters:
+        None
 
+    Returns:
+        None
+    """
+    query = input("Search for (words, 'prefix*' allowed): ").strip()
+    filters = {"query": query}
+    assigned_to = input(
+        "Only tasks assigned to (or press Enter for any user): "
+    ).strip()
+    if assigned_to:
+        filters["assigned_to"] = assigned_to
+    status = input(
+        "Only completed (c) or incomplete (i) tasks? (or press Enter for both): "
+    ).strip().lower()
+    if status in ("c", "i"):
+        filters["completed"] = status == "c"
+
+    try:
+        if not show_task_pages(**filters):
+            print("No matching tasks found.")
+    except ValueError as error:
+        print(error)
+
+
+@metrics.operation("view_completed")
 def view_completed():
     """
-    Displays all completed tasks from 'tasks.txt'.
+    Displays all completed tasks in the task store.
 
-    Filters tasks that end with 'Yes' (indicating completion) and prints
-    their details. Skips display if no completed tasks are found.
+    The completion filter is applied while the store is streamed, and the
+    matching tasks are shown a page at a time. Skips display if no completed
+    tasks are found.
 
     Parameters:
         None
@@ -291,41 +362,19 @@ def view_completed():
     Returns:
         None
     """
-    try:
-        with open("tasks.txt", "r", encoding="utf-8") as text_file:
-            tasks = text_file.readlines()
-            completed_tasks = [
-                t for t in tasks if t.strip().endswith("Yes")
-            ]
-            if not completed_tasks:
-                print("No completed tasks found.")
-                return
-
-            for i, task in enumerate(completed_tasks, 1):
-                assigned_to, title, desc, date_assigned, due, done = (
-                    task.strip().split(", ")
-                )
-
-                print(f"\nTask {i}:")
-                print(f"Assigned to: {assigned_to}")
-                print(f"Title: {title}")
-                print(f"Description: {desc}")
-                print(f"Assigned Date: {date_assigned}")
-                print(f"Due Date: {due}")
-                print(f"Completed: {done}")
-
-    except FileNotFoundError:
-        print("No tasks file found.")
+    if not show_task_pages(completed=True):
+        print("No completed tasks found.")
 
 
+@metrics.operation("delete_task")
 def delete_task():
     """
-    Allows the user to delete a task from 'tasks.txt'.
+    Allows the user to delete a task from the task store.
 
-    Displays all valid tasks with their details, skipping any malformed
-    entries. Prompts the user to select a task to delete by its number.
-    If confirmed, removes the selected task from the file and updates
-    the task list.
+    Displays all tasks with their IDs and prompts the user to select one to
+    delete. Only the selected task is removed, even if other tasks hold
+    identical details, and the deletion is recorded as a single appended
+    record rather than a rewrite of every task.
 
     Parameters:
         None
@@ -333,77 +382,140 @@ def delete_task():
     Returns:
         None
     """
-    try:
-        with open("tasks.txt", "r", encoding="utf-8") as data_source:
-            tasks = data_source.readlines()
+    if not len(service.store):
+        print("No tasks to delete.")
+        return
 
-        if not tasks:
-            print("No tasks to delete.")
-            return
+    print("\nTask List:")
+    for task_id, task in service.all_tasks():
+        assigned_to, title, desc, date_assigned, due, done = task.to_fields()
 
-        valid_tasks = []
-        print("\nTask List:")
-        for i, task in enumerate(tasks, 1):
-            task_parts = task.strip().split(", ")
-            if len(task_parts) < 6:
-                print(f"Skipping malformed line {i}: {task.strip()}")
-                continue
+        print(f"\nTask {task_id}:")
+        print(f"Assigned to: {assigned_to}")
+        print(f"Title: {title}")
+        print(f"Description: {desc}")
+        print(f"Assigned Date: {date_assigned}")
+        print(f"Due Date: {due}")
+        print(f"Completed: {done}")
 
-            assigned_to, title, desc, date_assigned, due, done = task_parts
-            valid_tasks.append(task)
+    selection = input(
+        "\nEnter task number to delete or '-1' to cancel: "
+    ).strip()
 
-            print(f"\nTask {i}:")
-            print(f"Assigned to: {assigned_to}")
-            print(f"Title: {title}")
-            print(f"Description: {desc}")
-            print(f"Assigned Date: {date_assigned}")
-            print(f"Due Date: {due}")
-            print(f"Completed: {done}")
-
-        if not valid_tasks:
-            print("No valid tasks available for deletion.")
-            return
+    if selection == "-1":
+        print("Deletion cancelled.")
+        return
 
-        selection = input(
-            "\nEnter task number to delete or '-1' to cancel: "
-        ).strip()
+    if not selection.isdigit() or int(selection) not in service.store:
+        print("Invalid selection.")
+        return
 
-        if selection == "-1":
-            print("Deletion cancelled.")
-            return
+    deleted_task = service.delete_task(int(selection))
 
-        if not selection.isdigit() or not (
-            1 <= int(selection) <= len(valid_tasks)
-        ):
-            print("Invalid selection.")
+    print(f"\nDeleted Task: {', '.join(deleted_task.to_fields())}")
+    print("Task deleted successfully.")
+
+
+@metrics.operation("bulk_delete_tasks")
+def bulk_delete_tasks():
+    """
+    Deletes every task matching a filter in a single operation.
+
+    The admin can delete all tasks assigned to one user, all completed tasks
+    due before a date, or both filters combined.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    assigned_to = input(
+        "Delete tasks assigned to (or press Enter for any user): "
+    ).strip()
+    if assigned_to and assigned_to not in service.credentials:
+        print("User does not exist.")
+        return
+
+    before = input(
+        "Only delete completed tasks due before (DD Mon YYYY) "
+        "(or press Enter to skip): "
+    ).strip()
+    completed_before = None
+    if before:
+        if parse_date(before) is None:
+            print("Invalid date format.")
             return
+        completed_before = date.fromordinal(parse_date(before))
 
-        task_index = int(selection) - 1
-        deleted_task = valid_tasks.pop(task_index)
+    if not assigned_to and completed_before is None:
+        print("Please enter at least one filter.")
+        return
 
-        updated_tasks = [
-            task for task in tasks
-            if task.strip() != deleted_task.strip()
-        ]
+    confirm = input("Are you sure you want to delete these tasks? (y/n): ")
+    if confirm.strip().lower() != "y":
+        print("Deletion cancelled.")
+        return
 
-        with open("tasks.txt", "w", encoding="utf-8") as doc:
-            doc.writelines(updated_tasks)
+    deleted = service.delete_tasks(assigned_to or None, completed_before)
+    print(f"{deleted} task(s) deleted successfully.")
 
-        print(f"\nDeleted Task: {deleted_task.strip()}")
-        print("Task deleted successfully.")
 
-    except FileNotFoundError:
-        print("Error: 'tasks.txt' file not found.")
+@metrics.operation("view_due")
+def view_due(current_user):
+    """
+    Lists overdue tasks and tasks due within the next few days.
 
+    The counts are taken from the due-date index without fetching any task,
+    and each list is then shown a page at a time through show_task_pages.
+    Admins see every user's tasks; other users see their own.
 
+    Parameters:
+        current_user (str): The username of the currently logged-in user.
+
+    Returns:
+        None
+    """
+    days = input("Show tasks due within how many days? (default 7): ").strip()
+    if days and not days.isdigit():
+        print("Please enter a whole number of days.")
+        return
+    days = int(days) if days else 7
+    if days > MAX_DUE_DAYS:
+        print(f"Please enter at most {MAX_DUE_DAYS} days.")
+        return
+
+    assignee = None if current_user == "admin" else current_user
+    today = date.today()
+    horizon = today + timedelta(days=days)
+    overdue = service.overdue_count(today, assignee)
+    upcoming = service.overdue_count(horizon + timedelta(days=1), assignee) - overdue
+
+    print(f"\nOverdue tasks ({overdue}):")
+    if overdue:
+        show_task_pages(
+            assigned_to=assignee,
+            completed=False,
+            due_to=today - timedelta(days=1),
+        )
+    print(f"\nTasks due in the next {days} day(s) ({upcoming}):")
+    if upcoming:
+        show_task_pages(
+            assigned_to=assignee, completed=False, due_from=today, due_to=horizon
+        )
+
+
+@metrics.operation("generate_reports")
 def generate_reports():
     """
     Generates summary reports for tasks and users.
 
-    Reads task and user data from 'tasks.txt' and 'user.txt', calculates key
-    statistics (e.g. completed, incomplete, overdue tasks), and writes two
-    reports: 'task_overview.txt' and 'user_overview.txt'. Skips malformed
-    entries and handles invalid date formats gracefully.
+    Writes two reports, 'task_overview.txt' and 'user_overview.txt'. The
+    report cache serves them unchanged if no task or user has changed since
+    they were written, and recounts only the affected users if tasks were
+    merely added or updated. Otherwise the task store is streamed once,
+    counting completed, incomplete and overdue tasks globally and per user in
+    the same pass. Tasks with invalid due dates are never counted as overdue.
 
     Parameters:
         None
@@ -413,134 +525,29 @@ def generate_reports():
     """
     print("\nGenerating reports...")
     try:
-        # Load tasks
-        with open("tasks.txt", "r", encoding="utf-8") as script:
-            raw_tasks = script.readlines()
-            tasks = []
-            for statement in raw_tasks:
-                parts = statement.strip().split(", ")
-                if len(parts) < 6:
-                    print(f"Skipping malformed task: {line.strip()}")
-                    continue
-                tasks.append(parts)
-
-        # Load users
-        with open("user.txt", "r", encoding="utf-8") as document:
-            users = [
-                line.strip().split(", ")[0]
-                for line in document.readlines()
-            ]
-
-        total_tasks = len(tasks)
-        total_users = len(users)
-        completed_tasks = sum(1 for t in tasks if t[5].lower() == "yes")
-        incomplete_tasks = total_tasks - completed_tasks
-
-        overdue_tasks = 0
-        for t in tasks:
-            try:
-                if (
-                    t[5].lower() == "no"
-                    and datetime.strptime(t[4], "%d %b %Y") < datetime.today()
-                ):
-                    overdue_tasks += 1
-            except ValueError:
-                print(f"Invalid date format in task: {t}")
-                continue
-
-        percent_incomplete = (
-            (incomplete_tasks / total_tasks) * 100 if total_tasks else 0
-        )
-        percent_overdue = (
-            (overdue_tasks / total_tasks) * 100 if total_tasks else 0
-        )
-
-        # Write task overview
-        with open("task_overview.txt", "w", encoding="utf-8") as record:
-            record.write("Task Overview Report\n")
-            record.write(f"Total tasks: {total_tasks}\n")
-            record.write(f"Completed tasks: {completed_tasks}\n")
-            record.write(f"Incomplete tasks: {incomplete_tasks}\n")
-            record.write(f"Overdue tasks: {overdue_tasks}\n")
-            record.write(
-                f"Percentage incomplete: {percent_incomplete:.2f}%\n"
+        status, counters = report_cache.refresh()
+        if status == CACHED:
+            print("Reports are already up to date.")
+            return
+        if status == REGENERATED and counters.invalid_dates:
+            print(
+                f"Skipped {counters.invalid_dates} task(s) with an invalid "
+                "due date when counting overdue tasks."
             )
-            record.write(f"Percentage overdue: {percent_overdue:.2f}%\n")
-
-        # Write user overview
-        user_set = set(t[0] for t in tasks)
-        with open("user_overview.txt", "w", encoding="utf-8") as input_data:
-            input_data.write(f"Total users registered: {total_users}\n")
-            input_data.write(f"Total tasks: {total_tasks}\n\n")
-
-            for user in user_set:
-                user_tasks = [t for t in tasks if t[0] == user]
-                num_user_tasks = len(user_tasks)
-                completed = sum(
-                    1 for t in user_tasks if t[5].lower() == "yes"
-                )
-                incomplete = num_user_tasks - completed
-
-                overdue = 0
-                for t in user_tasks:
-                    try:
-                        if (
-                            t[5].lower() == "no"
-                            and datetime.strptime(
-                                t[4], "%d %b %Y"
-                            ) < datetime.today()
-                        ):
-                            overdue += 1
-                    except ValueError:
-                        continue
-
-                percent_assigned = (
-                    (num_user_tasks / total_tasks) * 100
-                    if total_tasks else 0
-                )
-                percent_completed = (
-                    (completed / num_user_tasks) * 100
-                    if num_user_tasks else 0
-                )
-                percent_incomplete_user = (
-                    (incomplete / num_user_tasks) * 100
-                    if num_user_tasks else 0
-                )
-                percent_overdue_user = (
-                    (overdue / num_user_tasks) * 100
-                    if num_user_tasks else 0
-                )
-
-                file.write(f"User: {user}\n")
-                file.write(f"Tasks assigned: {num_user_tasks}\n")
-                file.write(
-                    f"  % of total tasks: {percent_assigned:.2f}%\n"
-                )
-                file.write(f"  Completed: {completed}\n")
-                file.write(
-                    f"  % completed: {percent_completed:.2f}%\n"
-                )
-                file.write(f"  Incomplete: {incomplete}\n")
-                file.write(
-                    f"  % incomplete: {percent_incomplete_user:.2f}%\n"
-                )
-                file.write(f"  Overdue: {overdue}\n")
-                file.write(
-                    f"  % overdue: {percent_overdue_user:.2f}%\n\n"
-                )
-
         print("Reports generated successfully.")
 
     except FileNotFoundError:
-        print("Error: 'tasks.txt' file not found.")
+        print("Error: 'user.txt' file not found.")
 
 
+@metrics.operation("display_statistics")
 def display_statistics():
     """
-    Displays the contents of the generated task and user reports.
+    Displays up-to-date task and user statistics.
 
-    Reads and prints data from 'task_overview.txt' and 'user_overview.txt'.
-    If reports are missing, prompts the user to generate them first.
+    The figures come from the incrementally maintained counters, so they
+    reflect every task added, completed, edited or deleted so far and are
+    shown without reading the tasks or regenerating the reports.
 
     Parameters:
         None
@@ -549,36 +556,112 @@ def display_statistics():
         None
     """
     print("\nDisplaying statistics...")
+    counters = service.statistics()
+
+    print("\nTask Overview:")
+    print(task_reports.format_task_overview(counters))
+
+    print("\nUser Overview:")
+    print(task_reports.format_user_overview(counters, len(service.credentials)))
+
+
+def record_history():
+    """
+    Records today's trend snapshot.
+
+    The history only grows forwards, so if it already holds a later day,
+    after a clock change or a restore from backup, a warning is printed and
+    the task manager carries on without recording.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
     try:
-        with open("task_overview.txt", "r", encoding="utf-8") as task_file:
-            task_stats = task_file.read()
+        service.record_history()
+    except ValueError as error:
+        print(f"Warning: today's trend snapshot was not recorded. {error}")
 
-        with open("user_overview.txt", "r", encoding="utf-8") as user_file:
-            user_stats = user_file.read()
 
-        if task_stats:
-            print("\nTask Overview:")
-            print(task_stats)
-        else:
-            print("Unable to display task statistics.")
+@metrics.operation("trend_report")
+def trend_report():
+    """
+    Writes a CSV trend report for a date range and summarises it.
 
-        if user_stats:
-            print("\nUser Overview:")
-            print(user_stats)
-        else:
-            print("Unable to display user statistics.")
+    The figures come from the daily counter snapshots, so the report covers
+    any range of past days without reading the tasks. One row is written per
+    user, plus one for all users, to 'task_trends.csv'.
 
-    except FileNotFoundError:
-        print("Reports not found. Please generate them first using 'gr'.")
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    today = date.today()
+    default_start = today - timedelta(days=30)
+    bounds = []
+    for prompt, default in (
+        (f"Start date (default {default_start.isoformat()}): ", default_start),
+        (f"End date (default {today.isoformat()}): ", today),
+    ):
+        text = input(prompt).strip()
+        if text and parse_date(text) is None:
+            print("Invalid date format. Please use YYYY-MM-DD.")
+            return
+        bounds.append(date.fromordinal(parse_date(text)) if text else default)
+    username = input("Username (leave blank for all users): ").strip()
+
+    try:
+        rows = list(
+            service.history.trends(*bounds, [username] if username else None)
+        )
+    except ValueError as error:
+        print(error)
+        return
+    with open(TRENDS_FILE, "w", encoding="utf-8", newline="") as out:
+        write_trends(rows, out)
+
+    print(f"\nTrends from {rows[0][1]} to {rows[0][2]}:")
+    for user, _, _, _, *figures in rows:
+        completed, overdue = figures[4:8], figures[8:12]
+        print(
+            f"  {user}: completed {completed[0]} -> {completed[1]} "
+            f"({completed[2]:+d}), overdue {overdue[0]} -> {overdue[1]} "
+            f"(mean {overdue[3]:.2f})"
+        )
+    print(f"Trend report written to '{TRENDS_FILE}'.")
+
+
+def view_metrics():
+    """
+    Shows latency percentiles and resource use for each menu operation.
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    if not metrics.enabled:
+        print("Metrics are off. Start the task manager with TASK_METRICS=1.")
+        return
+    if not metrics.operations:
+        print("No operations have been measured yet.")
+        return
+    print(metrics.format_summary())
+    metrics.flush()
+    print(f"Metrics saved to '{metrics.path}'.")
 
 
 def read_report_file(filename):
     """
     Reads and returns the contents of a report file.
 
-    Attempts to open the specified file and return its contents. If the file
-    is not found, triggers report generation and retries. Returns None if
-    the file still cannot be found.
+    The reports are brought up to date through the report cache first, so
+    the text returned always reflects the current tasks and users.
 
     Parameters:
         filename (str): The name of the report file to read.
@@ -587,79 +670,111 @@ def read_report_file(filename):
         The contents of the file, or None if unavailable.
     """
     try:
-        with open(filename, "r", encoding="utf-8") as dataset:
-            return dataset.read()
+        return report_cache.read(filename)
     except FileNotFoundError:
-        print(f"Warning: '{filename}' not found. Generating reports...")
-        generate_reports()
-        try:
-            with open(filename, "r", encoding="utf-8") as data_file:
-                return data_file.read()
-        except FileNotFoundError:
-            print(f"Error: Failed to generate '{filename}'.")
-            return None
-
-
-# ***Main menu loop***
-while True:
-    if is_admin:
-        menu = input(
-            '''\nSelect one of the following options:
-r  - register a user
-a  - add task
-va - view all tasks
-vm - view my tasks
-vc - view completed tasks
-del-delete tasks
-ds - display statistics
-gr -generate reports
-e  - exit
-: '''
-        ).lower()
-    else:
-        menu = input(
-            '''\nPlease select one of the following options:
-a   - add task
-va  - view all tasks
-vm  - view my tasks
-e   - exit
-: '''
-        ).lower()
+        print(f"Error: Failed to generate '{filename}'.")
+        return None
+
+
+def login():
+    """
+    Prompts for a username and password until a valid pair is entered.
+
+    Returns:
+        str: The username that logged in.
+    """
+    while True:
+        username = input("Enter your username: ").strip()
+        password = input("Enter your password: ").strip()
 
-    if menu == 'r' and is_admin:
-        print("Registration in progress...")
-        reg_user()
+        if service.login(username, password):
+            print(f"Welcome, {username}!")
+            return username
+        else:
+            print("Invalid username or password. Please try again.")
+
+
+def main():
+    """
+    Runs the interactive task manager: login followed by the main menu.
 
-    elif menu == 'a':
-        print("Adding a new task...")
-        add_task()
+    Returns:
+        None
+    """
+    # ==== Login Section ====
+    try:
+        username = login()
+    except FileNotFoundError:
+        print("Error: 'user.txt' file not found.")
+        return
 
-    elif menu == 'va':
-        print("Viewing all tasks...")
-        view_all()
+    is_admin = username == "admin"
+    record_history()
 
-    elif menu == 'vm':
-        print("Viewing your tasks...")
-        view_mine(username)
+    # ***Main menu loop***
+    while True:
+        menu = input(ADMIN_MENU if is_admin else USER_MENU).lower()
 
-    elif menu == 'vc' and is_admin:
-        print("Viewing completed tasks...")
-        view_completed()
+        if menu == 'r' and is_admin:
+            print("Registration in progress...")
+            reg_user(username)
 
-    elif menu == 'del' and is_admin:
-        print("Deleting a task...")
-        delete_task()
+        elif menu == 'a':
+            print("Adding a new task...")
+            add_task()
 
-    elif menu == 'ds' and is_admin:
-        print("***STATISTICS***")
-        display_statistics()
+        elif menu == 'va':
+            print("Viewing all tasks...")
+            view_all()
 
-    elif menu == 'gr' and is_admin:
-        generate_reports()
+        elif menu == 'vm':
+            print("Viewing your tasks...")
+            view_mine(username)
+
+        elif menu == 'vd':
+            print("Viewing overdue and upcoming tasks...")
+            view_due(username)
+
+        elif menu == 's':
+            print("Searching tasks...")
+            search_tasks()
+
+        elif menu == 'vc' and is_admin:
+            print("Viewing completed tasks...")
+            view_completed()
+
+        elif menu == 'del' and is_admin:
+            print("Deleting a task...")
+            delete_task()
+
+        elif menu == 'bd' and is_admin:
+            print("Bulk deleting tasks...")
+            bulk_delete_tasks()
+
+        elif menu == 'ds' and is_admin:
+            print("***STATISTICS***")
+            display_statistics()
+
+        elif menu == 'gr' and is_admin:
+            generate_reports()
+
+        elif menu == 'mt' and is_admin:
+            view_metrics()
+
+        elif menu == 'tr' and is_admin:
+            print("Building trend report...")
+            trend_report()
+
+        elif menu == 'e':
+            record_history()
+            metrics.flush()
+            service.close()
+            print("Thanks for using task manager! See you next time.")
+            break
+
+        else:
+            print("Invalid option. Please try again.")
 
-    elif menu == 'e':
-        print("Thanks for using task manager! See you next time.")
-        break
 
-    else:
-        print("Invalid option. Please try again.")
+if __name__ == "__main__":
+    main()
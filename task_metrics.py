@@ -0,0 +1,241 @@
+"""
+Opt-in instrumentation for the task manager's menu operations.
+
+Set TASK_METRICS=1 to turn it on. Each instrumented operation then records:
+  - its latency in a log-scale histogram, excluding time spent waiting at a
+    prompt, so that p50, p95 and p99 reflect the work done rather than the
+    user's typing;
+  - bytes read and written by the process, from /proc/self/io (reported as
+    zero where that file does not exist);
+  - rows scanned, meaning task records the store decoded.
+
+Work done in report worker processes is timed but its bytes and rows are not
+counted. The figures for the current session are written to
+'task_metrics.json' at most once every FLUSH_INTERVAL seconds, after an
+operation completes, and again when the session ends. With metrics turned
+off, the operations are left unwrapped and cost nothing extra.
+"""
+import builtins
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+METRICS_FILE = "task_metrics.json"
+FLUSH_INTERVAL = 30
+IO_FILE = "/proc/self/io"
+
+# Histogram buckets are a quarter of a power of two wide (about 19%), from
+# one microsecond up to about 18 minutes.
+BUCKETS_PER_DOUBLING = 4
+BUCKETS = 30 * BUCKETS_PER_DOUBLING
+
+
+def io_counters():
+    """Returns (bytes read, bytes written) by this process so far."""
+    try:
+        with open(IO_FILE, "rb") as io_file:
+            fields = dict(line.split(b":") for line in io_file.read().splitlines())
+    except OSError:
+        return 0, 0
+    return int(fields[b"rchar"]), int(fields[b"wchar"])
+
+
+class Histogram:
+    """
+    Counts latencies in logarithmic buckets.
+
+    Percentiles are read from the bucket holding the requested rank, so
+    they are accurate to within one bucket width, and never exceed the
+    largest latency seen.
+    """
+
+    __slots__ = ("counts", "count", "total", "largest")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.largest = 0.0
+
+    @staticmethod
+    def bucket(seconds):
+        micros = seconds * 1e6
+        if micros <= 1:
+            return 0
+        return min(int(math.log2(micros) * BUCKETS_PER_DOUBLING), BUCKETS - 1)
+
+    def record(self, seconds):
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.largest = max(self.largest, seconds)
+
+    def percentile(self, fraction):
+        """Returns the latency in seconds below which `fraction` of calls fell."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(fraction * self.count)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                upper = 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING) / 1e6
+                return min(upper, self.largest)
+        return self.largest
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "max_s": self.largest,
+            "buckets": {
+                str(bucket): count
+                for bucket, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+class OperationStats:
+    """Latency histogram and resource totals for one operation."""
+
+    __slots__ = ("latency", "bytes_read", "bytes_written", "rows_scanned", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.rows_scanned = 0
+        self.errors = 0
+
+    def to_dict(self):
+        latency = self.latency
+        return {
+            "latency": latency.to_dict(),
+            "p50_ms": latency.percentile(0.50) * 1000,
+            "p95_ms": latency.percentile(0.95) * 1000,
+            "p99_ms": latency.percentile(0.99) * 1000,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "rows_scanned": self.rows_scanned,
+            "errors": self.errors,
+        }
+
+
+class Metrics:
+    """
+    Records per-operation metrics for a TaskService's session.
+
+    Parameters:
+        service (TaskService): Supplies the count of rows scanned.
+        enabled (bool): If False, operation() leaves functions unwrapped and
+            input is the built-in input().
+        path (str): The metrics file.
+        flush_interval (float): Minimum seconds between flushes.
+    """
+
+    def __init__(
+        self, service, enabled=True, path=METRICS_FILE, flush_interval=FLUSH_INTERVAL
+    ):
+        self.service = service
+        self.enabled = enabled
+        self.path = path
+        self.flush_interval = flush_interval
+        self.operations = {}
+        self.started = time.time()
+        self._flushed = time.monotonic()
+        self._waiting = 0.0
+        self.input = self._timed_input if enabled else builtins.input
+
+    @classmethod
+    def from_environment(cls, service):
+        """Returns Metrics that are enabled if TASK_METRICS is set and not 0."""
+        return cls(service, os.environ.get("TASK_METRICS", "0") not in ("", "0"))
+
+    def _timed_input(self, prompt=""):
+        """input() that keeps prompt time out of operation latencies."""
+        started = time.perf_counter()
+        try:
+            return builtins.input(prompt)
+        finally:
+            self._waiting += time.perf_counter() - started
+
+    @contextmanager
+    def measure(self, name):
+        """Records the block as one call of an operation."""
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        read, written = io_counters()
+        rows = self.service.rows_read
+        waited = self._waiting
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started - (self._waiting - waited)
+            stats.latency.record(max(elapsed, 0.0))
+            now_read, now_written = io_counters()
+            stats.bytes_read += now_read - read
+            stats.bytes_written += now_written - written
+            stats.rows_scanned += max(self.service.rows_read - rows, 0)
+            if time.monotonic() - self._flushed >= self.flush_interval:
+                self.flush()
+
+    def operation(self, name):
+        """Decorator that measures every call of a function as `name`."""
+        def decorate(function):
+            if not self.enabled:
+                return function
+
+            @wraps(function)
+            def measured(*args, **kwargs):
+                with self.measure(name):
+                    return function(*args, **kwargs)
+            return measured
+        return decorate
+
+    def flush(self):
+        """Atomically writes the session's metrics to the metrics file."""
+        self._flushed = time.monotonic()
+        if not self.enabled:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+            json.dump(
+                {
+                    "pid": os.getpid(),
+                    "started": self.started,
+                    "flushed": time.time(),
+                    "operations": {
+                        name: stats.to_dict()
+                        for name, stats in sorted(self.operations.items())
+                    },
+                },
+                metrics_file,
+            )
+        os.replace(tmp_path, self.path)
+
+    def format_summary(self):
+        """Returns a table of calls, latency percentiles and resources."""
+        lines = [
+            f"{'operation':<20} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'KB read':>9} {'KB written':>10} {'rows':>9}"
+        ]
+        for name, stats in sorted(self.operations.items()):
+            latency = stats.latency
+            lines.append(
+                f"{name:<20} {latency.count:>6} "
+                f"{latency.percentile(0.50) * 1000:>9.2f} "
+                f"{latency.percentile(0.95) * 1000:>9.2f} "
+                f"{latency.percentile(0.99) * 1000:>9.2f} "
+                f"{stats.bytes_read / 1024:>9.1f} "
+                f"{stats.bytes_written / 1024:>10.1f} {stats.rows_scanned:>9}"
+            )
+        return "\n".join(lines)
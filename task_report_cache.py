@@ -0,0 +1,291 @@
+"""
+Fingerprinted cache for the overview reports.
+
+ReportCache remembers the per-user counters behind the last reports together
+with a fingerprint (size, modification time and SHA-256) of every file they
+were computed from. When the reports are requested again, the following
+cases apply, from cheapest to most expensive:
+
+  - If no source file has changed size or modification time, the report
+    files on disk are served as they are.
+  - A file that was touched but still hashes the same counts as unchanged.
+  - If only the user file changed, the reports are re-rendered from the
+    cached counters with the new registered-user count.
+  - If the task log was only appended to, meaning its old contents hash the
+    same as before, and none of the new records is a deletion, only the
+    users named in the new records are recounted, through the per-user
+    index.
+  - Anything else, or a new day (which changes what is overdue), regenerates
+    the reports from every task.
+
+A deletion's tombstone does not name the user who lost the task, which is
+why deletions force a full regeneration. Otherwise a user who was not named
+in the new records can only have lost tasks, through a reassignment, so the
+recount is checked before it is used: if the users' assignments no longer
+add up to the number of stored tasks, the reports are regenerated in full
+instead. The recount holds the store lock, so the per-user index has caught
+up with every record in the log, including any written by other processes.
+"""
+import hashlib
+import json
+import os
+from datetime import date
+
+from task_reports import (
+    TASK_OVERVIEW_FILE,
+    USER_OVERVIEW_FILE,
+    ReportCounters,
+    format_task_overview,
+    format_user_overview,
+)
+from task_store import PUT, iter_records
+
+CACHE_FILE = "report_cache.json"
+HASH_CHUNK = 1 << 20
+
+# How refresh() produced the reports.
+CACHED = "cached"
+UPDATED = "updated"
+REGENERATED = "regenerated"
+
+
+def file_state(path):
+    """Returns [size, mtime in ns] for a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _feed(digest, source, limit=None):
+    """Hashes up to `limit` bytes (or the rest) of an open file."""
+    while limit is None or limit > 0:
+        chunk = source.read(HASH_CHUNK if limit is None else min(HASH_CHUNK, limit))
+        if not chunk:
+            break
+        digest.update(chunk)
+        if limit is not None:
+            limit -= len(chunk)
+
+
+def file_digest(path, prefix=None):
+    """
+    Hashes a file, optionally also reporting the hash of its first bytes.
+
+    Both digests come from a single read of the file.
+
+    Parameters:
+        path (str): The file to hash.
+        prefix (int): If given, also hash the first `prefix` bytes.
+
+    Returns:
+        tuple: (SHA-256 hex digest of the file, digest of the prefix or None).
+    """
+    digest = hashlib.sha256()
+    prefix_digest = None
+    with open(path, "rb") as source:
+        if prefix is not None:
+            _feed(digest, source, prefix)
+            prefix_digest = digest.hexdigest()
+        _feed(digest, source)
+    return digest.hexdigest(), prefix_digest
+
+
+def _text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    Serves the overview reports, recomputing only what changed.
+
+    Parameters:
+        service (TaskService): Supplies the tasks, the per-user index and
+            the list of source files.
+        path (str): Where the cache is saved.
+    """
+
+    def __init__(self, service, path=CACHE_FILE):
+        self.service = service
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self, saved):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(saved, cache_file)
+        os.replace(tmp_path, self.path)
+
+    # ---- Change detection ----
+    def _changes(self, saved, sources):
+        """
+        Compares the source files with their cached fingerprints.
+
+        Returns:
+            tuple: (new fingerprints, offset the task log was appended from
+            or None), or None if the reports must be regenerated.
+        """
+        fingerprints = {}
+        appended_from = None
+        log_path = sources["tasks"][0] if self.service.backend == "log" else None
+        for path in sources["tasks"] + sources["users"]:
+            old = saved["sources"].get(path)
+            state = file_state(path)
+            if state is None or old is None:
+                if state != old:
+                    return None
+                fingerprints[path] = None
+                continue
+            if state == old[:2]:
+                fingerprints[path] = old
+                continue
+
+            old_size = old[0] if path == log_path and state[0] > old[0] else None
+            digest, prefix_digest = file_digest(path, old_size)
+            fingerprints[path] = state + [digest]
+            if digest == old[2] or path in sources["users"]:
+                continue
+            if prefix_digest == old[2]:
+                appended_from = old_size
+                continue
+            return None
+        return fingerprints, appended_from
+
+    def _recount(self, users, log_path, appended_from, today):
+        """
+        Recounts the users named in records appended to the log.
+
+        Returns:
+            dict: The updated per-user counters, or None if a user who was
+            not recounted may also have changed.
+        """
+        store = self.service.store
+        with store.locked():
+            affected = set()
+            for op, _, fields in iter_records(log_path, appended_from):
+                if op != PUT:
+                    return None
+                affected.add(fields[0])
+            users = dict(users)
+            for user in affected:
+                counts = ReportCounters(today).add_all(
+                    task for _, task in self.service.tasks_for(user)
+                ).users.get(user)
+                if counts:
+                    users[user] = counts
+                else:
+                    users.pop(user, None)
+            if sum(counts[0] for counts in users.values()) != len(store):
+                return None
+        return users
+
+    # ---- Public API ----
+    def refresh(self, today=None):
+        """
+        Makes sure both report files reflect the current tasks and users.
+
+        Parameters:
+            today (date): The date overdue tasks are measured against.
+
+        Returns:
+            tuple: (CACHED, UPDATED or REGENERATED, and the ReportCounters
+            from a full regeneration or None otherwise).
+        """
+        today = today or date.today()
+        saved = self._load()
+        sources = self.service.report_sources()
+
+        changes = None
+        if saved and saved["today"] == today.toordinal():
+            changes = self._changes(saved, sources)
+
+        if changes == (saved and saved["sources"], None) and all(
+            self._file_matches(name, digest)
+            for name, digest in saved["reports"].items()
+        ):
+            return CACHED, None
+
+        counters = None
+        if changes is not None:
+            fingerprints, appended_from = changes
+            users = saved["users"]
+            if appended_from is not None:
+                users = self._recount(
+                    users, sources["tasks"][0], appended_from, today
+                )
+        if changes is None or users is None:
+            # Fingerprint first: records written during the scan are then
+            # seen as appended next time, and recounting them is harmless.
+            fingerprints = {
+                path: self._fingerprint(path)
+                for path in sources["tasks"] + sources["users"]
+            }
+            counters = self.service.generate_reports(today=today)
+            users = counters.users
+
+        total_users = len(self.service.credentials)
+        written = self._write_reports(saved, users, total_users, today)
+        self._save(
+            {
+                "today": today.toordinal(),
+                "sources": fingerprints,
+                "users": users,
+                "reports": written,
+            }
+        )
+        if counters is not None:
+            return REGENERATED, counters
+        unchanged = saved["users"] == users and saved["reports"] == written
+        return (CACHED if unchanged else UPDATED), None
+
+    def _write_reports(self, saved, users, total_users, today):
+        """Writes any report whose text differs from the file on disk."""
+        counters = ReportCounters(today)
+        counters.users = users
+        for assigned, completed, overdue in users.values():
+            counters.total += assigned
+            counters.completed += completed
+            counters.overdue += overdue
+
+        written = {}
+        for name, text in (
+            (TASK_OVERVIEW_FILE, format_task_overview(counters)),
+            (USER_OVERVIEW_FILE, format_user_overview(counters, total_users)),
+        ):
+            digest = _text_digest(text)
+            if not (
+                saved
+                and saved["reports"].get(name) == digest
+                and self._file_matches(name, digest)
+            ):
+                with open(name, "w", encoding="utf-8") as report:
+                    report.write(text)
+            written[name] = digest
+        return written
+
+    @staticmethod
+    def _fingerprint(path):
+        state = file_state(path)
+        return state and state + [file_digest(path)[0]]
+
+    @staticmethod
+    def _file_matches(name, digest):
+        """Returns True if a report file exists and has the given digest."""
+        try:
+            with open(name, "r", encoding="utf-8") as report:
+                return _text_digest(report.read()) == digest
+        except FileNotFoundError:
+            return False
+
+    def read(self, name, today=None):
+        """Refreshes the reports if needed and returns one report's text."""
+        self.refresh(today)
+        with open(name, "r", encoding="utf-8") as report:
+            return report.read()
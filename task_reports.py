@@ -0,0 +1,236 @@
+"""
+Single-pass report engine for the task manager.
+
+Tasks are streamed once. Each due date is parsed at most once, and every
+global and per-user counter is updated in the same pass, so memory use depends
+on the number of users rather than the number of tasks. The results are
+written in the 'task_overview.txt' and 'user_overview.txt' formats produced
+by the original task manager, with users listed in name order.
+
+For very large stores, generate_reports_parallel splits the task log into
+byte ranges aligned on record boundaries, counts each range in its own
+process against a snapshot of the index and merges the partial counters.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from task_store import iter_live_tasks
+
+TASK_OVERVIEW_FILE = "task_overview.txt"
+USER_OVERVIEW_FILE = "user_overview.txt"
+
+# Positions in the per-user counter lists.
+ASSIGNED, COMPLETED, OVERDUE = range(3)
+
+
+def _percent(part, whole):
+    return (part / whole) * 100 if whole else 0
+
+
+class ReportCounters:
+    """
+    Running totals for the task and user overview reports.
+
+    Attributes:
+        total (int): Number of tasks counted.
+        completed (int): Number of completed tasks.
+        overdue (int): Number of incomplete tasks past their due date.
+        invalid_dates (int): Incomplete tasks whose due date could not be
+            parsed; these are never counted as overdue.
+        users (dict): Maps each assignee to [assigned, completed, overdue].
+    """
+
+    __slots__ = (
+        "today", "cutoff", "total", "completed", "overdue", "invalid_dates", "users"
+    )
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+        self.cutoff = self.today.toordinal()
+        self.total = 0
+        self.completed = 0
+        self.overdue = 0
+        self.invalid_dates = 0
+        self.users = {}
+
+    @property
+    def incomplete(self):
+        return self.total - self.completed
+
+    def add(self, task):
+        """
+        Counts one task.
+
+        Parameters:
+            task (Task): The task to count.
+        """
+        user = self.users.get(task.assigned_to)
+        if user is None:
+            user = self.users[task.assigned_to] = [0, 0, 0]
+
+        self.total += 1
+        user[ASSIGNED] += 1
+
+        if task.completed:
+            self.completed += 1
+            user[COMPLETED] += 1
+            return
+
+        due = task.due_ordinal
+        if due is None:
+            self.invalid_dates += 1
+        elif due < self.cutoff:
+            self.overdue += 1
+            user[OVERDUE] += 1
+
+    def add_all(self, tasks):
+        """Counts every task in an iterable, consuming it once."""
+        for task in tasks:
+            self.add(task)
+        return self
+
+    def merge(self, other):
+        """Adds the totals from another set of counters into this one."""
+        self.total += other.total
+        self.completed += other.completed
+        self.overdue += other.overdue
+        self.invalid_dates += other.invalid_dates
+        for user, counts in other.users.items():
+            mine = self.users.get(user)
+            if mine is None:
+                self.users[user] = list(counts)
+            else:
+                for position, count in enumerate(counts):
+                    mine[position] += count
+        return self
+
+
+def format_task_overview(counters):
+    """Returns the task overview report text for a set of counters."""
+    total = counters.total
+    return (
+        "Task Overview Report\n"
+        f"Total tasks: {total}\n"
+        f"Completed tasks: {counters.completed}\n"
+        f"Incomplete tasks: {counters.incomplete}\n"
+        f"Overdue tasks: {counters.overdue}\n"
+        f"Percentage incomplete: {_percent(counters.incomplete, total):.2f}%\n"
+        f"Percentage overdue: {_percent(counters.overdue, total):.2f}%\n"
+    )
+
+
+def format_user_section(user, assigned, completed, overdue, total):
+    """Returns the user overview section for a single user."""
+    incomplete = assigned - completed
+    return (
+        f"User: {user}\n"
+        f"Tasks assigned: {assigned}\n"
+        f"  % of total tasks: {_percent(assigned, total):.2f}%\n"
+        f"  Completed: {completed}\n"
+        f"  % completed: {_percent(completed, assigned):.2f}%\n"
+        f"  Incomplete: {incomplete}\n"
+        f"  % incomplete: {_percent(incomplete, assigned):.2f}%\n"
+        f"  Overdue: {overdue}\n"
+        f"  % overdue: {_percent(overdue, assigned):.2f}%\n\n"
+    )
+
+
+def format_user_overview(counters, total_users):
+    """Returns the user overview report text for a set of counters."""
+    total = counters.total
+    sections = [f"Total users registered: {total_users}\nTotal tasks: {total}\n\n"]
+    for user in sorted(counters.users):
+        assigned, completed, overdue = counters.users[user]
+        sections.append(
+            format_user_section(user, assigned, completed, overdue, total)
+        )
+    return "".join(sections)
+
+
+def write_task_overview(counters, path=TASK_OVERVIEW_FILE):
+    """Writes the task overview report for a set of counters."""
+    with open(path, "w", encoding="utf-8") as record:
+        record.write(format_task_overview(counters))
+
+
+def write_user_overview(counters, total_users, path=USER_OVERVIEW_FILE):
+    """Writes the user overview report for a set of counters."""
+    with open(path, "w", encoding="utf-8") as record:
+        record.write(format_user_overview(counters, total_users))
+
+
+def generate_reports(tasks, total_users, today=None):
+    """
+    Builds both overview reports from a single pass over the tasks.
+
+    Parameters:
+        tasks (iterable): Task records, e.g. streamed from the task store.
+        total_users (int): The number of registered users.
+        today (date): The date overdue tasks are measured against.
+
+    Returns:
+        ReportCounters: The totals that were written.
+    """
+    counters = ReportCounters(today).add_all(tasks)
+    write_task_overview(counters)
+    write_user_overview(counters, total_users)
+    return counters
+
+
+def _count_shard(shard):
+    """Worker entry point: counts the live tasks in one byte range of the log."""
+    log_path, index_path, start, end, today = shard
+    return ReportCounters(today).add_all(
+        iter_live_tasks(log_path, index_path, start, end)
+    )
+
+
+def generate_reports_parallel(store, total_users, workers=None, today=None):
+    """
+    Builds both overview reports using several processes.
+
+    The store's index is copied under its lock, which is then released, so
+    writers carry on while the workers count. The log up to the snapshot's
+    end is split into one byte range per worker; each worker counts the live
+    tasks in its range against the copy and the partial counters are merged,
+    so the reports are identical to those from generate_reports. If the log
+    is compacted meanwhile, the count is taken again.
+
+    Parameters:
+        store (TaskStore): The store to report on.
+        total_users (int): The number of registered users.
+        workers (int): Number of worker processes; defaults to the CPU count.
+        today (date): The date overdue tasks are measured against.
+
+    Returns:
+        ReportCounters: The totals that were written.
+    """
+    workers = workers or os.cpu_count() or 1
+    today = today or date.today()
+    handle, index_path = tempfile.mkstemp(
+        suffix=".report", dir=os.path.dirname(os.path.abspath(store.index_path))
+    )
+    os.close(handle)
+    try:
+        while True:
+            generation, size = store.snapshot_index(index_path)
+            bounds = [size * n // workers for n in range(workers + 1)]
+            shards = [
+                (store.log_path, index_path, bounds[n], bounds[n + 1], today)
+                for n in range(workers)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                counters = ReportCounters(today)
+                for partial in pool.map(_count_shard, shards):
+                    counters.merge(partial)
+            with store.locked():
+                if store.generation == generation:
+                    break
+    finally:
+        os.remove(index_path)
+
+    write_task_overview(counters)
+    write_user_overview(counters, total_users)
+    return counters
@@ -0,0 +1,322 @@
+"""
+Asyncio network server for the task manager.
+
+Clients connect over localhost TCP or a Unix socket and exchange one JSON
+object per line. Each request names an operation and its arguments, and an
+optional "id" is echoed back so that clients can pipeline requests:
+
+    {"id": 1, "op": "login", "username": "admin", "password": "..."}
+    {"id": 1, "ok": true, "user": "admin"}
+    {"id": 2, "op": "list-mine", "limit": 20}
+    {"id": 2, "ok": true, "tasks": [...], "cursor": null}
+
+Operations: login, add, list-mine, complete, edit, delete and report. Every
+operation except login needs a logged-in connection. Users may complete and
+edit only their own tasks, and delete and report are reserved for the
+admin, as in the interactive menu. Failures are answered with
+{"ok": false, "error": "..."}.
+
+All connections share one TaskService. Reads are answered directly from it.
+Writes are queued to a single writer coroutine, which applies whatever has
+queued up as one batch under the store lock, so a burst of writes from many
+clients costs one group commit. Password hashes are checked in a thread pool
+to keep the event loop responsive while PBKDF2 runs. Reports wait for the
+writes queued before them and are then built one at a time in a thread of
+their own, so a large report does not stall the other clients.
+
+Usage (from the directory holding user.txt and the task store):
+    python task_server.py --port 8765
+    python task_server.py --unix /tmp/tasks.sock
+"""
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import task_reports
+from task_auth import check_password, hash_password, needs_rehash
+from task_bulk import COLUMNS
+from task_service import PAGE_SIZE, TaskService
+
+HOST = "127.0.0.1"
+PORT = 8765
+ADMIN = "admin"
+MAX_PAGE = 1000
+
+
+class RequestError(Exception):
+    """A request that is answered with an error message."""
+
+
+def task_id_of(request):
+    """Returns the request's task ID, or raises RequestError."""
+    try:
+        return int(request["task_id"])
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("A numeric task_id is required.") from None
+
+
+def optional_text(request, key):
+    """Returns a request field as a string, or None if it was not given."""
+    value = request.get(key)
+    return None if value is None else str(value)
+
+
+def task_to_dict(task_id, task):
+    """Returns a task as a JSON-ready dict in the bulk export columns."""
+    return dict(zip(COLUMNS, task.to_fields()), id=task_id)
+
+
+class TaskServer:
+    """
+    Serves task manager operations to many concurrent clients.
+
+    Parameters:
+        service (TaskService): The shared service all connections use.
+        hash_workers (int): Threads used for password checks.
+    """
+
+    def __init__(self, service, hash_workers=4):
+        self.service = service
+        self._hashing = ThreadPoolExecutor(hash_workers)
+        self._reporting = ThreadPoolExecutor(1)
+        self._writes = asyncio.Queue()
+        self._writer = None
+
+    # ---- Writer ----
+    async def _write_loop(self):
+        """Applies queued writes in batches, one store lock per batch."""
+        while True:
+            batch = [await self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                with self.service.store.locked():
+                    for operation, args, future in batch:
+                        if future.cancelled():
+                            continue
+                        try:
+                            future.set_result(operation(*args))
+                        except Exception as error:
+                            # Hand every failure back so one bad request
+                            # cannot stop the writer.
+                            future.set_exception(error)
+            except Exception as error:
+                # Taking or releasing the lock failed, for example on an I/O
+                # error while catching up. Fail this batch and keep serving.
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _write(self, operation, *args):
+        """Queues a write for the writer coroutine and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operation, args, future))
+        return await future
+
+    # ---- Operations ----
+    async def op_login(self, session, request):
+        username = str(request.get("username", ""))
+        password = str(request.get("password", ""))
+        credentials = self.service.credentials
+        stored = credentials.stored_secret(username)
+        loop = asyncio.get_running_loop()
+        valid = stored is not None and await loop.run_in_executor(
+            self._hashing, check_password, password, stored
+        )
+        if not valid:
+            raise RequestError("Invalid username or password.")
+        if needs_rehash(stored, credentials.iterations):
+            # As Credentials.verify does, but hashing off the event loop. The
+            # new hash is patched into place, which is cheap enough to do
+            # here without queueing behind the task writes.
+            secret = await loop.run_in_executor(
+                self._hashing, hash_password, password, credentials.iterations
+            )
+            credentials.replace_secret(username, stored, secret)
+        session["user"] = username
+        return {"user": username}
+
+    async def op_add(self, session, request):
+        task_id = await self._write(
+            self.service.add_task,
+            str(request.get("assigned_to") or session["user"]),
+            str(request.get("title", "")),
+            str(request.get("description", "")),
+            str(request.get("due_date", "")),
+        )
+        return {"task_id": task_id}
+
+    async def op_list_mine(self, session, request):
+        filters = {"assigned_to": session["user"]}
+        if request.get("completed") is not None:
+            filters["completed"] = bool(request["completed"])
+        limit = min(int(request.get("limit", PAGE_SIZE)), MAX_PAGE)
+        if limit < 1:
+            raise RequestError("The limit must be at least 1.")
+        page, cursor = self.service.list_tasks(
+            int(request.get("after", 0)), limit, **filters
+        )
+        return {
+            "tasks": [task_to_dict(task_id, task) for task_id, task in page],
+            "cursor": cursor,
+        }
+
+    def _own(self, session, task_id):
+        """Checks that the session's user may change a task."""
+        task = self.service.get_task(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        if session["user"] != ADMIN and task.assigned_to != session["user"]:
+            raise RequestError("You can only manage your own tasks.")
+
+    async def op_complete(self, session, request):
+        task_id = task_id_of(request)
+
+        def complete():
+            self._own(session, task_id)
+            return self.service.complete_task(task_id)
+
+        return {"task": task_to_dict(task_id, await self._write(complete))}
+
+    async def op_edit(self, session, request):
+        task_id = task_id_of(request)
+
+        def edit():
+            self._own(session, task_id)
+            return self.service.edit_task(
+                task_id,
+                optional_text(request, "assigned_to"),
+                optional_text(request, "due_date"),
+            )
+
+        return {"task": task_to_dict(task_id, await self._write(edit))}
+
+    async def op_delete(self, session, request):
+        self._require_admin(session)
+        task_id = task_id_of(request)
+        task = await self._write(self.service.delete_task, task_id)
+        return {"task": task_to_dict(task_id, task)}
+
+    async def op_report(self, session, request):
+        self._require_admin(session)
+        # The writer only orders the report after the writes queued before
+        # it; the counting itself runs off the event loop, in one pass, as a
+        # process pool must not be forked from this multithreaded server.
+        await self._write(lambda: None)
+        counters = await asyncio.get_running_loop().run_in_executor(
+            self._reporting, self.service.generate_reports, 1
+        )
+        return {
+            "task_overview": task_reports.format_task_overview(counters),
+            "user_overview": task_reports.format_user_overview(
+                counters, len(self.service.credentials)
+            ),
+        }
+
+    def _require_admin(self, session):
+        if session["user"] != ADMIN:
+            raise RequestError("Only the admin can do that.")
+
+    # ---- Connections ----
+    async def dispatch(self, session, request):
+        """Runs one request and returns the response dict."""
+        if not isinstance(request, dict):
+            raise RequestError("Requests must be JSON objects.")
+        op = request.get("op")
+        handler = getattr(self, "op_" + str(op).replace("-", "_"), None)
+        if handler is None:
+            raise RequestError(f"Unknown operation '{op}'.")
+        if op != "login" and session["user"] is None:
+            raise RequestError("Please log in first.")
+        return await handler(session, request)
+
+    async def handle(self, reader, writer):
+        """Serves one client connection until it disconnects."""
+        session = {"user": None}
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line outgrew the stream limit, so the requests that
+                    # follow cannot be framed; answer once and hang up.
+                    response = {"ok": False, "error": "Request line too long."}
+                    writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = {"ok": True, **await self.dispatch(session, request)}
+                except KeyError as error:
+                    response = {"ok": False, "error": f"Task {error} does not exist."}
+                except (RequestError, ValueError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                except Exception:
+                    # Keep the connection open; the details go to the log.
+                    traceback.print_exc()
+                    response = {"ok": False, "error": "internal error"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT, unix_path=None, ready=None):
+        """
+        Accepts connections until cancelled.
+
+        Parameters:
+            host (str): Address to listen on for TCP.
+            port (int): TCP port; 0 picks a free one.
+            unix_path (str): Listen on this Unix socket instead of TCP.
+            ready (callable): Called with the listening server once bound.
+        """
+        self._writer = asyncio.create_task(self._write_loop())
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._writer.cancel()
+            self._hashing.shutdown()
+            self._reporting.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the task manager.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="listen on a Unix socket path")
+    args = parser.parse_args(argv)
+
+    service = TaskService()
+
+    def ready(server):
+        address = args.unix or "%s:%d" % server.sockets[0].getsockname()[:2]
+        print(f"Serving tasks on {address}", flush=True)
+
+    try:
+        asyncio.run(TaskServer(service).serve(args.host, args.port, args.unix, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
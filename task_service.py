@@ -0,0 +1,420 @@
+"""
+Importable task manager API.
+
+TaskService ties together the task store, its statistics and indexes, the
+credentials and the report engine behind plain method calls, so that the
+task manager can be scripted, benchmarked or reused by another process
+without going through the interactive menu in task_manager.py.
+
+Nothing is read from disk when a TaskService is created. The credentials are
+loaded on first use, and the task store with its listeners is opened the
+first time a task operation needs it, so startup cost does not grow with
+user.txt or the task log.
+
+Two storage backends are available: the default append-only task log with
+'user.txt', and a SQLite database ('tasks.db', see task_sqlite.py). The
+backend is chosen when the service is created, or through the TASK_BACKEND
+environment variable.
+"""
+import os
+import sys
+from bisect import bisect_right
+from datetime import date
+from itertools import islice
+
+import task_reports
+from task_auth import USER_FILE, Credentials
+from task_dates import parse_date
+from task_index import DueIndex, SearchIndex, UserIndex
+from task_stats import TaskStatistics
+from task_sqlite import DB_FILE, SqliteCredentials, SqliteTaskStore
+from task_store import Task, TaskStore
+from task_trends import TaskHistory
+
+PAGE_SIZE = 20
+BACKENDS = ("log", "sqlite")
+# Logs larger than this are counted by several processes when reporting.
+PARALLEL_REPORT_BYTES = 64 << 20
+
+
+class TaskService:
+    """
+    The task manager's operations, independent of any user interface.
+
+    Methods raise ValueError with a user-facing message when their input is
+    rejected, and KeyError when a task ID does not exist.
+    """
+
+    def __init__(self, user_path=USER_FILE, backend=None, db_path=DB_FILE):
+        self.backend = backend or os.environ.get("TASK_BACKEND", "log")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown storage backend '{self.backend}'.")
+        self.db_path = db_path
+        if self.backend == "sqlite":
+            self.credentials = SqliteCredentials(db_path)
+        else:
+            self.credentials = Credentials(user_path)
+        self._store = None
+        self.history = TaskHistory()
+
+    # ---- Lazily opened components ----
+    def _open(self):
+        """Opens the task store and attaches its listeners on first use."""
+        if self._store is None and self.backend == "sqlite":
+            # The database answers statistics and index queries itself.
+            store = SqliteTaskStore(self.db_path)
+            self._stats = self._by_user = self._by_due = store
+            self._search = store
+            self._store = store
+        elif self._store is None:
+            store = TaskStore(durable=True)
+            # Attach under the store lock so that checkpoints are not written
+            # by two processes at once.
+            with store.locked():
+                self._stats = TaskStatistics(store)
+                self._by_user = UserIndex(store)
+                self._by_due = DueIndex(store)
+                self._search = SearchIndex(store)
+            self._store = store
+        return self._store
+
+    @property
+    def store(self):
+        """The task store, opened on first access."""
+        return self._open()
+
+    @property
+    def stats(self):
+        """The incrementally maintained task statistics."""
+        self._open()
+        return self._stats
+
+    @property
+    def by_user(self):
+        """The per-user task index."""
+        self._open()
+        return self._by_user
+
+    @property
+    def by_due(self):
+        """The due-date index over incomplete tasks."""
+        self._open()
+        return self._by_due
+
+    @property
+    def search_index(self):
+        """The word index over task titles and descriptions."""
+        self._open()
+        return self._search
+
+    @property
+    def rows_read(self):
+        """Task records the store has decoded, or 0 before it is opened."""
+        return 0 if self._store is None else self._store.rows_read
+
+    def close(self):
+        """Checkpoints and closes the task store if it was opened."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        if self.backend == "sqlite":
+            self.credentials.close()
+
+    # ---- Users ----
+    def login(self, username, password):
+        """Returns True if the credentials are valid."""
+        return self.credentials.verify(username, password)
+
+    def register_user(self, username, password):
+        """Registers a new user; raises ValueError if the name is taken."""
+        self.credentials.register(username, password)
+
+    # ---- Tasks ----
+    def add_task(self, assigned_to, title, description, due_date):
+        """
+        Creates an incomplete task assigned today.
+
+        Parameters:
+            assigned_to (str): A registered username.
+            title (str): The task title.
+            description (str): The task description.
+            due_date (str): The due date, as 'DD Mon YYYY' or 'YYYY-MM-DD'.
+
+        Returns:
+            int: The new task's ID.
+        """
+        if assigned_to not in self.credentials:
+            raise ValueError("User does not exist.")
+        due = parse_date(due_date)
+        if due is None:
+            raise ValueError("Invalid date format. Please use 'DD Mon YYYY'.")
+        task = Task(
+            assigned_to, title, description, date.today().toordinal(), due, False
+        )
+        return self.store.add(task)
+
+    def get_task(self, task_id):
+        """Returns a task by ID, or None if it does not exist."""
+        return self.store.get(task_id)
+
+    def _editable(self, task_id):
+        """Returns a copy of an incomplete task that is safe to modify."""
+        task = self.store.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        if task.completed:
+            raise ValueError(
+                "This task is already completed and cannot be edited."
+            )
+        return task.copy()
+
+    def complete_task(self, task_id):
+        """Marks an incomplete task as complete and returns it."""
+        with self.store.locked():
+            task = self._editable(task_id)
+            task.completed = True
+            self.store.update(task_id, task)
+        return task
+
+    def edit_task(self, task_id, assigned_to=None, due_date=None):
+        """
+        Reassigns an incomplete task and/or changes its due date.
+
+        Parameters:
+            task_id (int): The task to edit.
+            assigned_to (str): The new assignee, or None to keep the current
+                one.
+            due_date (str): The new due date, or None to keep the current one.
+
+        Returns:
+            Task: The updated task.
+        """
+        if assigned_to and assigned_to not in self.credentials:
+            raise ValueError("Username does not exist.")
+        due = parse_date(due_date) if due_date else None
+        if due_date and due is None:
+            raise ValueError("Invalid date format.")
+
+        # Re-read the task under the lock so a concurrent change is kept.
+        with self.store.locked():
+            task = self._editable(task_id)
+            if assigned_to:
+                task.assigned_to = sys.intern(assigned_to)
+            if due is not None:
+                task.due = due
+            self.store.update(task_id, task)
+        return task
+
+    def delete_task(self, task_id):
+        """Deletes a task and returns what was deleted."""
+        with self.store.locked():
+            task = self.store.get(task_id)
+            if task is None:
+                raise KeyError(task_id)
+            self.store.delete(task_id)
+        return task
+
+    def delete_tasks(self, assigned_to=None, completed_before=None):
+        """
+        Deletes every task matching the given filters in one operation.
+
+        Parameters:
+            assigned_to (str): Only delete this user's tasks.
+            completed_before (date): Only delete completed tasks that were
+                due before this date. Tasks do not record when they were
+                completed, so the due date stands in for it.
+
+        Returns:
+            int: The number of tasks deleted.
+        """
+        if assigned_to is None and completed_before is None:
+            raise ValueError("At least one filter is required.")
+        cutoff = completed_before.toordinal() if completed_before else None
+
+        def matches(task):
+            if cutoff is None:
+                return True
+            due = task.due_ordinal
+            return task.completed and due is not None and due < cutoff
+
+        if assigned_to is not None:
+            # The per-user index narrows the work to that user's own tasks.
+            return self.store.delete_many(
+                task_id
+                for task_id, task in self.tasks_for(assigned_to)
+                if matches(task)
+            )
+        return self.store.delete_where(matches)
+
+    def all_tasks(self):
+        """Streams (task_id, Task) pairs for every task."""
+        return self.store.items()
+
+    def iter_tasks(
+        self,
+        after=0,
+        assigned_to=None,
+        completed=None,
+        due_from=None,
+        due_to=None,
+        query=None,
+    ):
+        """
+        Lazily yields the tasks that match every given filter, in ID order.
+
+        The filters are applied while the store is streamed, so nothing is
+        read beyond the tasks the caller actually consumes. A search query
+        walks the matches in the word index, incomplete tasks due by a date
+        are taken from the due-date index, and an assignee filter walks that
+        user's entries in the per-user index, instead of the whole store.
+
+        Parameters:
+            after (int): Resume after this task ID (the cursor of a page).
+            assigned_to (str): Only tasks assigned to this user.
+            completed (bool): Only completed (True) or incomplete (False)
+                tasks.
+            due_from (date): Only tasks due on or after this date.
+            due_to (date): Only tasks due on or before this date.
+            query (str): Only tasks whose title or description contains
+                every word of the query; 'word*' matches by prefix.
+
+        Yields:
+            tuple: (task_id, Task) for each matching task.
+        """
+        low = due_from.toordinal() if due_from else None
+        high = due_to.toordinal() if due_to else None
+
+        if query is not None:
+            within = None if assigned_to is None else self.by_user.ids_for(assigned_to)
+            candidates = (
+                (task_id, self.store.get(task_id))
+                for task_id in self.search_index.search(query, after, within)
+            )
+        elif completed is False and due_to is not None:
+            ids = sorted(self.by_due.due_between(due_from, due_to, assigned_to))
+            candidates = (
+                (task_id, self.store.get(task_id))
+                for task_id in ids[bisect_right(ids, after):]
+            )
+        elif assigned_to is None:
+            candidates = self.store.items(after)
+        else:
+            ids = self.by_user.ids_for(assigned_to)
+            candidates = (
+                (task_id, self.store.get(task_id))
+                for task_id in ids[bisect_right(ids, after):]
+            )
+
+        for task_id, task in candidates:
+            if task is None:
+                continue
+            if assigned_to is not None and task.assigned_to != assigned_to:
+                continue
+            if completed is not None and task.completed != completed:
+                continue
+            if low is not None or high is not None:
+                due = task.due_ordinal
+                if due is None:
+                    continue
+                if (low is not None and due < low) or (high is not None and due > high):
+                    continue
+            yield task_id, task
+
+    def list_tasks(self, after=0, limit=PAGE_SIZE, **filters):
+        """
+        Returns one page of tasks.
+
+        Parameters:
+            after (int): The cursor returned with the previous page, or 0 for
+                the first page.
+            limit (int): The maximum number of tasks on the page.
+            **filters: Any of the filters accepted by iter_tasks.
+
+        Returns:
+            tuple: (list of (task_id, Task) pairs, cursor for the next page or
+            None if this was the last page).
+        """
+        matches = self.iter_tasks(after, **filters)
+        page = list(islice(matches, limit))
+        if len(page) < limit or next(matches, None) is None:
+            return page, None
+        return page, page[-1][0]
+
+    def tasks_for(self, username):
+        """Returns (task_id, Task) pairs for one user's tasks."""
+        return self.by_user.tasks_for(username)
+
+    def due_between(self, start, end, username=None):
+        """Returns IDs of incomplete tasks due between two dates."""
+        return self.by_due.due_between(start, end, username)
+
+    def overdue_count(self, as_of, username=None):
+        """Counts incomplete tasks due before a date."""
+        return self.by_due.overdue_count(as_of, username)
+
+    # ---- Reports ----
+    def generate_reports(self, workers=None, today=None):
+        """
+        Writes the overview reports and returns the counters.
+
+        The SQLite backend computes the counters with an aggregate query on
+        a read-only connection, which only sees committed changes.
+        Large task logs are split across worker processes; smaller ones are
+        counted in a single pass, which avoids the cost of starting a pool.
+
+        Parameters:
+            workers (int): Number of processes to use. 1 forces a single
+                pass; by default one process per CPU is used once the log
+                exceeds PARALLEL_REPORT_BYTES.
+            today (date): The date overdue tasks are measured against.
+        """
+        store = self.store
+        if self.backend == "sqlite":
+            # Counted on a connection of the report's own, so a report built
+            # in another thread never sees an uncommitted write batch.
+            counters, users = store.committed_snapshot(today)
+            task_reports.write_task_overview(counters)
+            task_reports.write_user_overview(counters, users)
+            return counters
+        if workers is None and os.path.getsize(store.log_path) > PARALLEL_REPORT_BYTES:
+            workers = os.cpu_count()
+        if workers and workers > 1:
+            return task_reports.generate_reports_parallel(
+                store, len(self.credentials), workers, today
+            )
+        return task_reports.generate_reports(
+            (task for _, task in store.items()), len(self.credentials), today
+        )
+
+    def report_sources(self):
+        """
+        Returns the files the overview reports are computed from.
+
+        Returns:
+            dict: 'tasks' maps to the files holding the tasks, with the
+            append-only task log first when there is one; 'users' maps to
+            the files that only affect the registered-user count.
+        """
+        if self.backend == "sqlite":
+            return {"tasks": [self.db_path, self.db_path + "-wal"], "users": []}
+        return {"tasks": [self.store.log_path], "users": [self.credentials.path]}
+
+    def statistics(self, today=None):
+        """Returns the current task and user counters without scanning tasks."""
+        return self.stats.snapshot(today)
+
+    def record_history(self, today=None):
+        """
+        Records the current per-user counters as the day's trend snapshot.
+
+        Parameters:
+            today (date): The day to record; overdue tasks are measured
+                against it.
+
+        Returns:
+            ReportCounters: The figures that were recorded.
+        """
+        with self.store.locked():
+            counters = self.statistics(today)
+            self.history.record(counters)
+        return counters
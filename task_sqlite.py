@@ -0,0 +1,795 @@
+"""
+SQLite storage backend for the task manager.
+
+SqliteTaskStore and SqliteCredentials keep tasks and users in one SQLite
+database ('tasks.db') opened in WAL mode, so readers never block the writer
+and several task manager processes can share it safely. They present the
+same methods as TaskStore and Credentials, and TaskService switches to them
+when it is created with backend="sqlite" (or TASK_BACKEND=sqlite is set).
+
+The store answers the queries that the log backend needs separate listeners
+for directly in SQL, using indexes on assignee, completion and due date:
+per-user task IDs, tasks due in a date range, and the report counters, which
+are computed with a single GROUP BY aggregate. Word searches go to an FTS5
+table that triggers keep in step with the tasks, so a search sees every
+change as soon as it is committed, whichever process made it.
+
+Dates are stored as day ordinals. A date that could not be parsed keeps its
+original text; SQLite orders every integer before any text, so such tasks
+never fall inside a due-date range.
+
+Running this file migrates an existing installation:
+    python task_sqlite.py --log tasks.log --users user.txt --db tasks.db
+
+Tasks are read from the task log when one exists (keeping their IDs) and
+from the legacy 'tasks.txt' otherwise.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+from task_auth import (
+    HASH_ITERATIONS,
+    USER_FILE,
+    Credentials,
+    check_password,
+    hash_password,
+    needs_rehash,
+    validate_username,
+)
+from task_index import query_terms
+from task_reports import ReportCounters
+from task_store import (
+    INDEX_FILE,
+    LEGACY_FILE,
+    LOG_FILE,
+    Task,
+    TaskStore,
+    read_legacy_tasks,
+)
+
+DB_FILE = "tasks.db"
+
+# Rows fetched per query when streaming tasks.
+PAGE_ROWS = 1000
+
+# Seconds a writer waits for another process's transaction to finish.
+BUSY_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    assigned_to TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    assigned NOT NULL,
+    due NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_assignee
+    ON tasks (assigned_to, completed, due);
+CREATE INDEX IF NOT EXISTS tasks_by_due ON tasks (completed, due);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    secret TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+INSERT OR IGNORE INTO meta (key, value)
+    SELECT 'next_id', COALESCE(MAX(id), 0) + 1 FROM tasks;
+"""
+
+# The word index is an external-content table: the text is kept once, in
+# 'tasks', and the tokenizer splits words as task_index.words_in does.
+SEARCH_SCHEMA = [
+    """
+CREATE VIRTUAL TABLE tasks_search USING fts5(
+    title, description, content = 'tasks', content_rowid = 'id',
+    tokenize = "unicode61 remove_diacritics 0 tokenchars '_'"
+)
+""",
+    """
+CREATE TRIGGER tasks_search_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_search (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END
+""",
+    """
+CREATE TRIGGER tasks_search_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_search (tasks_search, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END
+""",
+    """
+CREATE TRIGGER tasks_search_update AFTER UPDATE OF title, description ON tasks
+WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+BEGIN
+    INSERT INTO tasks_search (tasks_search, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO tasks_search (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END
+""",
+    "INSERT INTO tasks_search (tasks_search) VALUES ('rebuild')",
+]
+
+TASK_COLUMNS = "id, assigned_to, title, description, assigned, due, completed"
+
+
+def connect(path=DB_FILE):
+    """Opens the database in WAL mode and makes sure the schema exists."""
+    db = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT,
+        # The store may be opened by whichever thread first needs it, such as
+        # task_server's report thread; the connection is still only used by
+        # one thread at a time.
+        check_same_thread=False,
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    if not has_search_table(db):
+        _create_search_table(db)
+    return db
+
+
+def connect_readonly(path=DB_FILE):
+    """Opens a read-only connection that only sees committed changes."""
+    uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT)
+
+
+def report_counters(db, today=None):
+    """
+    Computes the report counters with one aggregate query.
+
+    Parameters:
+        db (sqlite3.Connection): The database to count.
+        today (date): The date overdue tasks are measured against.
+
+    Returns:
+        ReportCounters: Totals in the shape used by task_reports.
+    """
+    counters = ReportCounters(today)
+    rows = db.execute(
+        "SELECT assigned_to, COUNT(*), SUM(completed), "
+        "SUM(completed = 0 AND due < :today), "
+        "SUM(completed = 0 AND typeof(due) != 'integer') "
+        "FROM tasks GROUP BY assigned_to",
+        {"today": counters.cutoff},
+    )
+    for user, assigned, completed, overdue, invalid in rows:
+        counters.users[user] = [assigned, completed, overdue]
+        counters.total += assigned
+        counters.completed += completed
+        counters.overdue += overdue
+        counters.invalid_dates += invalid
+    return counters
+
+
+def has_search_table(db):
+    """Returns True if the database has the tasks_search word index."""
+    return db.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'tasks_search'"
+    ).fetchone() is not None
+
+
+def _create_search_table(db):
+    """Creates and fills the word index, unless SQLite lacks FTS5."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have created it while this one waited.
+        if not has_search_table(db):
+            for statement in SEARCH_SCHEMA:
+                db.execute(statement)
+        db.commit()
+    except sqlite3.OperationalError as error:
+        db.rollback()
+        if "fts5" not in str(error):
+            raise
+
+
+def _row_to_task(row):
+    """Converts a (id, ...fields) row to a (task_id, Task) pair."""
+    task_id, assigned_to, title, description, assigned, due, completed = row
+    return task_id, Task(
+        assigned_to, title, description, assigned, due, bool(completed)
+    )
+
+
+def _task_params(task):
+    return (
+        task.assigned_to,
+        task.title,
+        task.description,
+        task.assigned,
+        task.due,
+        int(task.completed),
+    )
+
+
+class SqliteTaskStore:
+    """
+    Task storage in a SQLite table, with the same interface as TaskStore.
+
+    Listeners are supported as they are by TaskStore, but none are needed
+    for statistics or lookups: snapshot, ids_for, tasks_for and due_between
+    are answered from the table's indexes.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.listeners = []
+        self._db = connect(path)
+        self._full_text = has_search_table(self._db)
+        self._depth = 0
+        # Rows read into Python or aggregated, for task_metrics.
+        self.rows_read = 0
+
+    @property
+    def version(self):
+        """The number of changes made to the tasks, stored with them."""
+        return self._db.execute(
+            "SELECT value FROM meta WHERE key = 'version'"
+        ).fetchone()[0]
+
+    def _bump(self, changes):
+        self._db.execute(
+            "UPDATE meta SET value = value + ? WHERE key = 'version'", (changes,)
+        )
+
+    def _take_ids(self, count):
+        """
+        Reserves `count` new task IDs and returns the first.
+
+        IDs come from a counter in 'meta' rather than MAX(id), so the IDs of
+        deleted tasks are never handed out again, as with TaskStore. Called
+        inside a write transaction.
+        """
+        first_id = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'next_id'"
+        ).fetchone()[0]
+        self._db.execute(
+            "UPDATE meta SET value = value + ? WHERE key = 'next_id'", (count,)
+        )
+        return first_id
+
+    def _notify(self, task_id, old, new):
+        for listener in self.listeners:
+            listener.task_changed(task_id, old, new)
+
+    @contextmanager
+    def locked(self):
+        """
+        Runs the block as one write transaction.
+
+        BEGIN IMMEDIATE takes the database's write lock up front, so a read
+        and the update that depends on it cannot interleave with another
+        writer. Blocks may be nested; the outermost one commits, or rolls
+        back if the block raises.
+        """
+        outer = not self._depth
+        if outer:
+            self._db.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            if outer:
+                self._db.rollback()
+            raise
+        else:
+            if outer:
+                self._db.commit()
+        finally:
+            self._depth -= 1
+
+    def close(self):
+        """Checkpoints every listener and closes the database."""
+        for listener in self.listeners:
+            listener.checkpoint()
+        self._db.close()
+
+    def sync(self):
+        """Every change is committed as it is made; nothing is pending."""
+
+    # ---- Reads ----
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def get(self, task_id):
+        """Returns a task by ID, or None if no task has that ID."""
+        row = self._db.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.rows_read += 1
+        return _row_to_task(row)[1]
+
+    def items(self, after=0):
+        """
+        Streams every task in ID order.
+
+        Rows are fetched a page at a time by ID, so tasks may be changed or
+        deleted while the stream is being consumed.
+
+        Parameters:
+            after (int): Only yield tasks with an ID greater than this.
+
+        Yields:
+            tuple: (task_id, Task) for each task.
+        """
+        while True:
+            rows = self._db.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE id > ? "
+                "ORDER BY id LIMIT ?",
+                (after, PAGE_ROWS),
+            ).fetchall()
+            self.rows_read += len(rows)
+            for row in rows:
+                yield _row_to_task(row)
+            if len(rows) < PAGE_ROWS:
+                return
+            after = rows[-1][0]
+
+    # ---- Writes ----
+    def add(self, task):
+        """Stores a new task and returns its ID."""
+        with self.locked():
+            task_id = self._take_ids(1)
+            self._db.execute(
+                f"INSERT INTO tasks ({TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, *_task_params(task)),
+            )
+            self._bump(1)
+        self._notify(task_id, None, task)
+        return task_id
+
+    def add_many(self, tasks, batch_size=10000, sync=True):
+        """
+        Stores many new tasks, one transaction per batch.
+
+        Parameters:
+            tasks (iterable): Task records; consumed lazily.
+            batch_size (int): Tasks inserted per transaction.
+            sync (bool): Accepted for compatibility with TaskStore.
+
+        Returns:
+            int: The number of tasks added.
+        """
+        added = 0
+        batch = []
+        for task in tasks:
+            batch.append(task)
+            if len(batch) >= batch_size:
+                added += self._insert_batch(batch)
+                batch = []
+        if batch:
+            added += self._insert_batch(batch)
+        return added
+
+    def _insert_batch(self, tasks):
+        with self.locked():
+            first_id = self._take_ids(len(tasks))
+            self._db.executemany(
+                f"INSERT INTO tasks ({TASK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (first_id + n, *_task_params(task))
+                    for n, task in enumerate(tasks)
+                ),
+            )
+            self._bump(len(tasks))
+        for n, task in enumerate(tasks):
+            self._notify(first_id + n, None, task)
+        return len(tasks)
+
+    def update(self, task_id, task):
+        """
+        Replaces the fields of an existing task.
+
+        Raises:
+            KeyError: If no task has that ID.
+        """
+        old = self.get(task_id) if self.listeners else None
+        with self.locked():
+            changed = self._db.execute(
+                "UPDATE tasks SET assigned_to = ?, title = ?, description = ?, "
+                "assigned = ?, due = ?, completed = ? WHERE id = ?",
+                (*_task_params(task), task_id),
+            ).rowcount
+            if not changed:
+                raise KeyError(task_id)
+            self._bump(1)
+        self._notify(task_id, old, task)
+
+    def delete(self, task_id):
+        """
+        Deletes a task.
+
+        Raises:
+            KeyError: If no task has that ID.
+        """
+        if not self.delete_many([task_id]):
+            raise KeyError(task_id)
+
+    def delete_many(self, task_ids):
+        """Deletes several tasks in one transaction and returns the count."""
+        task_ids = list(task_ids)
+        doomed = []
+        if self.listeners:
+            for task_id in task_ids:
+                old = self.get(task_id)
+                if old is not None:
+                    doomed.append((task_id, old))
+        with self.locked():
+            deleted = self._db.executemany(
+                "DELETE FROM tasks WHERE id = ?", ((task_id,) for task_id in task_ids)
+            ).rowcount
+            if deleted:
+                self._bump(deleted)
+        for task_id, old in doomed:
+            self._notify(task_id, old, None)
+        return deleted
+
+    def delete_where(self, predicate, batch_size=10000):
+        """Deletes every task matching a predicate and returns the count."""
+        deleted = 0
+        batch = []
+        for task_id, task in self.items():
+            if predicate(task):
+                batch.append(task_id)
+                if len(batch) >= batch_size:
+                    deleted += self.delete_many(batch)
+                    batch = []
+        return deleted + self.delete_many(batch)
+
+    # ---- Indexed queries ----
+    def ids_for(self, username):
+        """Returns the sorted IDs of the tasks assigned to a user."""
+        return [
+            task_id
+            for (task_id,) in self._db.execute(
+                "SELECT id FROM tasks WHERE assigned_to = ? ORDER BY id", (username,)
+            )
+        ]
+
+    def tasks_for(self, username):
+        """Returns (task_id, Task) pairs for one user's tasks, in ID order."""
+        tasks = [
+            _row_to_task(row)
+            for row in self._db.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE assigned_to = ? "
+                "ORDER BY id",
+                (username,),
+            )
+        ]
+        self.rows_read += len(tasks)
+        return tasks
+
+    def search(self, query, after=0, within=None):
+        """
+        Lazily yields the IDs of tasks containing every term of a query.
+
+        The same as SearchIndex.search, but answered from the tasks_search
+        table a page of IDs at a time. Without FTS5 each term is matched
+        as a substring of the title or description instead.
+
+        Parameters:
+            query (str): Space-separated search terms; 'word*' matches by
+                prefix.
+            after (int): Only yield IDs greater than this.
+            within (list): Optional sorted task IDs to restrict the results
+                to.
+
+        Yields:
+            int: Matching task IDs in ascending order.
+
+        Raises:
+            ValueError: If the query has no searchable words.
+        """
+        terms = query_terms(query)
+        if self._full_text:
+            sql = (
+                "SELECT rowid FROM tasks_search WHERE tasks_search MATCH ? "
+                "AND rowid > ? ORDER BY rowid LIMIT ?"
+            )
+            # Terms are runs of word characters, so quoting them is safe.
+            params = [
+                " ".join(
+                    f'"{term.rstrip("*")}"' + ("*" if term.endswith("*") else "")
+                    for term in terms
+                )
+            ]
+        else:
+            matches = " AND ".join(
+                ["lower(title || ' ' || description) LIKE ?"] * len(terms)
+            )
+            sql = f"SELECT id FROM tasks WHERE {matches} AND id > ? ORDER BY id LIMIT ?"
+            params = [f"%{term.rstrip('*')}%" for term in terms]
+        while True:
+            ids = [
+                task_id
+                for (task_id,) in self._db.execute(sql, (*params, after, PAGE_ROWS))
+            ]
+            for task_id in ids:
+                if within is not None:
+                    position = bisect_left(within, task_id)
+                    if position == len(within) or within[position] != task_id:
+                        continue
+                yield task_id
+            if len(ids) < PAGE_ROWS:
+                return
+            after = ids[-1]
+
+    def overdue_count(self, as_of, username=None):
+        """
+        Counts incomplete tasks due before a date.
+
+        Parameters:
+            as_of (date): Tasks due strictly before this day are overdue.
+            username (str): Limit the count to one assignee, or None for all.
+
+        Returns:
+            int: The number of overdue tasks.
+        """
+        query = "SELECT COUNT(*) FROM tasks WHERE completed = 0 AND due < ?"
+        params = [as_of.toordinal()]
+        if username is not None:
+            query += " AND assigned_to = ?"
+            params.append(username)
+        return self._db.execute(query, params).fetchone()[0]
+
+    def due_between(self, start, end, username=None):
+        """
+        Lists incomplete tasks due in a date range.
+
+        Parameters:
+            start (date): First due date to include, or None for no lower
+                bound.
+            end (date): Last due date to include.
+            username (str): Limit the results to one assignee, or None for all.
+
+        Returns:
+            list: Task IDs ordered by due date.
+        """
+        low = start.toordinal() if start else 0
+        query = (
+            "SELECT id FROM tasks WHERE completed = 0 AND due BETWEEN ? AND ?"
+        )
+        params = [low, end.toordinal()]
+        if username is not None:
+            query += " AND assigned_to = ?"
+            params.append(username)
+        query += " ORDER BY due, id"
+        return [task_id for (task_id,) in self._db.execute(query, params)]
+
+    def snapshot(self, today=None):
+        """
+        Computes the report counters with one aggregate query.
+
+        Parameters:
+            today (date): The date overdue tasks are measured against.
+
+        Returns:
+            ReportCounters: Totals in the shape used by task_reports.
+        """
+        counters = report_counters(self._db, today)
+        self.rows_read += counters.total
+        return counters
+
+    def committed_snapshot(self, today=None):
+        """
+        Computes the report counters and the registered-user count on a
+        read-only connection of its own.
+
+        Both are read in one transaction that only sees committed changes,
+        so a report can be built in another thread while this store's
+        connection is inside a write transaction that may yet roll back.
+
+        Parameters:
+            today (date): The date overdue tasks are measured against.
+
+        Returns:
+            tuple: (ReportCounters, number of registered users).
+        """
+        db = connect_readonly(self.path)
+        try:
+            db.execute("BEGIN")
+            counters = report_counters(db, today)
+            users = db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        finally:
+            db.close()
+        self.rows_read += counters.total
+        return counters, users
+
+
+class SqliteCredentials:
+    """
+    User accounts in the 'users' table, with the same interface as
+    Credentials. The database is opened on first use.
+    """
+
+    def __init__(self, path=DB_FILE, iterations=HASH_ITERATIONS):
+        self.path = path
+        self.iterations = iterations
+        self._db = None
+
+    def _open(self):
+        if self._db is None:
+            self._db = connect(self.path)
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _secret(self, username):
+        row = self._open().execute(
+            "SELECT secret FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def __contains__(self, username):
+        return self._secret(username) is not None
+
+    def __len__(self):
+        return self._open().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def entries(self):
+        """Streams (username, stored secret) pairs in name order."""
+        return self._open().execute(
+            "SELECT username, secret FROM users ORDER BY username"
+        )
+
+    def usernames(self):
+        """Streams every registered username in name order."""
+        for username, _ in self.entries():
+            yield username
+
+    def stored_secret(self, username):
+        """Returns a user's stored password hash, or None if unknown."""
+        return self._secret(username)
+
+    def verify(self, username, password):
+        """
+        Returns True if the username exists and the password matches.
+
+        A matching password whose hash is weaker than the current setting is
+        rehashed at full strength.
+        """
+        secret = self._secret(username)
+        if secret is None or not check_password(password, secret):
+            return False
+        if needs_rehash(secret, self.iterations):
+            self.replace_secret(
+                username, secret, hash_password(password, self.iterations)
+            )
+        return True
+
+    def replace_secret(self, username, old, new):
+        """
+        Swaps a user's stored hash for a new one, unless it is no longer
+        `old`.
+
+        Returns:
+            bool: True if the hash was replaced.
+        """
+        db = self._open()
+        with db:
+            replaced = db.execute(
+                "UPDATE users SET secret = ? WHERE username = ? AND secret = ?",
+                (new, username, old),
+            ).rowcount
+        return replaced == 1
+
+    def register(self, username, password):
+        """
+        Adds a new user with a hashed password.
+
+        Raises:
+            ValueError: If the username is taken or cannot be stored.
+        """
+        validate_username(username)
+        db = self._open()
+        try:
+            with db:
+                db.execute(
+                    "INSERT INTO users (username, secret) VALUES (?, ?)",
+                    (username, hash_password(password, self.iterations)),
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Username '{username}' already exists.") from None
+
+
+def migrate(
+    db_path=DB_FILE, user_path=USER_FILE, legacy_path=LEGACY_FILE, log_path=LOG_FILE
+):
+    """
+    Copies users and tasks from the file backend into a SQLite database.
+
+    Users already in the database are replaced by the file's version. Tasks
+    keep their IDs when read from the task log, whose index is expected
+    next to it; legacy tasks are numbered from 1 in file order.
+
+    Returns:
+        tuple: (users copied, tasks copied).
+    """
+    db = connect(db_path)
+    users = 0
+    if os.path.exists(user_path):
+        credentials = Credentials(user_path)
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO users (username, secret) VALUES (?, ?)",
+                credentials.entries(),
+            )
+        users = len(credentials)
+        credentials.close()
+
+    if os.path.exists(log_path):
+        index_path = os.path.join(os.path.dirname(log_path), INDEX_FILE)
+        source = TaskStore(log_path, index_path, legacy_path=None)
+        tasks = source.items()
+    elif os.path.exists(legacy_path):
+        source = None
+        tasks = (
+            (task_id, Task.from_fields(fields))
+            for task_id, fields in enumerate(read_legacy_tasks(legacy_path), 1)
+        )
+    else:
+        source, tasks = None, iter(())
+
+    with db:
+        copied = db.executemany(
+            f"INSERT OR REPLACE INTO tasks ({TASK_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((task_id, *_task_params(task)) for task_id, task in tasks),
+        ).rowcount
+        db.execute(
+            "UPDATE meta SET value = value + ? WHERE key = 'version'", (copied,)
+        )
+        db.execute(
+            "UPDATE meta SET value = max(value, "
+            "(SELECT COALESCE(MAX(id), 0) + 1 FROM tasks)) WHERE key = 'next_id'"
+        )
+    db.close()
+    if source is not None:
+        source.close()
+    return users, copied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Migrate task manager data into a SQLite database."
+    )
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--users", default=USER_FILE)
+    parser.add_argument("--tasks", default=LEGACY_FILE)
+    parser.add_argument("--log", default=LOG_FILE)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    users, tasks = migrate(args.db, args.users, args.tasks, args.log)
+    print(
+        f"Migrated {users} user(s) and {tasks} task(s) to '{args.db}' "
+        f"in {time.perf_counter() - started:.2f}s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
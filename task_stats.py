@@ -0,0 +1,135 @@
+"""
+Incrementally maintained task statistics.
+
+TaskStatistics listens to the task store and adjusts its counters whenever a
+task is added, changed or deleted, so the figures shown by 'ds' are always
+current and never require a scan of the tasks. Overdue counts come from a
+histogram of incomplete tasks keyed by due date: answering "how many tasks are
+overdue today" only walks the distinct due dates, not the tasks.
+
+The counters are checkpointed to 'task_stats.json' together with the store's
+version. If the checkpoint is missing or out of step with the store (for
+example after a crash), they are rebuilt with a single pass over the tasks.
+"""
+import json
+import os
+from task_reports import ReportCounters
+
+STATS_FILE = "task_stats.json"
+
+
+def _new_bucket():
+    return {"assigned": 0, "completed": 0, "invalid_dates": 0, "due": {}}
+
+
+class TaskStatistics:
+    """
+    Global and per-user task counters kept in step with a TaskStore.
+
+    Each bucket (the global one and one per user) records how many tasks are
+    assigned and completed, how many incomplete tasks have an unparseable due
+    date, and a histogram mapping due-date ordinals to incomplete task counts.
+    """
+
+    def __init__(self, store, path=STATS_FILE):
+        self.store = store
+        self.path = path
+        if not self._load():
+            self.rebuild()
+        store.listeners.append(self)
+
+    def _load(self):
+        """Loads the checkpoint, returning False if it is missing or stale."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as stats_file:
+                saved = json.load(stats_file)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        if saved.get("version") != self.store.version:
+            return False
+
+        self.totals = saved["totals"]
+        self.users = saved["users"]
+        for bucket in [self.totals, *self.users.values()]:
+            bucket["due"] = {int(day): n for day, n in bucket["due"].items()}
+        return True
+
+    def rebuild(self):
+        """Recomputes every counter from a single pass over the store."""
+        self.totals = _new_bucket()
+        self.users = {}
+        for _, task in self.store.items():
+            self._apply(task, 1)
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Atomically saves the counters, stamped with the store version."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as stats_file:
+            json.dump(
+                {
+                    "version": self.store.version,
+                    "totals": self.totals,
+                    "users": self.users,
+                },
+                stats_file,
+            )
+        os.replace(tmp_path, self.path)
+
+    def _apply(self, task, sign):
+        """Adds (sign=1) or removes (sign=-1) one task's contribution."""
+        user = self.users.get(task.assigned_to)
+        if user is None:
+            user = self.users[task.assigned_to] = _new_bucket()
+
+        due = task.due_ordinal
+        for bucket in (self.totals, user):
+            bucket["assigned"] += sign
+            if task.completed:
+                bucket["completed"] += sign
+            elif due is None:
+                bucket["invalid_dates"] += sign
+            else:
+                count = bucket["due"].get(due, 0) + sign
+                if count:
+                    bucket["due"][due] = count
+                else:
+                    del bucket["due"][due]
+
+        if not user["assigned"]:
+            del self.users[task.assigned_to]
+
+    def task_changed(self, task_id, old, new):
+        """Store listener hook: moves a task's contribution from old to new."""
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+
+    def snapshot(self, today=None):
+        """
+        Returns the current figures as report counters.
+
+        Parameters:
+            today (date): The date overdue tasks are measured against.
+
+        Returns:
+            ReportCounters: Totals in the shape used by task_reports.
+        """
+        self.store.refresh()
+        counters = ReportCounters(today)
+        cutoff = counters.today.toordinal()
+
+        def overdue(bucket):
+            return sum(n for day, n in bucket["due"].items() if day < cutoff)
+
+        counters.total = self.totals["assigned"]
+        counters.completed = self.totals["completed"]
+        counters.invalid_dates = self.totals["invalid_dates"]
+        counters.overdue = overdue(self.totals)
+        counters.users = {
+            name: [bucket["assigned"], bucket["completed"], overdue(bucket)]
+            for name, bucket in self.users.items()
+        }
+        return counters
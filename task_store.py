@@ -0,0 +1,1061 @@
+"""
+Append-only task storage engine used by task_manager.py.
+
+Tasks live in a record log ('tasks.log') with one record per line and are
+located through a fixed-width offset index ('tasks.idx') keyed by a stable
+integer task ID. Adding, updating or deleting a task appends one record to the
+log and rewrites one 8-byte slot of the index, so the cost of a single change
+does not depend on how many tasks are stored.
+
+Deleting a task appends a tombstone record for its ID; readers skip deleted
+IDs through the index. Tombstones and superseded records stay in the log until
+compaction rewrites it with only the live versions. Compaction starts in a
+background thread once stale records outnumber live ones.
+
+Derived structures such as the statistics counters register themselves as
+listeners. They are told about every change together with the task's previous
+fields, and are checkpointed against the store's mutation count ('version') so
+they can tell on startup whether they are still in sync.
+
+Tasks are handed out as Task records: compact __slots__ objects with interned
+assignee names, dates held as day ordinals and completion held as a bool.
+
+The original ', '-separated 'tasks.txt' format is still understood: when no log
+exists yet, the legacy file is imported the first time the store is opened.
+
+Several processes may share one store. Every change is made while holding an
+exclusive lock on 'tasks.log.lock' (on platforms with fcntl), and a process
+that takes the lock first replays any records other processes have appended
+since it last looked, so no update is ever lost. Files that are rewritten as
+a whole are written to a temporary file and renamed into place, and a torn
+record left by a crashed writer is trimmed before the next append. The
+index header records how far into the log it reaches, so records a writer
+appended but died before indexing are replayed and indexed when the store is
+next opened or locked. With durable=True each change is fsynced before it
+returns; concurrent writers, in one process or several, share fsyncs (group
+commit).
+"""
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: the store is then only safe within one process.
+    fcntl = None
+
+from task_dates import format_date, parse_date
+
+LOG_FILE = "tasks.log"
+INDEX_FILE = "tasks.idx"
+LEGACY_FILE = "tasks.txt"
+
+# Index header: format marker, compaction generation, mutation count, records
+# in the log, live tasks and the end of the last record the index covers.
+HEADER = struct.Struct("<8sqqqqq")
+INDEX_MAGIC = b"TASKIDX2"
+SLOT = struct.Struct("<q")
+DELETED = -1
+# Contents of the '.sync' file: log inode and the offset synced up to.
+SYNC_STATE = struct.Struct("<qq")
+
+# Compact once stale records (tombstones plus superseded and deleted versions)
+# exceed this many times the live task count.
+COMPACT_RATIO = 1.0
+MIN_COMPACT_RECORDS = 1000
+
+PUT = "P"
+DELETE = "D"
+TASK_FIELDS = 6
+
+# Bytes read per step when searching backwards for the last complete record.
+TAIL_CHUNK = 1 << 16
+
+
+def _lock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def read_legacy_tasks(path=LEGACY_FILE):
+    """
+    Streams tasks from a legacy ', '-separated tasks file.
+
+    Lines with fewer than six fields are skipped, as the original task
+    manager did. The format has no escaping, so a line with more than six
+    fields is taken to have ', ' inside its description: the first two
+    fields are the assignee and title, the last three the dates and
+    completion flag, and the fields between them are joined back together.
+
+    Parameters:
+        path (str): The legacy tasks file to read.
+
+    Yields:
+        list: The six task fields of each well-formed line.
+    """
+    with open(path, "r", encoding="utf-8") as legacy:
+        for line in legacy:
+            parts = line.strip().split(", ")
+            if len(parts) < TASK_FIELDS:
+                continue
+            yield parts[:2] + [", ".join(parts[2:-3])] + parts[-3:]
+
+
+class Task:
+    """
+    A single task.
+
+    Attributes:
+        assigned_to (str): The assignee's username, interned so that every
+            task assigned to the same user shares one string.
+        title (str): The task title.
+        description (str): The task description.
+        assigned (int): The assigned date as a day ordinal, or the original
+            text if it could not be parsed.
+        due (int): The due date as a day ordinal, or the original text if it
+            could not be parsed.
+        completed (bool): Whether the task has been completed.
+    """
+
+    __slots__ = ("assigned_to", "title", "description", "assigned", "due", "completed")
+
+    def __init__(self, assigned_to, title, description, assigned, due, completed):
+        self.assigned_to = sys.intern(assigned_to)
+        self.title = title
+        self.description = description
+        self.assigned = assigned
+        self.due = due
+        self.completed = completed
+
+    @classmethod
+    def from_fields(cls, fields):
+        """
+        Builds a task from its six text fields, as stored on disk.
+
+        Parameters:
+            fields (list): Assignee, title, description, assigned date, due
+                date and the 'Yes'/'No' completion flag.
+
+        Returns:
+            Task: The parsed task.
+        """
+        assigned_to, title, description, assigned, due, completed = fields
+        return cls(
+            assigned_to,
+            title,
+            description,
+            parse_date(assigned) or assigned,
+            parse_date(due) or due,
+            completed.lower() == "yes",
+        )
+
+    def to_fields(self):
+        """Returns the task's six text fields, with dates as 'DD Mon YYYY'."""
+        return [
+            self.assigned_to,
+            self.title,
+            self.description,
+            self.assigned_text,
+            self.due_text,
+            "Yes" if self.completed else "No",
+        ]
+
+    def copy(self):
+        """Returns a copy of the task that can be edited independently."""
+        return Task(
+            self.assigned_to,
+            self.title,
+            self.description,
+            self.assigned,
+            self.due,
+            self.completed,
+        )
+
+    @property
+    def due_ordinal(self):
+        """The due date as a day ordinal, or None if it is not a valid date."""
+        return self.due if isinstance(self.due, int) else None
+
+    @property
+    def assigned_text(self):
+        if isinstance(self.assigned, int):
+            return format_date(self.assigned)
+        return self.assigned
+
+    @property
+    def due_text(self):
+        if isinstance(self.due, int):
+            return format_date(self.due)
+        return self.due
+
+
+def _clean(field):
+    """Removes the characters that delimit log records from a field."""
+    return str(field).replace("\t", " ").replace("\n", " ").replace("\r", " ")
+
+
+def _encode(op, task_id, task=None):
+    """Builds one log record as bytes."""
+    fields = [op, str(task_id)]
+    if task is not None:
+        fields.extend(_clean(field) for field in task.to_fields())
+    return ("\t".join(fields) + "\n").encode("utf-8")
+
+
+def _decode(line):
+    """Splits one log record into (op, task_id, text fields or None)."""
+    fields = line.decode("utf-8").rstrip("\n").split("\t")
+    task = fields[2:] if fields[0] == PUT else None
+    return fields[0], int(fields[1]), task
+
+
+def iter_records(log_path, start=0):
+    """
+    Streams the complete records in a log from a byte offset onwards.
+
+    Parameters:
+        log_path (str): The task log.
+        start (int): Offset of the first record to read.
+
+    Yields:
+        tuple: (op, task_id, text fields or None) for each record.
+    """
+    with open(log_path, "rb") as log:
+        log.seek(start)
+        for line in log:
+            if not line.endswith(b"\n"):
+                break
+            yield _decode(line)
+
+
+def iter_live_tasks(log_path, index_path, start, end):
+    """
+    Streams the live tasks whose records begin in a byte range of the log.
+
+    The range is aligned to record boundaries: a record that straddles
+    `start` belongs to the previous range. A record is live if the on-disk
+    index still points at its offset. Readers in separate processes can
+    therefore split one log between them without coordinating.
+
+    Parameters:
+        log_path (str): The task log.
+        index_path (str): The offset index for that log.
+        start (int): First byte of the range.
+        end (int): Byte just past the range.
+
+    Yields:
+        Task: Each live task in log order.
+    """
+    with open(index_path, "rb") as index_file, open(log_path, "rb") as log:
+        index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        slots = (len(index) - HEADER.size) // SLOT.size
+        if start:
+            log.seek(start - 1)
+            log.readline()
+        position = log.tell()
+        try:
+            while position < end:
+                line = log.readline()
+                if not line.endswith(b"\n"):
+                    break
+                op, task_id, fields = _decode(line)
+                if op == PUT and task_id <= slots:
+                    (offset,) = SLOT.unpack_from(
+                        index, HEADER.size + SLOT.size * (task_id - 1)
+                    )
+                    if offset == position:
+                        yield Task.from_fields(fields)
+                position += len(line)
+        finally:
+            index.close()
+
+
+class TaskStore:
+    """
+    Task storage backed by an append-only log and an on-disk offset index.
+
+    Task IDs start at 1 and are never reused. Tasks go in and come out as
+    Task records.
+    """
+
+    def __init__(
+        self,
+        log_path=LOG_FILE,
+        index_path=INDEX_FILE,
+        legacy_path=LEGACY_FILE,
+        durable=False,
+    ):
+        self.log_path = log_path
+        self.index_path = index_path
+        self.durable = durable
+        self._lock = threading.RLock()
+        self._lock_handle = open(log_path + ".lock", "a+b")
+        self._lock_depth = 0
+        self._compactor = None
+        self._map = None
+        self._mapped_size = 0
+
+        # Group commit: the end of the log known to be on stable storage, as
+        # (log inode, offset). Processes share it through the '.sync' file.
+        self._sync_handle = open(
+            os.open(log_path + ".sync", os.O_RDWR | os.O_CREAT), "r+b", buffering=0
+        )
+        self._synced = (0, 0)
+        self._syncing = False
+        self._sync_done = threading.Condition()
+        self._written = 0
+
+        self._log = None
+        self._offsets = array("q")
+        self.listeners = []
+        self.generation = 0
+        self.version = 0
+        self.records = 0
+        self.live = 0
+        # Records decoded by reads, for task_metrics.
+        self.rows_read = 0
+
+        with self.locked():
+            if self._created and legacy_path and os.path.exists(legacy_path):
+                self.add_many(
+                    Task.from_fields(fields)
+                    for fields in read_legacy_tasks(legacy_path)
+                )
+
+    # ---- Cross-process coordination ----
+    @contextmanager
+    def locked(self):
+        """
+        Makes the block exclusive across threads and processes.
+
+        On entry, changes appended by other processes are replayed so the
+        block sees the current tasks; on exit, writes are flushed before the
+        lock is released. A caller can hold the lock around a read and the
+        update that depends on it, so that no concurrent change is lost.
+        Blocks may be nested.
+        """
+        with self._lock:
+            outer = not self._lock_depth
+            if outer:
+                _lock_file(self._lock_handle)
+                try:
+                    self._catch_up()
+                except BaseException:
+                    _unlock_file(self._lock_handle)
+                    raise
+            self._lock_depth += 1
+            written = self._written
+            try:
+                yield self
+            finally:
+                self._lock_depth -= 1
+                if outer:
+                    if self._log is not None and not self._log.closed:
+                        self._log.flush()
+                        self._index.flush()
+                    _unlock_file(self._lock_handle)
+            wrote = self._written != written
+            target = (self._log_inode, self._log_end)
+        if outer and wrote and self.durable:
+            self._group_sync(*target)
+
+    def _covered(self, inode, end):
+        """Whether the log up to `end` is known to be on stable storage."""
+        synced_inode, synced_end = self._synced
+        # A compacted log was fsynced before it replaced the old one.
+        return inode != self._log_inode or (
+            inode == synced_inode and end <= synced_end
+        )
+
+    def _group_sync(self, inode, end):
+        """
+        Waits until the log up to `end` is on stable storage.
+
+        One thread per process at a time becomes the leader and syncs on
+        behalf of every writer that finished before it started; the rest
+        wait for it. Between processes, the leaders take turns through the
+        '.sync' file, which records how far the log has been synced, so a
+        writer whose records were covered by another process's fsync does
+        not issue its own. A burst of concurrent changes therefore costs a
+        few fsyncs rather than one each.
+        """
+        with self._sync_done:
+            while not self._covered(inode, end):
+                if self._syncing:
+                    self._sync_done.wait()
+                    continue
+                self._syncing = True
+                self._sync_done.release()
+                try:
+                    synced = self._sync_shared(inode, end)
+                finally:
+                    self._sync_done.acquire()
+                    self._syncing = False
+                    self._sync_done.notify_all()
+                self._synced = synced
+
+    def _sync_shared(self, inode, end):
+        """Fsyncs the store unless another process already has; returns the
+        synced (inode, offset)."""
+        handle = self._sync_handle
+        _lock_file(handle)
+        try:
+            handle.seek(0)
+            state = handle.read(SYNC_STATE.size)
+            synced = SYNC_STATE.unpack(state) if state else (0, 0)
+            if synced[0] == inode and synced[1] >= end:
+                return synced
+            with self._lock:
+                if self._log_inode != inode:
+                    return synced
+                files = [os.dup(f.fileno()) for f in (self._log, self._index)]
+            try:
+                size = os.fstat(files[0]).st_size
+                for fd in files:
+                    os.fsync(fd)
+            finally:
+                for fd in files:
+                    os.close(fd)
+            synced = (inode, size)
+            handle.seek(0)
+            handle.write(SYNC_STATE.pack(*synced))
+            return synced
+        finally:
+            _unlock_file(handle)
+
+    def _open_files(self):
+        """Opens the log and loads its index; called with the file lock held."""
+        self._created = not os.path.exists(self.log_path)
+        self._log = open(self.log_path, "a+b")
+        self._trim_torn_tail()
+        if self._created or not self._load_index():
+            self._rebuild_index()
+        else:
+            indexed_end = self._log_end
+            self._replay_tail()
+            self._index_orphans(indexed_end)
+        self._track_files()
+
+    def _track_files(self):
+        """Records the identity and size of the files this process has read."""
+        log_stat = os.fstat(self._log.fileno())
+        self._log_inode = log_stat.st_ino
+        self._log_end = log_stat.st_size
+        self._index_inode = os.fstat(self._index.fileno()).st_ino
+
+    def _trim_torn_tail(self):
+        """Cuts off a partial record left at the end of the log by a crash."""
+        self._log.flush()
+        size = os.fstat(self._log.fileno()).st_size
+        end = size
+        while end:
+            start = max(0, end - TAIL_CHUNK)
+            self._log.seek(start)
+            newline = self._log.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            self._log.truncate(end)
+
+    def _catch_up(self):
+        """
+        Applies changes made by other processes since this one last looked.
+
+        Called with the file lock held. New records at the end of the log are
+        replayed into the index and reported to the listeners. If another
+        process replaced the files (by compacting or rebuilding the index),
+        they are reopened and the listeners rebuilt if anything changed.
+        """
+        if self._log is None:
+            self._open_files()
+            return
+
+        log_stat = os.stat(self.log_path)
+        if (
+            log_stat.st_ino != self._log_inode
+            or os.stat(self.index_path).st_ino != self._index_inode
+        ):
+            version = self.version
+            self._close_files()
+            self._open_files()
+            if self.version != version:
+                for listener in self.listeners:
+                    listener.rebuild()
+            return
+        if log_stat.st_size == self._log_end:
+            return
+
+        self._replay_tail()
+        self._index.seek(0)
+        _, self.generation, self.version, _, _, indexed_end = HEADER.unpack(
+            self._index.read(HEADER.size)
+        )
+        self._index_orphans(indexed_end)
+
+    def _replay_tail(self):
+        """
+        Applies the records past the known end of the log to the in-memory
+        index, telling the listeners about each change. Called with the file
+        lock held; a torn record at the end is trimmed.
+        """
+        position = self._log_end
+        self._log.seek(position)
+        for line in self._log:
+            if not line.endswith(b"\n"):
+                break
+            op, task_id, fields = _decode(line)
+            old = self._lookup(task_id)
+            while len(self._offsets) < task_id:
+                self._offsets.append(DELETED)
+            if op == PUT:
+                new = Task.from_fields(fields)
+                self._offsets[task_id - 1] = position
+            else:
+                new = None
+                self._offsets[task_id - 1] = DELETED
+            self.records += 1
+            self.live += (new is not None) - (old is not None)
+            self._notify(task_id, old, new)
+            position += len(line)
+        if position != os.fstat(self._log.fileno()).st_size:
+            self._log.truncate(position)
+        self._log_end = position
+
+    def _index_orphans(self, indexed_end):
+        """
+        Writes the on-disk index entries for records past `indexed_end`.
+
+        Such records were appended by a writer that died before it updated
+        the index. They have already been replayed into memory; without
+        this, the next process to load the index would never see them and
+        would hand their IDs out again. The version moves past them, so
+        listener checkpoints taken before the crash are seen to be stale.
+        """
+        if indexed_end >= self._log_end:
+            return
+        task_ids = [
+            task_id for _, task_id, _ in iter_records(self.log_path, indexed_end)
+        ]
+        first_id = min(task_ids)
+        self._index.seek(HEADER.size + SLOT.size * (first_id - 1))
+        self._index.write(self._offsets[first_id - 1:].tobytes())
+        self.version += len(task_ids)
+        self._write_header()
+
+    def refresh(self):
+        """
+        Catches up with other processes' changes before a read.
+
+        Listeners call this before answering from their own state, so their
+        figures include records other processes have appended. Inside a
+        locked block the store is already current and nothing is done.
+        """
+        if self._lock_depth:
+            return
+        log_stat = os.stat(self.log_path)
+        if log_stat.st_ino != self._log_inode or log_stat.st_size != self._log_end:
+            with self.locked():
+                pass
+
+    # ---- Index maintenance ----
+    def _load_index(self):
+        """Loads the offset index, returning False if it must be rebuilt."""
+        try:
+            with open(self.index_path, "rb") as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            return False
+
+        if len(data) < HEADER.size or (len(data) - HEADER.size) % SLOT.size:
+            return False
+
+        (
+            magic,
+            self.generation,
+            self.version,
+            self.records,
+            self.live,
+            self._log_end,
+        ) = HEADER.unpack_from(data)
+        # Indexes written before the header held the log end are rebuilt.
+        if magic != INDEX_MAGIC:
+            return False
+        self._offsets = array("q")
+        self._offsets.frombytes(data[HEADER.size:])
+        if self._log_end > os.path.getsize(self.log_path):
+            return False
+        if self._offsets and max(self._offsets) >= self._log_end:
+            return False
+
+        self._index = open(self.index_path, "r+b")
+        return True
+
+    def _rebuild_index(self):
+        """Recreates the offset index by scanning the whole log once."""
+        offsets = array("q")
+        records = 0
+        with open(self.log_path, "rb") as log:
+            position = 0
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break  # torn write at the end of the log
+                op, task_id, _ = _decode(line)
+                while len(offsets) < task_id:
+                    offsets.append(DELETED)
+                offsets[task_id - 1] = position if op == PUT else DELETED
+                position += len(line)
+                records += 1
+
+        self._offsets = offsets
+        self._log_end = position
+        self.records = records
+        self.live = sum(1 for offset in offsets if offset != DELETED)
+        # Start a fresh version sequence so that listener checkpoints taken
+        # against the lost index are never mistaken for current ones.
+        self.version = time.time_ns()
+        tmp_path = self.index_path + ".tmp"
+        self._write_index(tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self._index = open(self.index_path, "r+b")
+
+    def _write_index(self, path):
+        """Writes the full in-memory index to the given path."""
+        with open(path, "wb") as index_file:
+            index_file.write(self._header())
+            index_file.write(self._offsets.tobytes())
+
+    def _set_slot(self, task_id, offset):
+        """Points one task ID at a log offset, in memory and on disk."""
+        if task_id > len(self._offsets):
+            self._offsets.append(offset)
+        else:
+            self._offsets[task_id - 1] = offset
+        self._index.seek(HEADER.size + SLOT.size * (task_id - 1))
+        self._index.write(SLOT.pack(offset))
+
+    def _header(self):
+        return HEADER.pack(
+            INDEX_MAGIC,
+            self.generation,
+            self.version,
+            self.records,
+            self.live,
+            self._log_end,
+        )
+
+    def _write_header(self):
+        self._index.seek(0)
+        self._index.write(self._header())
+        self._index.flush()
+
+    # ---- Log access ----
+    def _append(self, data, count=1):
+        """Appends `count` encoded records to the log and returns the offset."""
+        self._log.seek(0, os.SEEK_END)
+        offset = self._log.tell()
+        self._log.write(data)
+        self._log.flush()
+        self._log_end = offset + len(data)
+        self._written += count
+        self.records += count
+        return offset
+
+    def _append_batch(self, tasks):
+        """Appends a batch of new tasks with one log write and one index write."""
+        self._log.seek(0, os.SEEK_END)
+        offset = self._log.tell()
+        first_id = len(self._offsets) + 1
+        records = []
+        for task in tasks:
+            task_id = first_id + len(records)
+            record = _encode(PUT, task_id, task)
+            records.append(record)
+            self._offsets.append(offset)
+            offset += len(record)
+            self._notify(task_id, None, task)
+
+        self._log.write(b"".join(records))
+        self._log.flush()
+        self._log_end = offset
+        self._written += len(records)
+        self._index.seek(HEADER.size + SLOT.size * (first_id - 1))
+        self._index.write(self._offsets[first_id - 1:].tobytes())
+        self.records += len(records)
+        self.live += len(records)
+        self.version += len(records)
+        self._write_header()
+
+    def _read(self, offset):
+        """Returns the task stored at a log offset."""
+        size = os.fstat(self._log.fileno()).st_size
+        if self._map is None or self._mapped_size != size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._log.fileno(), size, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        end = self._map.find(b"\n", offset)
+        self.rows_read += 1
+        return Task.from_fields(_decode(self._map[offset:end + 1])[2])
+
+    def _notify(self, task_id, old, new):
+        """Tells every listener that a task changed from old to new."""
+        for listener in self.listeners:
+            listener.task_changed(task_id, old, new)
+
+    def _lookup(self, task_id):
+        """Returns a live task from the in-memory index, or None."""
+        if not 1 <= task_id <= len(self._offsets):
+            return None
+        offset = self._offsets[task_id - 1]
+        if offset == DELETED:
+            return None
+        return self._read(offset)
+
+    # ---- Public API ----
+    def __len__(self):
+        self.refresh()
+        return self.live
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def get(self, task_id):
+        """
+        Looks up a task by ID.
+
+        Parameters:
+            task_id (int): The ID of the task.
+
+        Returns:
+            Task: The task, or None if no live task has that ID.
+        """
+        self.refresh()
+        with self._lock:
+            return self._lookup(task_id)
+
+    def add(self, task):
+        """
+        Stores a new task.
+
+        Parameters:
+            task (Task): The task to store.
+
+        Returns:
+            int: The ID assigned to the task.
+        """
+        with self.locked():
+            task_id = len(self._offsets) + 1
+            offset = self._append(_encode(PUT, task_id, task))
+            self._set_slot(task_id, offset)
+            self.live += 1
+            self.version += 1
+            self._write_header()
+            self._notify(task_id, None, task)
+        return task_id
+
+    def add_many(self, tasks, batch_size=10000, sync=True):
+        """
+        Stores many new tasks, writing them to disk in large batches.
+
+        Parameters:
+            tasks (iterable): Task records; consumed lazily, one batch at a
+                time.
+            batch_size (int): Tasks written per log and index write.
+            sync (bool): Whether to fsync the store files once at the end.
+                A durable store always does, through the group commit when
+                the lock is released, so no separate fsync is made.
+
+        Returns:
+            int: The number of tasks added.
+        """
+        added = 0
+        batch = []
+        with self.locked():
+            for task in tasks:
+                batch.append(task)
+                if len(batch) >= batch_size:
+                    self._append_batch(batch)
+                    added += len(batch)
+                    batch = []
+            if batch:
+                self._append_batch(batch)
+                added += len(batch)
+            if sync and not self.durable:
+                self.sync()
+        return added
+
+    def sync(self):
+        """Flushes the log and index and forces them to stable storage."""
+        with self._lock:
+            for handle in (self._log, self._index):
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def update(self, task_id, task):
+        """
+        Replaces the fields of an existing task.
+
+        Parameters:
+            task_id (int): The ID of the task to replace.
+            task (Task): The new version of the task.
+
+        Raises:
+            KeyError: If no live task has that ID.
+        """
+        with self.locked():
+            old = self.get(task_id)
+            if old is None:
+                raise KeyError(task_id)
+            offset = self._append(_encode(PUT, task_id, task))
+            self._set_slot(task_id, offset)
+            self.version += 1
+            self._write_header()
+            self._notify(task_id, old, task)
+        self._maybe_compact()
+
+    def delete(self, task_id):
+        """
+        Deletes a task by appending a deletion record for its ID.
+
+        Parameters:
+            task_id (int): The ID of the task to delete.
+
+        Raises:
+            KeyError: If no live task has that ID.
+        """
+        with self.locked():
+            old = self.get(task_id)
+            if old is None:
+                raise KeyError(task_id)
+            self._append(_encode(DELETE, task_id))
+            self._set_slot(task_id, DELETED)
+            self.live -= 1
+            self.version += 1
+            self._write_header()
+            self._notify(task_id, old, None)
+        self._maybe_compact()
+
+    def delete_many(self, task_ids):
+        """
+        Deletes several tasks with one log write.
+
+        A tombstone record is appended for each ID; IDs that are not live are
+        skipped.
+
+        Parameters:
+            task_ids (iterable): The IDs of the tasks to delete.
+
+        Returns:
+            int: The number of tasks deleted.
+        """
+        with self.locked():
+            doomed = []
+            for task_id in task_ids:
+                old = self.get(task_id)
+                if old is not None:
+                    doomed.append((task_id, old))
+            if not doomed:
+                return 0
+
+            self._append(
+                b"".join(_encode(DELETE, task_id) for task_id, _ in doomed),
+                len(doomed),
+            )
+            for task_id, old in doomed:
+                self._set_slot(task_id, DELETED)
+                self._notify(task_id, old, None)
+            self.live -= len(doomed)
+            self.version += len(doomed)
+            self._write_header()
+        self._maybe_compact()
+        return len(doomed)
+
+    def delete_where(self, predicate, batch_size=10000):
+        """
+        Deletes every task matching a predicate in one streaming pass.
+
+        Parameters:
+            predicate (callable): Called with each Task; True deletes it.
+            batch_size (int): Tombstones written per log write.
+
+        Returns:
+            int: The number of tasks deleted.
+        """
+        deleted = 0
+        batch = []
+        for task_id, task in self.items():
+            if predicate(task):
+                batch.append(task_id)
+                if len(batch) >= batch_size:
+                    deleted += self.delete_many(batch)
+                    batch = []
+        return deleted + self.delete_many(batch)
+
+    def items(self, after=0):
+        """
+        Streams every live task in ID order.
+
+        Records are read through a memory map one at a time, so memory use
+        stays flat regardless of how large the log grows.
+
+        Parameters:
+            after (int): Only yield tasks with an ID greater than this, so
+                that a listing can resume where a previous page ended.
+
+        Yields:
+            tuple: (task_id, Task) for each live task.
+        """
+        self.refresh()
+        task_id = after
+        while True:
+            task_id += 1
+            with self._lock:
+                if task_id > len(self._offsets):
+                    return
+                offset = self._offsets[task_id - 1]
+                if offset == DELETED:
+                    continue
+                task = self._read(offset)
+            yield task_id, task
+
+    # ---- Compaction ----
+    def snapshot_index(self, path):
+        """
+        Copies the offset index to another file as it stands right now.
+
+        iter_live_tasks reads the log against the copy without holding the
+        store lock: records appended later lie beyond the returned log end,
+        and the copy still points at the records they replace. Compaction
+        swaps in a new log, so callers must check that the generation is
+        unchanged once they have finished reading.
+
+        Parameters:
+            path (str): Where to write the copy.
+
+        Returns:
+            tuple: (generation, log end) of the snapshot.
+        """
+        with self.locked():
+            self._log.flush()
+            self._write_index(path)
+            return self.generation, self._log_end
+
+    @property
+    def stale(self):
+        """Records in the log that compaction would reclaim."""
+        return self.records - self.live
+
+    def _maybe_compact(self):
+        """Starts a background compaction when stale records pile up."""
+        stale = self.stale
+        if stale < MIN_COMPACT_RECORDS or stale <= self.live * COMPACT_RATIO:
+            return
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """
+        Rewrites the log so that it only holds the live version of each task.
+
+        The bulk of the copy runs without holding the store lock; records
+        appended meanwhile are replayed into the new log before the files are
+        swapped.
+        """
+        # Name the copies per process, in case two compact at the same time.
+        tmp_log = f"{self.log_path}.{os.getpid()}.compact"
+        tmp_index = f"{self.index_path}.{os.getpid()}.compact"
+
+        with self.locked():
+            snapshot = array("q", self._offsets)
+            copied_to = self._log_end
+            generation = self.generation
+            old_log = open(self.log_path, "rb")
+
+        new_offsets = array("q")
+        live = 0
+        with old_log, open(tmp_log, "wb") as new_log:
+            reader = mmap.mmap(old_log.fileno(), 0, access=mmap.ACCESS_READ) \
+                if copied_to else None
+            for offset in snapshot:
+                if offset == DELETED:
+                    new_offsets.append(DELETED)
+                    continue
+                end = reader.find(b"\n", offset) + 1
+                new_offsets.append(new_log.tell())
+                new_log.write(reader[offset:end])
+                live += 1
+            if reader is not None:
+                reader.close()
+
+            with self.locked():
+                if self.generation != generation:
+                    # Another process compacted the log first.
+                    new_log.close()
+                    os.remove(tmp_log)
+                    return
+                # Replay anything written while the bulk copy was running.
+                old_log.seek(copied_to)
+                for line in old_log:
+                    op, task_id, _ = _decode(line)
+                    while len(new_offsets) < task_id:
+                        new_offsets.append(DELETED)
+                    was_live = new_offsets[task_id - 1] != DELETED
+                    if op == PUT:
+                        new_offsets[task_id - 1] = new_log.tell()
+                        new_log.write(line)
+                        live += not was_live
+                    else:
+                        new_offsets[task_id - 1] = DELETED
+                        live -= was_live
+                new_log.flush()
+                os.fsync(new_log.fileno())
+
+                self._close_files()
+                self._offsets = new_offsets
+                self.generation += 1
+                self.records = live
+                self.live = live
+                self._log_end = new_log.tell()
+                self._write_index(tmp_index)
+                os.replace(tmp_log, self.log_path)
+                os.replace(tmp_index, self.index_path)
+                self._log = open(self.log_path, "a+b")
+                self._index = open(self.index_path, "r+b")
+                self._track_files()
+
+    def _close_files(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._log.close()
+        self._index.close()
+
+    def close(self):
+        """
+        Waits for any running compaction, checkpoints every listener, then
+        closes the store files.
+        """
+        if self._compactor is not None:
+            self._compactor.join()
+        with self.locked():
+            for listener in self.listeners:
+                listener.checkpoint()
+        with self._lock:
+            self._close_files()
+            self._lock_handle.close()
+            self._sync_handle.close()
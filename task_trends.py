@@ -0,0 +1,279 @@
+"""
+Daily counter history and trend reports for the task manager.
+
+Once a day the task manager records a snapshot of the per-user counters
+(tasks assigned, completed and overdue) in 'task_history.jsonl', one compact
+JSON line per day. Recording again on the same day replaces that day's line,
+so the last snapshot of the day wins. Snapshots are recorded when a user logs
+in or exits; a daily cron job running 'python task_trends.py record' keeps
+the history complete on days nobody uses the menu. A day without a snapshot
+repeats the one before it.
+
+When the history is loaded, each counter becomes a cumulative (prefix) array
+over the recorded days. The value on any day and the sum over any range are
+then one or two array lookups, so a trend query costs O(1) per user however
+long the range is.
+
+Usage (from the directory holding the task store):
+    python task_trends.py record
+    python task_trends.py report --start 2025-01-01 --end 2025-03-31 > trends.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from array import array
+from datetime import date
+
+from task_dates import parse_date
+
+HISTORY_FILE = "task_history.jsonl"
+TRENDS_FILE = "task_trends.csv"
+TAIL_CHUNK = 4096
+
+METRICS = ("assigned", "completed", "overdue")
+ALL_USERS = "(all)"
+CSV_COLUMNS = ["user", "start", "end", "days"] + [
+    f"{metric}_{field}"
+    for metric in METRICS
+    for field in ("start", "end", "change", "mean")
+]
+
+
+def _last_line_start(history, end):
+    """Returns the offset of the last line in a file of `end` bytes."""
+    position = end - 1  # Skip the last line's own newline.
+    while position > 0:
+        step = min(TAIL_CHUNK, position)
+        history.seek(position - step)
+        newline = history.read(step).rfind(b"\n")
+        if newline >= 0:
+            return position - step + newline + 1
+        position -= step
+    return 0
+
+
+class TaskHistory:
+    """
+    Daily per-user counter snapshots with prefix sums for range queries.
+
+    Parameters:
+        path (str): The history file.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self._state = None
+        self.first_day = None
+        self.days = 0
+        self.prefix = {}
+
+    # ---- Recording ----
+    def record(self, counters):
+        """
+        Records the counters as the snapshot for their day.
+
+        Parameters:
+            counters (ReportCounters): The figures to record; their 'today'
+                is the day of the snapshot.
+
+        Raises:
+            ValueError: If a later day has already been recorded.
+        """
+        day = counters.today.isoformat()
+        line = json.dumps(
+            {"day": day, "users": counters.users},
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+        with open(self.path, "a+b") as history:
+            end = history.seek(0, os.SEEK_END)
+            if end:
+                start = _last_line_start(history, end)
+                history.seek(start)
+                last_day = json.loads(history.read())["day"]
+                if last_day > day:
+                    raise ValueError(
+                        f"The history already has a snapshot for {last_day}."
+                    )
+                if last_day == day:
+                    history.truncate(start)
+            history.write(line.encode("utf-8") + b"\n")
+
+    # ---- Loading ----
+    def load(self):
+        """Builds the prefix arrays, unless the file is unchanged since."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        state = stat and (stat.st_size, stat.st_mtime_ns)
+        if state == self._state and self._state is not None:
+            return self
+
+        snapshots = {}
+        if stat is not None:
+            with open(self.path, "r", encoding="utf-8") as history:
+                for line in history:
+                    saved = json.loads(line)
+                    snapshots[parse_date(saved["day"])] = saved["users"]
+        self._build(snapshots)
+        self._state = state
+        return self
+
+    def _build(self, snapshots):
+        self.prefix = {}
+        if not snapshots:
+            self.first_day, self.days = None, 0
+            return
+        self.first_day = min(snapshots)
+        self.days = max(snapshots) - self.first_day + 1
+
+        users = set().union(*snapshots.values())
+        columns = {
+            user: [array("q", [0]) for _ in METRICS]
+            for user in [*users, ALL_USERS]
+        }
+        zero = [0] * len(METRICS)
+        current = {}
+        for offset in range(self.days):
+            current = snapshots.get(self.first_day + offset, current)
+            totals = [0] * len(METRICS)
+            for user in users:
+                counts = current.get(user, zero)
+                for position, sums in enumerate(columns[user]):
+                    sums.append(sums[-1] + counts[position])
+                    totals[position] += counts[position]
+            for position, sums in enumerate(columns[ALL_USERS]):
+                sums.append(sums[-1] + totals[position])
+        self.prefix = columns
+
+    # ---- Queries ----
+    def bounds(self, start=None, end=None):
+        """
+        Clips a date range to the recorded days.
+
+        Returns:
+            tuple: (first, last) offsets into the prefix arrays.
+
+        Raises:
+            ValueError: If no snapshot falls within the range.
+        """
+        self.load()
+        if not self.days:
+            raise ValueError("No daily snapshots have been recorded yet.")
+        first = 0 if start is None else start.toordinal() - self.first_day
+        last = self.days - 1 if end is None else end.toordinal() - self.first_day
+        first, last = max(first, 0), min(last, self.days - 1)
+        if first > last:
+            raise ValueError("No snapshots were recorded in that date range.")
+        return first, last
+
+    def window(self, user, first, last):
+        """
+        Summarises one user's counters over a range of recorded days.
+
+        Parameters:
+            user (str): The user, or ALL_USERS for the totals.
+            first (int), last (int): Offsets from bounds().
+
+        Returns:
+            dict: For each metric, its value on the first and last day, the
+            change between them and its mean over the range.
+        """
+        days = last - first + 1
+        summary = {}
+        for metric, sums in zip(METRICS, self.prefix[user]):
+            start_value = sums[first + 1] - sums[first]
+            end_value = sums[last + 1] - sums[last]
+            summary[metric] = (
+                start_value,
+                end_value,
+                end_value - start_value,
+                (sums[last + 1] - sums[first]) / days,
+            )
+        return summary
+
+    def trends(self, start=None, end=None, users=None):
+        """
+        Yields one CSV row per user (and one for all users) for a date range.
+
+        Parameters:
+            start (date), end (date): The range; open ends default to the
+                first and last recorded days.
+            users (list): The users to include; defaults to everyone.
+        """
+        first, last = self.bounds(start, end)
+        first_date = date.fromordinal(self.first_day + first).isoformat()
+        last_date = date.fromordinal(self.first_day + last).isoformat()
+        if users is None:
+            users = sorted(user for user in self.prefix if user != ALL_USERS)
+            users.append(ALL_USERS)
+        for user in users:
+            if user not in self.prefix:
+                raise ValueError(f"No snapshots mention the user '{user}'.")
+            row = [user, first_date, last_date, last - first + 1]
+            for start_value, end_value, change, mean in self.window(
+                user, first, last
+            ).values():
+                row += [start_value, end_value, change, round(mean, 2)]
+            yield row
+
+
+def write_trends(rows, out):
+    """Writes trend rows from TaskHistory.trends as CSV to an open file."""
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(rows)
+
+
+def _date_argument(text):
+    ordinal = parse_date(text)
+    if ordinal is None:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}'")
+    return date.fromordinal(ordinal)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or report task trends.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("record", help="record today's snapshot")
+    report = commands.add_parser("report", help="write a CSV trend report")
+    report.add_argument("--start", type=_date_argument)
+    report.add_argument("--end", type=_date_argument)
+    report.add_argument("--user", action="append", dest="users")
+    report.add_argument("--output", help="CSV file (default: standard output)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        # task_service imports this module, so it is imported lazily here.
+        from task_service import TaskService
+
+        service = TaskService()
+        try:
+            service.record_history()
+        except ValueError as error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 1
+        finally:
+            service.close()
+        print(f"Recorded the snapshot for {date.today().isoformat()}.")
+        return 0
+
+    history = TaskHistory()
+    try:
+        rows = list(history.trends(args.start, args.end, args.users))
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            write_trends(rows, out)
+    else:
+        write_trends(rows, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())